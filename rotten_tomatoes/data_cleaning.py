@@ -1,57 +1,393 @@
 """Runs data download and data cleaning steps."""
 
+import argparse
+
+from utils.checkpoint import StageManifest  # pylint: disable=E0401
+from utils.compressed import raw_file  # pylint: disable=E0401
 from utils.data_cleaning import (  # pylint: disable=E0401
     CriticsDataCleaner,
     MoviesDataCleaner,
+    OscarsDataCleaner,
     BestPictureOscarsDataCleaner,
     AnyWinOscarsDataCleaner,
-    MergeExpansionException,
 )
+from utils.datasets import DatasetSink, write_dataset  # pylint: disable=E0401
+from utils.metrics import CleaningMetrics, write_report  # pylint: disable=E0401
+from utils.profiling import StageProfile, write_run_report  # pylint: disable=E0401
+from utils.pipeline import (  # pylint: disable=E0401
+    run_cleaners,
+    merge_movie_titles,
+    aggregate_critics,
+    merge_oscars,
+)
+from utils.score_cache import ScoreCache  # pylint: disable=E0401
+from utils.shared_source import SharedSources  # pylint: disable=E0401
+from utils.sql_backend import SqlBackend  # pylint: disable=E0401
+from utils.streaming import CsvSink  # pylint: disable=E0401
+from utils.title_matching import TitleMatcher  # pylint: disable=E0401
+
+# Merged datasets the pipeline writes, in order.
+MERGED_DATASETS = ["best_picture", "any_win"]
 
-any_win_data = AnyWinOscarsDataCleaner().run()
-best_picture_data = BestPictureOscarsDataCleaner().run()
-
-movies_data = MoviesDataCleaner().run()
-critics_data = CriticsDataCleaner().run()
-
-# First, merge the two Rotten Tomatoes datasets together.
-# Merge just the movie title from movies data onto critics data.
-# We are only using the critic scores at this time, but this may change.
-movie_titles = movies_data[["rotten_tomatoes_link", "movie_title"]].drop_duplicates()
-start_rows = critics_data.shape[0]
-# Do an inner merge, to drop movies we don't have titles for
-critics_data = critics_data.merge(movie_titles, on="rotten_tomatoes_link", how="inner")
-end_rows = critics_data.shape[0]
-if end_rows > start_rows:
-    raise MergeExpansionException(
-        "Number of rows increased after merging with movie title. This is unexpected."
-    )
-if end_rows < start_rows:
+
+def main():
+    """Cleans the raw Kaggle datasets and writes the merged analysis datasets."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of processes to run cleaners in. Defaults to one per raw file.",
+    )
+    parser.add_argument(
+        "--critics-workers",
+        type=int,
+        default=1,
+        help="Number of processes to clean the critic reviews with.",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help=(
+            "Ignore cached cleaned outputs and completed stages, and rebuild "
+            "everything from the raw files."
+        ),
+    )
+    parser.add_argument(
+        "--level",
+        choices=["review", "movie"],
+        default="review",
+        help=(
+            "Granularity of the critic scores in the outputs: one row per review, "
+            "or per movie aggregates (count, mean, median, top critic mean and "
+            "fresh ratio), which are much smaller."
+        ),
+    )
+    parser.add_argument(
+        "--csv",
+        action="store_true",
+        help="Also write the merged datasets as csv files.",
+    )
+    parser.add_argument(
+        "--match-titles",
+        action="store_true",
+        help=(
+            "Match Oscars titles to Rotten Tomatoes titles which differ only in "
+            "case, punctuation, articles or small typos."
+        ),
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["pandas", "sqlite"],
+        default="pandas",
+        help=(
+            "Where to merge and aggregate: in memory with pandas, or out of core in "
+            "an on-disk SQLite database, streaming the raw files into it in chunks."
+        ),
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=100_000,
+        help=(
+            "Rows per chunk read into, and merged datasets written out of, the "
+            "SQLite database, with --backend sqlite."
+        ),
+    )
+    parser.add_argument(
+        "--prefetch",
+        type=int,
+        default=2,
+        help=(
+            "Chunks read ahead in a background thread while the current chunk is "
+            "cleaned and written, with --backend sqlite. 0 disables it."
+        ),
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help=(
+            "Record the peak memory allocated by each stage in the run report, with "
+            "tracemalloc. Slows the run down."
+        ),
+    )
+    parser.add_argument(
+        "--cprofile",
+        metavar="DIR",
+        default=None,
+        help=(
+            "Profile each stage with cProfile, writing .prof files to DIR. Defaults "
+            "to the ROTTEN_TOMATOES_CPROFILE_DIR environment variable, if set."
+        ),
+    )
+    args = parser.parse_args()
+    if args.backend == "sqlite" and args.match_titles:
+        parser.error("--match-titles is not supported with --backend sqlite.")
+
+    # Merged datasets already written from the same raw files and options are
+    # skipped, so a rerun resumes from the first failed or outdated dataset.
+    manifest = StageManifest("./data/pipeline_manifest.json")
+    pending = {
+        name: stage
+        for name, stage in merged_dataset_stages(args).items()
+        if args.force or not manifest.is_complete(name, **stage)
+    }
+    if not pending:
+        print("The merged datasets are up to date. Pass --force to rebuild them.")
+        return
+
+    if args.backend == "sqlite":
+        report, profiles = merge_in_sqlite(args, pending, manifest)
+    else:
+        report, profiles = merge_in_pandas(args, pending, manifest)
+
+    # Counts of corrected, capped and dropped rows for each step.
+    write_report(report, "./data/cleaning_report.json")
+    # Time, rows and memory of each stage of each step.
+    write_run_report(profiles, "./data/run_report.json")
     print(
-        f"{start_rows - end_rows} rows have been dropped "
-        "because they did not match with a movie title."
+        f"{report['merge']['rows_without_title']} rows were dropped because they did "
+        "not match with a movie title. See data/cleaning_report.json for details."
+    )
+
+
+def merged_dataset_stages(args):
+    """
+    Returns the inputs, params and outputs of the stage writing each merged
+    dataset, as recorded in the StageManifest.
+    """
+    cleaner_classes = [
+        CriticsDataCleaner,
+        MoviesDataCleaner,
+        OscarsDataCleaner,
+        BestPictureOscarsDataCleaner,
+        AnyWinOscarsDataCleaner,
+    ]
+    # The files the raw csvs are read from, which may be compressed.
+    raw_files = sorted({raw_file(cleaner.source_path) for cleaner in cleaner_classes})
+    params = {
+        "level": args.level,
+        "match_titles": args.match_titles,
+        "cleaner_versions": {cls.__name__: cls.version for cls in cleaner_classes},
+    }
+    return {
+        name: {
+            "inputs": raw_files,
+            "params": params,
+            "outputs": [f"./data/{name}_data"]
+            + ([f"./data/{name}_data.csv"] if args.csv else []),
+        }
+        for name in MERGED_DATASETS
+    }
+
+
+def write_outputs(name, data, csv=False):
+    """Writes a merged dataset as Parquet, and optionally csv, under ./data."""
+    write_dataset(data, f"./data/{name}")
+    if csv:
+        data.to_csv(f"./data/{name}.csv")
+
+
+def write_output_chunks(name, chunks, csv=False):
+    """
+    Writes a merged dataset given in chunks as write_outputs does, one chunk at a
+    time, and returns the number of rows written.
+    """
+    sinks = [DatasetSink(f"./data/{name}")]
+    if csv:
+        sinks.append(CsvSink(f"./data/{name}.csv", index=True))
+    for chunk in chunks:
+        for sink in sinks:
+            sink.write(chunk)
+    for sink in sinks:
+        sink.close()
+    return sinks[0].rows_written
+
+
+def identity_columns(name, args):
+    """
+    Returns the identity columns (see utils.dedup) of the Oscars dataset name and
+    of the critics data merged onto it, as merge_oscars keyword arguments.
+    """
+    oscars = {
+        "any_win": AnyWinOscarsDataCleaner,
+        "best_picture": BestPictureOscarsDataCleaner,
+    }[name]
+    if args.level == "movie":
+        # aggregate_critics gives one row per link and title.
+        critics_keys = ["rotten_tomatoes_link", "movie_title"]
+    else:
+        critics_keys = CriticsDataCleaner.identity_columns
+    return {"oscars_keys": oscars.identity_columns, "critics_keys": critics_keys}
+
+
+def new_profile(name, args):
+    """Returns an empty StageProfile with the profiling options in args."""
+    return StageProfile(name, trace_memory=args.trace_memory, cprofile_dir=args.cprofile)
+
+
+def profile_cleaners(cleaners, args):
+    """Gives each cleaner a new StageProfile with the profiling options in args."""
+    for name, cleaner in cleaners.items():
+        cleaner.profile = new_profile(name, args)
+
+
+def collect_profiles(cleaners, pipeline_profile):
+    """Returns the profiles of the cleaners' runs and the pipeline steps by name."""
+    profiles = {name: cleaner.profile for name, cleaner in cleaners.items()}
+    profiles["pipeline"] = pipeline_profile
+    return profiles
+
+
+def merge_in_pandas(args, pending, manifest):  # pylint: disable=R0914
+    """
+    Cleans and merges the datasets in memory, writing the pending merged
+    datasets, and returns the metrics and stage profiles of each step.
+    """
+    # Cleaned outputs are cached here, and reused until the raw files change.
+    cache_dir = "./data/cache"
+
+    # Both Oscars cleaners share one read of the_oscar_award.csv.
+    shared_sources = SharedSources()
+    # Reuse parsed review scores from previous runs.
+    score_cache = ScoreCache(path="./data/score_cache.json")
+
+    # None of the cleaners depend on each other, so run them concurrently.
+    cleaners = {
+        "any_win": AnyWinOscarsDataCleaner(
+            cache_dir=cache_dir, force=args.force, shared_sources=shared_sources
+        ),
+        "best_picture": BestPictureOscarsDataCleaner(
+            cache_dir=cache_dir, force=args.force, shared_sources=shared_sources
+        ),
+        "movies": MoviesDataCleaner(cache_dir=cache_dir, force=args.force),
+        "critics": CriticsDataCleaner(
+            score_cache=score_cache,
+            n_workers=args.critics_workers,
+            cache_dir=cache_dir,
+            force=args.force,
+        ),
+    }
+    profile_cleaners(cleaners, args)
+    outputs = run_cleaners(cleaners, max_workers=args.workers)
+    profile = new_profile("pipeline", args)
+
+    # First, merge the two Rotten Tomatoes datasets together.
+    # Merge just the movie title from movies data onto critics data.
+    # We are only using the critic scores at this time, but this may change.
+    merge_metrics = CleaningMetrics()
+    with profile.stage("merge_movie_titles", rows_in=outputs["critics"].shape[0]) as stage:
+        critics_data = merge_movie_titles(
+            outputs["critics"], outputs["movies"], metrics=merge_metrics
+        )
+        stage["rows_out"] = critics_data.shape[0]
+
+    # At this point, data should be uniquely identified by critic name and
+    # rotten tomatoes link.
+
+    if args.level == "movie":
+        # Reduce to one row per movie before merging, rather than one per review.
+        with profile.stage("aggregate_critics", rows_in=critics_data.shape[0]) as stage:
+            critics_data = aggregate_critics(critics_data)
+            stage["rows_out"] = critics_data.shape[0]
+
+    # Merge the oscars data onto rotten tomatoes on movie title.
+    # The Oscars time series goes back much farther than Rotten Tomatoes (1928 vs 1998),
+    # and some movie titles are different.
+    # Fuzzy title matches are cached, and reused while the titles stay the same.
+    matcher = (
+        TitleMatcher(cache_path="./data/title_matches.json")
+        if args.match_titles
+        else None
     )
+    report = {name: cleaner.metrics for name, cleaner in cleaners.items()}
+    report["merge"] = merge_metrics
+    for name, checkpoint in pending.items():
+        metrics = CleaningMetrics()
+        with manifest.stage(name, **checkpoint):
+            with profile.stage(f"merge_{name}", rows_in=outputs[name].shape[0]) as stage:
+                merged = merge_oscars(
+                    outputs[name],
+                    critics_data,
+                    metrics=metrics,
+                    matcher=matcher,
+                    **identity_columns(name, args),
+                )
+                stage["rows_out"] = merged.shape[0]
+            report[f"{name}_merge"] = metrics
+
+            print(f"Writing {name.replace('_', ' ')} data...")
+            with profile.stage(f"write_{name}", rows_in=merged.shape[0]):
+                write_outputs(f"{name}_data", merged, csv=args.csv)
+    profile.finish()
+    return report, collect_profiles(cleaners, profile)
 
-# At this point, data should be uniquely identified by critic name and rotten tomatoes link.
 
-# Merge the oscars data onto rotten tomatoes on movie title.
-# The Oscars time series goes back much farther than Rotten Tomatoes (1928 vs 1998),
-# and some movie titles are different.
-best_picture_data.rename(columns={"film": "movie_title"}, inplace=True)
-any_win_data.rename(columns={"film": "movie_title"}, inplace=True)
+def merge_in_sqlite(args, pending, manifest):  # pylint: disable=R0914
+    """
+    Streams the raw files in chunks into an SQLite database and merges them there,
+    so the full critic reviews are never held in memory, writing the pending
+    merged datasets. Returns the metrics and stage profiles of each step. The
+    outputs are the same as those of merge_in_pandas.
+    """
+    backend = SqlBackend(path="./data/pipeline.sqlite")
+    # Any win counts are summed in the database from the cleaned Oscars rows, as
+    # AnyWinOscarsDataCleaner cannot run in chunks.
+    chunking = {"chunksize": args.chunksize, "prefetch_depth": args.prefetch}
+    cleaners = {
+        "oscars": OscarsDataCleaner(**chunking),
+        "best_picture": BestPictureOscarsDataCleaner(**chunking),
+        "movies": MoviesDataCleaner(**chunking),
+        "critics": CriticsDataCleaner(
+            score_cache=ScoreCache(path="./data/score_cache.json"),
+            n_workers=args.critics_workers,
+            **chunking,
+        ),
+    }
+    profile_cleaners(cleaners, args)
+    report = {}
+    for name, cleaner in cleaners.items():
+        _, report[name] = cleaner.run(sink=backend.sink(name), return_metrics=True)
+    profile = new_profile("pipeline", args)
+    with profile.stage("any_win"):
+        backend.any_win("oscars", "any_win")
 
-# Do an inner merge, to drop movies we don't have scores for
-# We will expect this to expand the rows, because there is more than 1 critic review per movie
-best_picture_data = best_picture_data.merge(critics_data, on="movie_title", how="inner")
-best_picture_data = best_picture_data.drop_duplicates()
+    merge_metrics = CleaningMetrics()
+    with profile.stage("merge_movie_titles"):
+        backend.merge_movie_titles(
+            "critics", "movies", "critics_titled", metrics=merge_metrics
+        )
+    critics_table = "critics_titled"
+    if args.level == "movie":
+        with profile.stage("aggregate_critics"):
+            backend.aggregate_critics("critics_titled", "critics_aggregated")
+        critics_table = "critics_aggregated"
 
-print("Writing best picture data...")
-best_picture_data.to_csv("./data/best_picture_data.csv")
+    report["merge"] = merge_metrics
+    for name, checkpoint in pending.items():
+        metrics = CleaningMetrics()
+        with manifest.stage(name, **checkpoint):
+            with profile.stage(f"merge_{name}"):
+                backend.merge_oscars(
+                    name,
+                    critics_table,
+                    f"{name}_data",
+                    metrics=metrics,
+                    **identity_columns(name, args),
+                )
+            report[f"{name}_merge"] = metrics
 
+            print(f"Writing {name.replace('_', ' ')} data...")
+            with profile.stage(f"write_{name}") as stage:
+                stage["rows_in"] = write_output_chunks(
+                    f"{name}_data",
+                    backend.read(f"{name}_data", chunksize=args.chunksize),
+                    csv=args.csv,
+                )
+    backend.close()
+    profile.finish()
+    return report, collect_profiles(cleaners, profile)
 
-# Do an inner merge, to drop movies we don't have scores for
-any_win_data = any_win_data.merge(critics_data, on="movie_title", how="inner")
-any_win_data = any_win_data.drop_duplicates()
 
-print("Writing any win data...")
-any_win_data.to_csv("./data/any_win_data.csv")
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,25 @@
 """Runs data download steps."""
 
+import argparse
+
+from utils.columnar import ingest_sources  # pylint: disable=E0401
+from utils.data_cleaning import (  # pylint: disable=E0401
+    CriticsDataCleaner,
+    MoviesDataCleaner,
+    OscarsDataCleaner,
+)
 from utils.data_download import (  # pylint: disable=E0401
     get_kaggle_creds,
     download_kaggle_datasets,
 )
+from utils.mirror import DatasetMirror  # pylint: disable=E0401
+from utils.synthetic import write_synthetic_datasets  # pylint: disable=E0401
 # Set the location for where you saved the kaggle.json file
 # Reference doc strings in utils/data_download for more
 # information regarding the kaggle.json file
 # pylint: disable=C0103
 kaggle_json_file_loc = "rotten_tomatoes/kaggle.json"
 
-username, password = get_kaggle_creds(kaggle_json_file_loc)
-
 # Set the location for the files downloaded from kaggle should be saved
 # pylint: disable=C0103
 output_loc = "data/"
@@ -23,7 +31,112 @@ kaggle_dataset_list = [
     "unanimad/the-oscar-award",
 ]
 
-# Download the dataset(s) from Kaggle
-download_kaggle_datasets(username, password, kaggle_dataset_list, output_loc)
+# Cleaners whose raw csvs are converted to typed columnar files once downloaded,
+# so they are parsed once per dataset version rather than on every run
+raw_cleaners = [CriticsDataCleaner, MoviesDataCleaner, OscarsDataCleaner]
+
+
+def main():
+    """
+    Downloads the Kaggle datasets which are not already downloaded, from Kaggle
+    or a mirror, or writes synthetic ones, then converts the raw csvs to typed
+    columnar files.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Download every dataset, even if its files are already downloaded.",
+    )
+    parser.add_argument(
+        "--source",
+        default=None,
+        help=(
+            "Directory or file:// URL of a mirror, e.g. another machine's data "
+            "directory, to copy the datasets from instead of Kaggle. No Kaggle "
+            "credentials are needed."
+        ),
+    )
+    parser.add_argument(
+        "--keep-archives",
+        action="store_true",
+        help=(
+            "Keep the downloaded zip files instead of extracting them. The csvs are "
+            "read straight out of them when cleaning."
+        ),
+    )
+    parser.add_argument(
+        "--no-ingest",
+        action="store_true",
+        help=(
+            "Do not convert the raw csvs to typed Parquet files. The cleaners then "
+            "parse the csvs on every run."
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=len(kaggle_dataset_list),
+        help="Number of datasets to download at once. Defaults to all of them.",
+    )
+    parser.add_argument(
+        "--synthetic",
+        type=float,
+        metavar="SCALE",
+        default=None,
+        help=(
+            "Instead of downloading, write synthetic raw files with SCALE times the "
+            "Kaggle row counts, e.g. to benchmark the pipeline offline."
+        ),
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed of the synthetic raw files, with --synthetic.",
+    )
+    args = parser.parse_args()
+
+    if args.synthetic is not None:
+        write_synthetic_datasets(output_loc, scale=args.synthetic, seed=args.seed)
+        print(f"Synthetic data written to the following directory {output_loc}")
+    else:
+        download(args)
+
+    # Columnar files which are fresh, i.e. whose raw csvs are unchanged since they
+    # were written, are kept.
+    if not args.no_ingest:
+        ingested = ingest_sources(raw_cleaners, force=args.force)
+        print(f"Raw csvs converted to the following files {', '.join(ingested)}")
+
+
+def download(args):
+    """Downloads the Kaggle datasets, from Kaggle or a mirror, as set by args."""
+    # Datasets whose upstream version is already downloaded, with files which
+    # still match their checksums in data/kaggle_manifest.json, are skipped, so
+    # a rerun only downloads new versions and datasets which failed.
+    if args.force:
+        mirror = DatasetMirror(output_loc)
+        for kaggle_dataset in kaggle_dataset_list:
+            mirror.forget(kaggle_dataset)
+
+    username, password = None, None
+    if args.source is None:
+        username, password = get_kaggle_creds(kaggle_json_file_loc)
+
+    # Download the dataset(s) from Kaggle
+    download_kaggle_datasets(
+        username,
+        password,
+        kaggle_dataset_list,
+        output_loc,
+        max_workers=args.workers,
+        source=args.source,
+        unzip=not args.keep_archives,
+    )
+
+    print(f"Data successfully downloaded to the following directory {output_loc}")
+
 
-print(f"Data successfully downloaded to the following directory {output_loc}")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""
+Content-addressed Parquet cache of cleaned DataCleaner outputs.
+
+Entries are keyed by a hash of the raw file contents, the cleaner class, its
+version and its columns, so a cached output is only reused while none of these
+have changed. Output cleaned in chunks is written to its entry chunk by chunk
+through a CacheSink. Writing Parquet requires pyarrow.
+
+utils.cache exports the following functions and classes:
+    file_fingerprint
+    CleanedFrameCache
+    CacheSink
+"""
+import hashlib
+import json
+import os
+import tempfile
+from typing import Optional
+
+from .compressed import raw_file
+from .lazy import LazyModule
+
+# Only needed to read and write entries, so modules using file_fingerprint, e.g.
+# the data download, do not import them.
+pd = LazyModule("pandas")
+pa = LazyModule("pyarrow")
+pq = LazyModule("pyarrow.parquet")
+
+# Parquet schema metadata key marking an entry written chunk by chunk.
+CHUNKED_KEY = b"rotten_tomatoes.chunked"
+
+
+def file_fingerprint(path: str, block_size: int = 1 << 20) -> str:
+    """Returns the sha256 hex digest of the contents of the file at path.
+
+    Parameters
+    ----------
+    path : string
+        File to hash
+    block_size : int
+        Number of bytes read at a time
+
+    Returns
+    -------
+    digest : string
+        Hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class CleanedFrameCache:
+    """Directory of cleaned DataFrames stored as Parquet, keyed by content hash."""
+
+    def __init__(self, cache_dir: str) -> None:
+        """
+        Initialize a CleanedFrameCache.
+
+        Parameters:
+        ----------
+        cache_dir: str
+            Directory holding the cached Parquet files. Created on first write.
+        """
+        self.cache_dir = cache_dir
+        self._fingerprints_path = os.path.join(cache_dir, "fingerprints.json")
+
+    def source_fingerprint(self, path: str) -> str:
+        """
+        Returns the content hash of a raw source file.
+
+        Hashes are remembered alongside the file's size and modification time, so
+        an unchanged file is not re-read on every run. Several processes may share
+        the cache: the remembered hashes are read again just before adding one, and
+        written through a temporary file of their own.
+
+        Parameters:
+        ----------
+        path: str
+            Raw file to fingerprint.
+
+        Returns:
+        -------
+        Hex digest of the file contents.
+        """
+        stat = os.stat(path)
+        abs_path = os.path.abspath(path)
+        known = self._read_fingerprints().get(abs_path)
+        if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+            return known["sha256"]
+
+        digest = file_fingerprint(path)
+        # Hashes added by other processes while this file was hashed are kept.
+        fingerprints = self._read_fingerprints()
+        fingerprints[abs_path] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": digest,
+        }
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._write_atomic(
+            self._fingerprints_path, json.dumps(fingerprints).encode("utf-8")
+        )
+        return digest
+
+    def key(self, cleaner) -> str:
+        """
+        Returns the cache key for a DataCleaner's output.
+
+        Parameters:
+        ----------
+        cleaner: DataCleaner
+            Cleaner whose source_path, class, version and keep_columns make up the key.
+            If the raw csv is stored compressed, the compressed file is hashed.
+
+        Returns:
+        -------
+        Hex digest identifying the cleaned output.
+        """
+        parts = [
+            self.source_fingerprint(raw_file(cleaner.source_path)),
+            type(cleaner).__qualname__,
+            str(cleaner.version),
+            repr(list(cleaner.keep_columns)),
+        ]
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def path(self, key: str) -> str:
+        """Returns the Parquet file location for a key."""
+        return os.path.join(self.cache_dir, f"{key}.parquet")
+
+    def get(self, key: str) -> Optional["pd.DataFrame"]:
+        """Returns the cached DataFrame for key, or None on a miss."""
+        if not os.path.exists(self.path(key)):
+            return None
+        data = pd.read_parquet(self.path(key))
+        if CHUNKED_KEY in (pq.read_schema(self.path(key)).metadata or {}):
+            # The chunks' categories are read back in the order they first
+            # appear, rather than sorted as DataFrameSink concatenates them.
+            for col, dtype in data.dtypes.items():
+                if isinstance(dtype, pd.CategoricalDtype):
+                    data[col] = data[col].cat.reorder_categories(sorted(dtype.categories))
+        return data
+
+    def put(self, key: str, data: "pd.DataFrame") -> None:
+        """Stores data under key, replacing any existing entry."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self._tmp_path()
+        try:
+            data.to_parquet(tmp_path)
+            os.replace(tmp_path, self.path(key))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def sink(self, key: str) -> "CacheSink":
+        """Returns a sink storing the chunks written to it under key once closed."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        return CacheSink(self._tmp_path(), self.path(key))
+
+    def invalidate(self, key: str) -> None:
+        """Removes the entry for key, if there is one."""
+        if os.path.exists(self.path(key)):
+            os.remove(self.path(key))
+
+    def _read_fingerprints(self) -> dict:
+        """Returns the remembered hashes, by absolute path of the raw file."""
+        if not os.path.exists(self._fingerprints_path):
+            return {}
+        with open(self._fingerprints_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _tmp_path(self) -> str:
+        """Returns a new empty file in cache_dir, unique to this write, so
+        concurrent writers never replace each other's temporary files."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        os.close(fd)
+        return tmp_path
+
+    def _write_atomic(self, path: str, contents: bytes) -> None:
+        tmp_path = self._tmp_path()
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(contents)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+class CacheSink:
+    """Writes chunks to a cache entry as they arrive, one Parquet row group each."""
+
+    def __init__(self, tmp_path: str, path: str) -> None:
+        """
+        Initialize a CacheSink. Nothing is stored under path until it is closed.
+
+        Parameters:
+        ----------
+        tmp_path: str
+            File the chunks are written to, unique to this sink.
+        path: str
+            Location of the cache entry, replaced by tmp_path on close.
+        """
+        self.tmp_path = tmp_path
+        self.path = path
+        self.chunks_written = 0
+        self.rows_written = 0
+        self._held: Optional["pd.DataFrame"] = None
+        self._writer = None
+        self._schema = None
+
+    def write(self, chunk: "pd.DataFrame") -> None:
+        """
+        Append a chunk, with its index, to the entry.
+
+        The latest chunk is held back until the next one with rows arrives, and
+        chunks without rows are combined with it, since Parquet keeps no
+        categories for an empty row group.
+        """
+        self.chunks_written += 1
+        self.rows_written += chunk.shape[0]
+        if self._held is None:
+            self._held = chunk
+        elif self._held.empty or chunk.empty:
+            # Imported here, as utils.streaming imports pandas.
+            from .streaming import DataFrameSink  # pylint: disable=C0415
+
+            combined = DataFrameSink()
+            combined.write(self._held)
+            combined.write(chunk)
+            self._held = combined.result()
+        else:
+            self._write_held()
+            self._held = chunk
+
+    def close(self) -> None:
+        """Store the chunks written as the cache entry, replacing any existing one.
+        Nothing is stored if no chunk was written."""
+        if self._held is None:
+            self.abort()
+            return
+        self._write_held()
+        self._writer.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self) -> None:
+        """Discard the chunks written, leaving any existing entry in place."""
+        if self._writer is not None:
+            self._writer.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+    def _write_held(self) -> None:
+        """Write the held chunk as a row group."""
+        if self._writer is None:
+            schema = pa.Schema.from_pandas(self._held, preserve_index=True)
+            # Chunks have categories of their own, so every chunk's dictionary
+            # indices are widened to one type.
+            self._schema = pa.schema(
+                [
+                    pa.field(field.name, pa.dictionary(pa.int32(), field.type.value_type))
+                    if pa.types.is_dictionary(field.type)
+                    else field
+                    for field in schema
+                ],
+                metadata={**schema.metadata, CHUNKED_KEY: b"1"},
+            )
+            self._writer = pq.ParquetWriter(self.tmp_path, self._schema)
+        self._writer.write_table(
+            pa.Table.from_pandas(self._held, schema=self._schema, preserve_index=True)
+        )
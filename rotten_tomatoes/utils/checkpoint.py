@@ -0,0 +1,216 @@
+"""
+Checkpoints of pipeline stages, so a rerun only repeats the stages that failed
+or whose inputs changed.
+
+A StageManifest records, for each completed stage, the fingerprints of its input
+files, its parameters and the fingerprints of its output files or directories.
+A stage is complete while its inputs and parameters are unchanged and its
+outputs are still there, unmodified. When a stage reruns, its outputs change,
+so every downstream stage taking them as inputs reruns too. File fingerprints
+are content hashes, remembered alongside each file's size and modification
+time, so unchanged files are not re-read on every run.
+
+utils.checkpoint exports the following classes and functions:
+    StageManifest
+    snapshot_files
+"""
+import datetime
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .cache import file_fingerprint
+
+# Fingerprint of a path which does not exist.
+MISSING = "missing"
+
+
+class StageManifest:
+    """JSON record of completed pipeline stages, their inputs and outputs."""
+
+    def __init__(self, path: str) -> None:
+        """
+        Load the manifest at path, or start an empty one.
+
+        Parameters:
+        ----------
+        path: str
+            JSON file the manifest is kept in. Written after each stage.
+        """
+        self.path = path
+        self._manifest = {"stages": {}, "files": {}}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self._manifest = json.load(f)
+
+    def status(self, stage: str) -> Optional[str]:
+        """Returns "complete" or "failed" for a recorded stage, or None."""
+        entry = self._manifest["stages"].get(stage)
+        return None if entry is None else entry["status"]
+
+    def outputs(self, stage: str) -> List[str]:
+        """Returns the outputs recorded for a stage, or [] if it was not recorded."""
+        entry = self._manifest["stages"].get(stage)
+        return [] if entry is None else list(entry["outputs"])
+
+    def is_complete(
+        self,
+        stage: str,
+        inputs: Sequence[str] = (),
+        params: Optional[dict] = None,
+        outputs: Optional[Sequence[str]] = None,
+    ) -> bool:
+        """
+        Whether stage completed with these inputs and params, and its outputs are
+        unchanged since.
+
+        Parameters:
+        ----------
+        stage: str
+            Stage name.
+        inputs: Sequence[str]
+            Files or directories the stage reads.
+        params: Optional[dict]
+            JSON-serializable settings the stage's output depends on.
+        outputs: Optional[Sequence[str]]
+            Files or directories the stage writes, which must all have been
+            recorded. Defaults to the outputs recorded for the stage.
+
+        Returns:
+        -------
+        True if the stage can be skipped.
+        """
+        entry = self._manifest["stages"].get(stage)
+        if entry is None or entry["status"] != "complete":
+            return False
+        if entry["key"] != self._key(inputs, params):
+            return False
+        recorded = entry["outputs"]
+        if outputs is not None and any(
+            os.path.abspath(path) not in recorded for path in outputs
+        ):
+            return False
+        return all(
+            self.fingerprint(path) == fingerprint
+            for path, fingerprint in recorded.items()
+        )
+
+    @contextmanager
+    def stage(
+        self,
+        stage: str,
+        inputs: Sequence[str] = (),
+        params: Optional[dict] = None,
+        outputs: Sequence[str] = (),
+    ) -> Iterator[List[str]]:
+        """
+        Run a stage, recording it as complete, with the fingerprints of its
+        outputs, if it succeeds, or as failed if it raises.
+
+        Parameters:
+        ----------
+        stage, inputs, params, outputs:
+            As for is_complete. Inputs are fingerprinted before the stage runs.
+
+        Returns:
+        -------
+        Context manager yielding the list of outputs, which the stage may extend
+        with outputs only known once it has run.
+        """
+        key = self._key(inputs, params)
+        outputs = list(outputs)
+        try:
+            yield outputs
+        except BaseException as error:
+            self._manifest["stages"][stage] = self._entry(key, inputs, params, error=error)
+            self.save()
+            raise
+        self._manifest["stages"][stage] = self._entry(key, inputs, params, outputs)
+        self.save()
+
+    def invalidate(self, stage: str) -> None:
+        """Forget a stage, so it reruns."""
+        if self._manifest["stages"].pop(stage, None) is not None:
+            self.save()
+
+    def fingerprint(self, path: str) -> str:
+        """
+        Returns the content hash of a file, or of every file in a directory (with
+        their relative paths), or MISSING if path does not exist.
+        """
+        if os.path.isdir(path):
+            digest = hashlib.sha256()
+            for relative_path in sorted(snapshot_files(path)):
+                digest.update(relative_path.encode("utf-8"))
+                digest.update(self.fingerprint(os.path.join(path, relative_path)).encode())
+            return digest.hexdigest()
+        if not os.path.exists(path):
+            return MISSING
+
+        stat = os.stat(path)
+        files = self._manifest["files"]
+        known = files.get(os.path.abspath(path))
+        if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+            return known["sha256"]
+        digest = file_fingerprint(path)
+        files[os.path.abspath(path)] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": digest,
+        }
+        return digest
+
+    def save(self) -> None:
+        """Write the manifest, replacing the previous one atomically."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._manifest, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def _entry(
+        self,
+        key: str,
+        inputs: Sequence[str],
+        params: Optional[dict],
+        outputs: Sequence[str] = (),
+        error: Optional[BaseException] = None,
+    ) -> dict:
+        """Returns the manifest entry of a completed, or failed, stage."""
+        return {
+            "status": "failed" if error is not None else "complete",
+            "key": key,
+            "inputs": [os.path.abspath(path) for path in inputs],
+            "params": params,
+            "outputs": {}
+            if error is not None
+            else {os.path.abspath(path): self.fingerprint(path) for path in outputs},
+            "finished": datetime.datetime.now().isoformat(timespec="seconds"),
+            "error": None if error is None else repr(error),
+        }
+
+    def _key(self, inputs: Sequence[str], params: Optional[dict]) -> str:
+        """Returns a hash of the input fingerprints and params of a stage."""
+        parts = [json.dumps(params, sort_keys=True)]
+        parts += [
+            f"{os.path.abspath(path)}\t{self.fingerprint(path)}" for path in inputs
+        ]
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def snapshot_files(directory: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Returns the path (relative to directory) -> (size, modification time in ns) of
+    every file under directory.
+    """
+    snapshot = {}
+    for root, _, file_names in os.walk(directory):
+        for file_name in file_names:
+            path = os.path.join(root, file_name)
+            stat = os.stat(path)
+            snapshot[os.path.relpath(path, directory)] = (stat.st_size, stat.st_mtime_ns)
+    return snapshot
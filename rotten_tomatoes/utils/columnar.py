@@ -0,0 +1,263 @@
+"""
+Typed columnar copies of the raw csvs, parsed once per dataset version.
+
+ingest_csv parses a raw csv once, wherever it is stored (see utils.compressed),
+and writes it to a Parquet file next to it, e.g. data/the_oscar_award.parquet.
+Columns with a declared dtype are parsed as read_csv would parse them for a
+cleaner, and the other columns are kept as strings. Category columns are stored
+as strings, which Parquet dictionary-encodes, and are turned back into
+categories with the categories read_csv would give when read.
+
+Rows keep their order in the csv, and are written in row groups with min/max
+statistics on rotten_tomatoes_link and year_film, so readers filtering on these
+can skip row groups. The Kaggle files are already ordered by them.
+
+The raw file's name, size and modification time, and the declared dtypes, are
+kept in the Parquet metadata. A columnar file is fresh while they are
+unchanged, and otherwise the raw csv is read again. Requires pyarrow.
+
+utils.columnar exports the following functions:
+    columnar_path
+    ingest_csv
+    fresh_columnar
+    read_columnar
+    ingest_sources
+"""
+import json
+import os
+import tempfile
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .compressed import open_raw, raw_file
+
+# Rows per Parquet row group, which is also the number of rows parsed at a time.
+ROW_GROUP_SIZE = 65536
+# Columns with min/max statistics in each row group.
+STATISTICS_COLUMNS = ("rotten_tomatoes_link", "year_film")
+# Key of the ingest metadata in the Parquet schema metadata.
+METADATA_KEY = b"rotten_tomatoes.ingest"
+
+
+def columnar_path(path: str) -> str:
+    """Returns the path of the columnar copy of the raw csv at path."""
+    return f"{os.path.splitext(path)[0]}.parquet"
+
+
+def _source_stamp(path: str) -> dict:
+    """Returns the name, size and modification time of the file the raw csv at
+    path is stored in."""
+    source = raw_file(path)
+    stat = os.stat(source)
+    return {
+        "source": os.path.basename(source),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+
+
+def _arrow_type(dtype: str) -> pa.DataType:
+    """Returns the Parquet column type a declared pandas dtype is stored as."""
+    if dtype in ("object", "category", "str"):
+        return pa.string()
+    if dtype == "boolean":
+        return pa.bool_()
+    return pa.from_numpy_dtype(np.dtype(dtype))
+
+
+def _metadata(path: str) -> Optional[dict]:
+    """Returns the ingest metadata of the columnar file at path, or None if there
+    is no such file, or it was not written by ingest_csv."""
+    if not os.path.exists(path):
+        return None
+    metadata = pq.read_schema(path).metadata or {}
+    if METADATA_KEY not in metadata:
+        return None
+    return json.loads(metadata[METADATA_KEY])
+
+
+def fresh_columnar(path: str, dtypes: Dict[str, str]) -> Optional[str]:
+    """
+    Returns the columnar copy of the raw csv at path, if it is fresh for dtypes.
+
+    Parameters:
+    ----------
+    path: str
+        Path of the uncompressed raw csv.
+    dtypes: Dict[str, str]
+        Column name -> dtype of the columns to read. Each must have been declared
+        with the same dtype when the csv was ingested.
+
+    Returns:
+    -------
+    Path of the columnar file, or None if there is none, or the raw file has
+    changed since it was written, or a column was not declared with its dtype.
+    """
+    target = columnar_path(path)
+    metadata = _metadata(target)
+    if metadata is None:
+        return None
+    try:
+        stamp = _source_stamp(path)
+    except FileNotFoundError:
+        return None
+    if any(metadata[name] != value for name, value in stamp.items()):
+        return None
+    if any(metadata["dtypes"].get(col) != dtype for col, dtype in dtypes.items()):
+        return None
+    return target
+
+
+def _tmp_path(target: str) -> str:
+    """Returns a new empty file next to target, unique to this write, so
+    concurrent ingests never replace each other's temporary files."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target) or ".", suffix=".tmp")
+    os.close(fd)
+    return tmp_path
+
+
+def ingest_csv(
+    path: str,
+    dtypes: Optional[Dict[str, str]] = None,
+    force: bool = False,
+    row_group_size: int = ROW_GROUP_SIZE,
+) -> str:
+    """
+    Write a typed columnar copy of the raw csv at path, unless a fresh one exists.
+
+    Parameters:
+    ----------
+    path: str
+        Path of the uncompressed raw csv. It may be stored compressed.
+    dtypes: Optional[Dict[str, str]]
+        Column name -> pandas dtype of the columns to parse, as in a cleaner's
+        schema. Other columns are kept as strings.
+    force: bool
+        If True, write the columnar copy even if a fresh one exists.
+    row_group_size: int
+        Number of rows in each row group.
+
+    Returns:
+    -------
+    Path of the columnar file.
+
+    Raises:
+    ------
+    FileNotFoundError if the raw csv is not found.
+    """
+    dtypes = dict(dtypes or {})
+    target = columnar_path(path)
+    if not force and fresh_columnar(path, dtypes) == target:
+        return target
+
+    stamp = _source_stamp(path)
+    with open_raw(path) as source:
+        columns = list(pd.read_csv(source, nrows=0).columns)
+    parse_dtypes = {col: dtypes.get(col, "object") for col in columns}
+    parse_dtypes.update({col: "object" for col, dtype in dtypes.items() if dtype == "category"})
+    schema = pa.schema([(col, _arrow_type(parse_dtypes[col])) for col in columns])
+    metadata = dict(stamp, dtypes={col: dtypes[col] for col in columns if col in dtypes})
+
+    tmp_path = _tmp_path(target)
+    try:
+        with open_raw(path) as source:
+            reader = pd.read_csv(source, dtype=parse_dtypes, chunksize=row_group_size)
+            with pq.ParquetWriter(
+                tmp_path,
+                schema.with_metadata({METADATA_KEY: json.dumps(metadata)}),
+                compression="snappy",
+                write_statistics=[col for col in STATISTICS_COLUMNS if col in columns],
+            ) as writer:
+                for chunk in reader:
+                    writer.write_table(
+                        pa.Table.from_pandas(chunk, schema=schema, preserve_index=False),
+                        row_group_size=row_group_size,
+                    )
+        os.replace(tmp_path, target)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return target
+
+
+def ingest_sources(cleaners: Iterable, force: bool = False) -> List[str]:
+    """
+    Ingest the raw csv of each cleaner, declaring the dtypes in its schema. The
+    schemas of cleaners reading the same csv are combined.
+
+    Parameters:
+    ----------
+    cleaners: Iterable
+        DataCleaner classes or instances, with a source_path and schema.
+    force: bool
+        If True, write each columnar copy even if a fresh one exists.
+
+    Returns:
+    -------
+    Paths of the columnar files.
+    """
+    sources = {}
+    for cleaner in cleaners:
+        sources.setdefault(cleaner.source_path, {}).update(cleaner.schema)
+    return [ingest_csv(path, dtypes, force=force) for path, dtypes in sources.items()]
+
+
+def _to_frame(table: Union[pa.Table, pa.RecordBatch], dtypes: Dict[str, str]) -> pd.DataFrame:
+    """Converts columns read from a columnar file to their declared dtypes."""
+    data = table.to_pandas()
+    for col, dtype in dtypes.items():
+        if dtype in ("object", "str"):
+            # Missing strings are NaN in read_csv output, not None.
+            data[col] = data[col].fillna(np.nan)
+        else:
+            data[col] = data[col].astype(dtype)
+    return data
+
+
+def read_columnar(
+    path: str,
+    dtypes: Dict[str, str],
+    chunksize: Optional[int] = None,
+    filters: Optional[List[tuple]] = None,
+) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+    """
+    Read columns of a columnar file written by ingest_csv.
+
+    Parameters:
+    ----------
+    path: str
+        Path of the columnar file.
+    dtypes: Dict[str, str]
+        Column name -> dtype of the columns to read, in order.
+    chunksize: Optional[int]
+        If set, read the rows in chunks of at most this many rows.
+    filters: Optional[List[tuple]]
+        Row filters, as in pandas.read_parquet, e.g. [("year_film", ">=", 2000)].
+        Row groups whose statistics rule them out are skipped. Not supported in
+        chunked mode.
+
+    Returns:
+    -------
+    Pandas DataFrame with the rows in csv order and a fresh RangeIndex, or an
+    iterator of DataFrame chunks continuing the index, as read_csv would give.
+    """
+    columns = list(dtypes)
+    if chunksize is None:
+        return _to_frame(pq.read_table(path, columns=columns, filters=filters), dtypes)
+    if filters is not None:
+        raise ValueError("Filters cannot be used in chunked mode!")
+    return _read_chunks(path, dtypes, chunksize)
+
+
+def _read_chunks(path: str, dtypes: Dict[str, str], chunksize: int) -> Iterator[pd.DataFrame]:
+    """Yields the columns in dtypes of a columnar file in chunks."""
+    offset = 0
+    batches = pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=list(dtypes))
+    for batch in batches:
+        chunk = _to_frame(batch, dtypes)
+        chunk.index = pd.RangeIndex(offset, offset + chunk.shape[0])
+        offset += chunk.shape[0]
+        yield chunk
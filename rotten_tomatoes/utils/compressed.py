@@ -0,0 +1,89 @@
+"""
+Raw csvs read in place from compressed files.
+
+A raw csv at path may instead be stored compressed next to it: as path.gz, as
+path.zst (which needs the zstandard package), or as a member of a zip archive in
+the same directory, like the archives the Kaggle API downloads. The csv is then
+decompressed as it is parsed, without extracting it to disk. An uncompressed csv
+at path takes precedence.
+
+utils.compressed exports the following functions:
+    raw_source
+    raw_file
+    open_raw
+"""
+import glob
+import os
+import zipfile
+from contextlib import contextmanager
+from typing import IO, Iterator, Optional, Tuple, Union
+
+# Suffixes of compressed raw csvs, which pandas decompresses itself.
+COMPRESSED_SUFFIXES = (".gz", ".zst")
+
+
+def raw_source(path: str) -> Tuple[str, Optional[str]]:
+    """
+    Find the file the raw csv at path is stored in.
+
+    Parameters:
+    ----------
+    path: str
+        Path of the uncompressed raw csv.
+
+    Returns:
+    -------
+    Tuple of the file on disk, and the name of the csv's member in it if the
+    file is a zip archive, else None.
+
+    Raises:
+    ------
+    FileNotFoundError if the csv is stored in none of the supported ways.
+    """
+    if os.path.exists(path):
+        return path, None
+    for suffix in COMPRESSED_SUFFIXES:
+        if os.path.exists(path + suffix):
+            return path + suffix, None
+
+    # Zip archives in the same directory, with the csv at any depth.
+    file_name = os.path.basename(path)
+    for archive_path in sorted(glob.glob(os.path.join(os.path.dirname(path), "*.zip"))):
+        with zipfile.ZipFile(archive_path) as archive:
+            for member in archive.namelist():
+                if member.rsplit("/", 1)[-1] == file_name:
+                    return archive_path, member
+    raise FileNotFoundError(
+        f"{path} was not found, uncompressed, compressed as "
+        f"{' or '.join(COMPRESSED_SUFFIXES)}, or in a zip archive next to it."
+    )
+
+
+def raw_file(path: str) -> str:
+    """Returns the file on disk the raw csv at path is stored in, e.g. to
+    fingerprint it."""
+    return raw_source(path)[0]
+
+
+@contextmanager
+def open_raw(path: str) -> Iterator[Union[str, IO[bytes]]]:
+    """
+    Open the raw csv at path for pandas.read_csv, wherever it is stored.
+
+    Parameters:
+    ----------
+    path: str
+        Path of the uncompressed raw csv.
+
+    Returns:
+    -------
+    Context manager yielding a path, which pandas decompresses by its suffix if
+    needed, or a stream of the csv's zip archive member, closed on exit.
+    """
+    file_path, member = raw_source(path)
+    if member is None:
+        yield file_path
+        return
+    with zipfile.ZipFile(file_path) as archive:
+        with archive.open(member) as stream:
+            yield stream
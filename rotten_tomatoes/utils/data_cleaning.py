@@ -1,12 +1,30 @@
 """Helper classes for raw data cleaning."""
-from typing import Optional
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple, Union
+import numpy as np
 import pandas as pd
 
-# pylint: disable=R0903,C0103
+from .cache import CleanedFrameCache
+from .columnar import fresh_columnar, read_columnar
+from .compressed import open_raw, raw_source
+from .dedup import dedup
+from .metrics import CleaningMetrics
+from .profiling import StageProfile
+from .score_cache import ScoreCache
+from .shared_source import SharedSources
+from .validation import ColumnRule, FrameValidator, UniqueRule
 
+# Re-exported, so cleaner users can catch it from this module.
+from .validation import ValidationException  # pylint: disable=W0611
+from .streaming import DataFrameSink, prefetch
 
-class ValidationException(Exception):
-    """Raised for data validation errors."""
+# pylint: disable=R0902,R0903,C0103
+
+# Score cache shared by every CriticsDataCleaner in the process.
+_SCORE_CACHE = ScoreCache()
 
 
 class MergeExpansionException(Exception):
@@ -16,36 +34,306 @@ class MergeExpansionException(Exception):
 class DataCleaner:
     """Base class. Defines interface for data cleaning."""
 
+    # Column name -> dtype of the raw columns to keep. Only these columns are parsed.
+    schema = None
     keep_columns = None
+    source_path = None
+    # Whether _clean and _validate can be applied to one chunk of rows at a time.
+    chunkable = True
+    # Bump when a change to the cleaning logic should invalidate cached outputs.
+    version = "1"
+    # Declarative validation rules, checked by _validate.
+    rules = []
+    unique_rules = []
+    # Columns identifying a row of the cleaned output, so rows repeating them are
+    # duplicates (see utils.dedup). None means every column.
+    identity_columns = None
+    # Cleaner class whose _clean output can be shared by every cleaner built on it.
+    # For such cleaners, _clean(data) must equal _derive(shared_base._clean(data)).
+    shared_base = None
+
+    def __init__(
+        self,
+        chunksize: Optional[int] = None,
+        cache_dir: Optional[str] = None,
+        force: bool = False,
+        shared_sources: Optional[SharedSources] = None,
+        prefetch_depth: int = 0,
+    ):
+        """
+        Initialize a DataCleaner class.
 
-    def __init__(self):
-        """Initialize a DataCleaner class."""
-
-    def run(self) -> pd.DataFrame():
+        Parameters:
+        ----------
+        chunksize: Optional[int]
+            If set, stream the raw csv in chunks of this many rows, cleaning and
+            validating each chunk in turn, so only one chunk is held in memory.
+        cache_dir: Optional[str]
+            If set, cleaned outputs are cached as Parquet in this directory, keyed
+            by the raw file contents, cleaner class and version.
+        force: bool
+            If True, ignore any cached output, and overwrite it with a fresh run.
+        shared_sources: Optional[SharedSources]
+            If set, and shared_base is declared, the base-cleaned source is read once
+            per registry and shared with other cleaners built on the same base.
+        prefetch_depth: int
+            In chunked mode, if more than 0, up to this many chunks are read ahead
+            in a background thread while the current chunk is cleaned.
         """
-        Runs all data loading and cleaning steps.
+        if chunksize is not None and not self.chunkable:
+            raise ValueError(f"{type(self).__name__} cannot be run in chunks!")
+        if chunksize is not None and shared_sources is not None:
+            raise ValueError("Shared sources cannot be used in chunked mode!")
+        if prefetch_depth and chunksize is None:
+            raise ValueError("Chunks can only be prefetched in chunked mode!")
+        self.chunksize = chunksize
+        self.cache = CleanedFrameCache(cache_dir) if cache_dir is not None else None
+        self.force = force
+        self.shared_sources = shared_sources
+        self.prefetch_depth = prefetch_depth
+        self._chunk_state = {}
+        # Counters for the latest run, e.g. rows read and written.
+        self.metrics = CleaningMetrics()
+        # Time, rows and memory of each stage of the latest run. Replace it to
+        # trace memory or profile with cProfile.
+        self.profile = StageProfile(type(self).__name__)
+
+    def run(
+        self, sink=None, return_metrics: bool = False
+    ) -> Union[Optional[pd.DataFrame], Tuple[Optional[pd.DataFrame], CleaningMetrics]]:
+        """
+        Runs all data loading and cleaning steps, or loads the cached output of a
+        previous run if caching is enabled and nothing has changed.
+
+        Parameters:
+        ----------
+        sink: Optional sink (see utils.streaming)
+            If given, cleaned data is written to the sink instead of returned. In
+            chunked mode each chunk is written as soon as it has been validated.
+        return_metrics: bool
+            If True, return the counters for the run along with the data.
 
         Returns:
         -------
-        Pandas DataFrame of cleaned, validated data
+        Pandas DataFrame of cleaned, validated data, or None if a sink was given,
+        and if return_metrics, a tuple of it and the CleaningMetrics of the run.
+        Counters for the run are also left in self.metrics, and the time, rows and
+        memory of each stage (read, clean, validate, write, cache_load and
+        cache_store) in self.profile.
         """
-        data = self._read()
-        data = self._clean(data)
-        self._validate(data)
+        data = self._run(sink)
+        return (data, self.metrics) if return_metrics else data
 
+    def _run(self, sink=None) -> Optional[pd.DataFrame]:
+        """Runs the cleaner, or loads its cached output. See run."""
+        self.metrics = CleaningMetrics()
+        self.profile.reset()
+        try:
+            if self.cache is None:
+                return self._run_uncached(sink)
+
+            key = self.cache.key(self)
+            data = None
+            if not self.force:
+                with self.profile.stage("cache_load") as stage:
+                    data = self.cache.get(key)
+                    stage["rows_out"] = None if data is None else data.shape[0]
+            if data is None and self.chunksize is not None:
+                # Each chunk is stored as soon as it has been validated, so with a
+                # sink the whole output is never held in memory.
+                store = self.cache.sink(key)
+                try:
+                    data = self._run_uncached(sink, store)
+                except BaseException:
+                    store.abort()
+                    raise
+                # Rows were counted into cache_store as each chunk was written.
+                with self.profile.stage("cache_store"):
+                    store.close()
+                return data
+            if data is None:
+                data = self._run_uncached()
+                with self.profile.stage("cache_store", rows_in=data.shape[0]):
+                    self.cache.put(key, data)
+            else:
+                self.metrics.add("cache_hits")
+                self.metrics.add("rows_out", data.shape[0])
+            if sink is None:
+                return data
+            self._write(sink, data)
+            sink.close()
+            return None
+        finally:
+            self.profile.finish()
+
+    def invalidate(self) -> None:
+        """Remove the cached output for the current raw file, if caching is enabled."""
+        if self.cache is not None:
+            self.cache.invalidate(self.cache.key(self))
+
+    def _run_uncached(self, sink=None, store=None) -> Optional[pd.DataFrame]:
+        """
+        Read, clean and validate the raw csv. See run for sink.
+
+        Parameters:
+        ----------
+        store: Optional[CacheSink]
+            In chunked mode, a cache entry each chunk is also written to. Left open.
+        """
+        if self.chunksize is None:
+            shared = self.shared_sources is not None and self.shared_base is not None
+            with self.profile.stage("read") as stage:
+                data = self._read_shared() if shared else self._read()
+                stage["rows_out"] = data.shape[0]
+            if not shared:
+                self.metrics.add("rows_read", data.shape[0])
+            with self.profile.stage("clean", rows_in=data.shape[0]) as stage:
+                data = self._derive(data) if shared else self._clean(data)
+                stage["rows_out"] = data.shape[0]
+            with self.profile.stage("validate", rows_in=data.shape[0]):
+                self._validate(data)
+            self.metrics.add("rows_out", data.shape[0])
+            if sink is None:
+                return data
+            self._write(sink, data)
+            sink.close()
+            return None
+
+        collect = sink is None
+        if collect:
+            sink = DataFrameSink()
+        self._chunk_state = {"validator": self._validator()}
+        chunks = self._read()
+        if self.prefetch_depth:
+            chunks = prefetch(chunks, self.prefetch_depth)
+        # With prefetching, read is the time spent waiting for each chunk.
+        for chunk in self.profile.iterate("read", chunks):
+            self.metrics.add("rows_read", chunk.shape[0])
+            with self.profile.stage("clean", rows_in=chunk.shape[0]) as stage:
+                chunk = self._clean_chunk(chunk)
+                stage["rows_out"] = chunk.shape[0]
+            with self.profile.stage("validate", rows_in=chunk.shape[0]):
+                self._validate_chunk(chunk)
+            self.metrics.add("rows_out", chunk.shape[0])
+            self._write(sink, chunk)
+            if store is not None:
+                with self.profile.stage("cache_store", rows_in=chunk.shape[0]):
+                    store.write(chunk)
+        sink.close()
+        if store is not None and store.chunks_written == 0:
+            # No rows were read; an empty entry with the expected columns.
+            store.write(pd.DataFrame(columns=self.keep_columns))
+        if not collect:
+            return None
+        data = sink.result()
+        if data is None:
+            # No rows were read; an empty frame with the expected columns.
+            data = pd.DataFrame(columns=self.keep_columns)
         return data
 
-    def _read(self) -> pd.DataFrame:
-        """Read raw csv. Not implemented in base class."""
-        raise NotImplementedError()
+    def _write(self, sink, data: pd.DataFrame) -> None:
+        """Write data to sink, as the write stage."""
+        with self.profile.stage("write", rows_in=data.shape[0]):
+            sink.write(data)
+
+    def _read(self):
+        """
+        Read the raw csv at source_path, or stream it out of a compressed file or
+        zip archive next to it (see utils.compressed). Only keep_columns are
+        parsed, with the dtypes declared in schema.
+
+        If the csv has a fresh columnar copy with keep_columns declared as in
+        schema (see utils.columnar), it is read instead, giving the same data
+        without parsing text.
+
+        Returns:
+        -------
+        Pandas DataFrame, or an iterator of DataFrame chunks if chunksize is set.
+        """
+        if self.source_path is None:
+            raise NotImplementedError()
+        dtypes = {col: self.schema.get(col) for col in self.keep_columns}
+        columnar = fresh_columnar(self.source_path, dtypes)
+        if columnar is not None:
+            self.metrics.add("columnar_reads")
+            return read_columnar(columnar, dtypes, chunksize=self.chunksize)
+        if self.chunksize is None:
+            with open_raw(self.source_path) as source:
+                return pd.read_csv(source, **self._read_options())[self.keep_columns]
+        # Find the file now, so a missing file raises before the first chunk.
+        raw_source(self.source_path)
+        return self._read_chunks()
+
+    def _read_chunks(self):
+        """Yields the raw csv in chunks of chunksize rows, keeping it open until
+        the last chunk is read."""
+        # Closed once the chunks are exhausted, or the generator is closed.
+        with open_raw(self.source_path) as source:  # pylint: disable=W0135
+            reader = pd.read_csv(source, chunksize=self.chunksize, **self._read_options())
+            for chunk in reader:
+                yield chunk[self.keep_columns]
+
+    def _read_options(self) -> dict:
+        """Returns the pandas.read_csv options parsing keep_columns as schema."""
+        dtypes = {col: self.schema[col] for col in self.keep_columns if col in self.schema}
+        return {"usecols": self.keep_columns, "dtype": dtypes}
+
+    def _read_shared(self) -> pd.DataFrame:
+        """
+        Returns the source read and cleaned by shared_base, from shared_sources.
+        The raw rows read to build it are counted as rows_read, whichever cleaner
+        read them.
+
+        Returns:
+        -------
+        Shallow copy of the shared frame, so columns can be added or replaced
+        without affecting other cleaners. Values must not be modified in place.
+        """
+        key = (
+            os.path.abspath(self.source_path),
+            self.shared_base.__qualname__,
+            tuple(self.keep_columns),
+        )
+
+        def load():
+            data = self._read()
+            return self.shared_base._clean(self, data), data.shape[0]  # pylint: disable=W0212
+
+        shared = self.shared_sources.get(key, load)
+        self.metrics.add("rows_read", self.shared_sources.rows_read(key))
+        return shared.copy(deep=False)
 
     def _clean(self, data: pd.DataFrame) -> pd.DataFrame:
         """Read raw csv. Not implemented in base class."""
         raise NotImplementedError()
 
+    def _derive(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Derive this cleaner's output from data cleaned by shared_base. Defaults to
+        returning data unchanged.
+        """
+        return data
+
+    def _clean_chunk(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """
+        Clean one chunk in chunked mode. Defaults to _clean; override when
+        cleaning depends on rows seen in earlier chunks (kept in _chunk_state).
+        """
+        return self._clean(chunk)
+
+    def _validator(self) -> FrameValidator:
+        """Returns a validator for keep_columns and the declared rules."""
+        return FrameValidator(self.keep_columns, self.rules, self.unique_rules)
+
+    def _validate_chunk(self, chunk: pd.DataFrame) -> None:
+        """
+        Validate one chunk in chunked mode, carrying uniqueness state across chunks.
+        """
+        self._chunk_state["validator"].update(chunk)
+
     def _validate(self, data: pd.DataFrame) -> None:
         """
-        Validate data.
+        Validate data against keep_columns, rules and unique_rules.
 
         Parameters:
         ----------
@@ -55,10 +343,9 @@ class DataCleaner:
         Raises:
         ------
         ValidationException if a required column is missing from data.
+        ValidationException if any rule is broken.
         """
-        for col in self.keep_columns:
-            if col not in data:
-                raise ValidationException(f"Missing {col} from data!")
+        self._validator().validate(data)
 
     def _validate_rating_col(self, data: pd.DataFrame, col: str) -> None:
         """
@@ -77,50 +364,123 @@ class DataCleaner:
         ValidationException if there are null values in col in data.
         ValidationException if any values in col cannot be converted to float.
         """
-        if col not in data.columns:
-            raise ValidationException(f"Column {col} not available in passed data!")
-        if data.loc[data[col].isna()].shape[0] > 0:
-            raise ValidationException(f"Null values not allowed in {col}!")
-        if not all(isinstance(x, float) for x in data[col]):
-            raise ValidationException(f"Found non-float values for {col}!")
+        ColumnRule(col, dtype="float", nullable=False).check(data)
 
 
 class CriticsDataCleaner(DataCleaner):
     """Clean critics dataset."""
 
-    keep_columns = [
-        "rotten_tomatoes_link",
-        "critic_name",
-        "top_critic",
-        "review_type",
-        "review_score",
-    ]
+    schema = {
+        "rotten_tomatoes_link": "category",
+        "critic_name": "category",
+        "top_critic": "boolean",
+        "review_type": "category",
+        "review_score": "category",
+    }
+    keep_columns = list(schema)
+    # Reviews have no id, so every column identifies one. The movie_title added by
+    # merge_movie_titles follows from the link, so is not hashed.
+    identity_columns = keep_columns
+    source_path = "./data/rotten_tomatoes_critic_reviews.csv"
+    # Assert no null values in reviews, and all reviews are floats.
+    rules = [ColumnRule("review_score", dtype="float", nullable=False)]
+
+    manual_corrections = {
+        "35/4": 87.5,  # Assuming 3.5/4
+        "67/10": 67.0,
+        "87/10": 87.0,
+        "920": 92.0,
+        "76/10": 76.0,
+        "75/10": 75.0,
+        "910": 91.0,
+        "25/4": 62.5,  # Assuming 2.5/4
+        "45/5": 90.0,
+        "73/10": 73.0,
+    }
+
+    score_substitutions = {
+        "A+": 98,
+        "A": 95,
+        "A-": 93,
+        "B+": 88,
+        "B": 85,
+        "B-": 83,
+        "C+": 78,
+        "C": 75,
+        "C-": 73,
+        "D+": 68,
+        "D": 65,
+        "D-": 63,
+        "E": 50,
+        "F": 40,
+    }
+
+    # Cleaning paths whose raw scores are kept as samples in metrics.
+    sampled_paths = ("manual", "capped", "dropped", "other")
+
+    def __init__(
+        self, score_cache: Optional[ScoreCache] = None, n_workers: int = 1, **kwargs
+    ):
+        """
+        Initialize a CriticsDataCleaner.
 
-    def _read(self) -> pd.DataFrame:
-        """Read input dataframe, and subset to required columns."""
-        data = pd.read_csv("./data/rotten_tomatoes_critic_reviews.csv")
-        return data[self.keep_columns]
+        Parameters:
+        ----------
+        score_cache: Optional[ScoreCache]
+            Cache of raw score -> cleaned score. Defaults to a cache shared by every
+            CriticsDataCleaner in the process. Pass a ScoreCache with a path to reuse
+            parsed scores across runs. Scores are cached under score_namespace.
+        n_workers: int
+            Number of processes to clean with. If more than 1, the rows (of each
+            chunk, in chunked mode) are split into n_workers partitions which are
+            cleaned in a process pool and concatenated in their original order.
+        **kwargs
+            Passed to DataCleaner.
+        """
+        super().__init__(**kwargs)
+        self.score_cache = score_cache if score_cache is not None else _SCORE_CACHE
+        self.n_workers = n_workers
+        self._executor = None
 
-    def _validate_single_score(self, score: float, original_score: str) -> float:
+    @property
+    def score_namespace(self) -> str:
         """
-        If score > 100, cap at 100.
+        Returns the score cache namespace of this cleaner's scoring rules: a hash of
+        its class, version, manual_corrections and score_substitutions. Cleaners
+        with other rules, e.g. changed corrections, never share cached scores.
+        """
+        rules = [
+            type(self).__qualname__,
+            str(self.version),
+            self.manual_corrections,
+            self.score_substitutions,
+        ]
+        return hashlib.sha256(json.dumps(rules, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _run(self, sink=None) -> Optional[pd.DataFrame]:
+        """See DataCleaner.run. Shuts down the worker pool, if one was started."""
+        try:
+            return super()._run(sink)
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def _validate_single_score(self, score: float) -> float:
+        """
+        If score > 100, cap at 100. Capped scores are counted in metrics by
+        _clean_scores rather than logged here.
 
         Parameters:
         ----------
         score: float
             Score to validate.
-        original_score: str
-            Original score, for logging purposes.
 
         Returns:
         --------
         float value of corrected score.
         """
         if score > 100:
-            print(
-                f"Score greater than 100! Current score is {score}, ",
-                f"original score was {original_score}. Correcting to 100.",
-            )
             return 100.0
         return score
 
@@ -137,42 +497,12 @@ class CriticsDataCleaner(DataCleaner):
         -------
         Either float if score can be cleaned, else None.
         """
-        original_score = score  # For logging
-
         # Correct a few scores manually.
-        manual_corrections = {
-            "35/4": 87.5,  # Assuming 3.5/4
-            "67/10": 67.0,
-            "87/10": 87.0,
-            "920": 92.0,
-            "76/10": 76.0,
-            "75/10": 75.0,
-            "910": 91.0,
-            "25/4": 62.5,  # Assuming 2.5/4
-            "45/5": 90.0,
-            "73/10": 73.0,
-        }
-        if score in manual_corrections:
-            return manual_corrections[score]
-        substitutions = {
-            "A+": 98,
-            "A": 95,
-            "A-": 93,
-            "B+": 88,
-            "B": 85,
-            "B-": 83,
-            "C+": 78,
-            "C": 75,
-            "C-": 73,
-            "D+": 68,
-            "D": 65,
-            "D-": 63,
-            "E": 50,
-            "F": 40,
-        }
+        if score in self.manual_corrections:
+            return self.manual_corrections[score]
         # If score can already be converted to float, return.
         try:
-            return self._validate_single_score(float(score), original_score)
+            return self._validate_single_score(float(score))
         except:  # pylint: disable=W0702
             pass
         # Then, clean.
@@ -184,14 +514,168 @@ class CriticsDataCleaner(DataCleaner):
             if denominator == 0:
                 return None
             score = (float(numerator) / float(denominator)) * 100
-            return self._validate_single_score(score, original_score)
+            return self._validate_single_score(score)
 
         # Handle alphanumeric case. Remove any spaces,
         # and then use dictionary.
         score = score.replace(" ", "")
-        if score not in substitutions:
+        if score not in self.score_substitutions:
             raise ValueError(f"Unable to process score {score}.")
-        return substitutions[score]
+        return self.score_substitutions[score]
+
+    def _clean_scores(self, scores: pd.Series) -> pd.Series:
+        """
+        Cleans a column of scores to a 0-100 scale, counting how many scores took
+        each cleaning path in self.metrics.
+
+        The column is factorized so each distinct score is cleaned once (see
+        _lookup_scores); the results are mapped back to rows through the codes.
+
+        Parameters:
+        ----------
+        scores: pd.Series
+            Scores to clean.
+
+        Returns:
+        -------
+        Float series of cleaned scores, with NaN where the score cannot be cleaned
+        (e.g. a zero denominator).
+        """
+        if pd.api.types.is_numeric_dtype(scores):
+            cleaned, paths = self._normalize_scores(scores)
+            self._record_score_paths(scores, paths, np.ones(scores.shape[0], dtype=int))
+            return cleaned
+
+        codes, uniques = pd.factorize(scores)
+        cleaned_uniques, paths = self._lookup_scores(uniques)
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        self._record_score_paths(uniques, paths, counts)
+
+        cleaned = np.where(codes < 0, np.nan, cleaned_uniques.take(codes))
+        return pd.Series(cleaned, index=scores.index, dtype="float64")
+
+    def _lookup_scores(self, uniques) -> tuple:
+        """
+        Cleans distinct scores, looking them up in the score cache and parsing only
+        the misses with _normalize_scores.
+
+        Parameters:
+        ----------
+        uniques: array-like
+            Distinct, non-null scores.
+
+        Returns:
+        -------
+        Tuple of a float array of cleaned scores, and a list of the cleaning path
+        each score took.
+        """
+        namespace = self.score_namespace
+        hits, misses = self.score_cache.lookup(uniques, namespace)
+        # Paths are taken before the update, which may evict hits when there are
+        # more distinct scores than the cache holds.
+        paths = dict(zip(hits, self.score_cache.paths(hits, namespace)))
+        if misses:
+            parsed, parsed_paths = self._normalize_scores(pd.Series(misses, dtype="object"))
+            parsed = dict(zip(misses, parsed))
+            parsed_paths = dict(zip(misses, parsed_paths))
+            self.score_cache.update(parsed, parsed_paths, namespace)
+            hits.update(parsed)
+            paths.update(parsed_paths)
+
+        cleaned = np.array([hits[raw] for raw in uniques], dtype="float64")
+        return cleaned, [paths[raw] or "other" for raw in uniques]
+
+    def _record_score_paths(self, raw_scores, paths, counts) -> None:
+        """
+        Count the scores taking each cleaning path in self.metrics, as score_<path>.
+        A few raw values are kept as samples for the paths listed in sampled_paths.
+
+        Parameters:
+        ----------
+        raw_scores: array-like
+            Distinct raw scores.
+        paths: array-like
+            Cleaning path of each raw score.
+        counts: array-like
+            Number of rows holding each raw score.
+        """
+        taken = pd.DataFrame({"raw": raw_scores, "path": paths, "count": counts})
+        taken = taken.loc[taken["count"] > 0]
+        for path, group in taken.groupby("path", sort=False):
+            samples = group["raw"] if path in self.sampled_paths else ()
+            self.metrics.add(f"score_{path}", group["count"].sum(), samples)
+
+    def _normalize_scores(self, scores: pd.Series) -> tuple:
+        """
+        Parses a column of scores to a 0-100 scale, bypassing the score cache.
+
+        Vectorized equivalent of _clean_single_score: manual corrections, numeric,
+        "x/y" fraction and letter-grade scores are each handled with a single
+        column-wide operation. Any value none of these paths can resolve falls back
+        to _clean_single_score, so malformed scores raise the same ValueError.
+
+        Parameters:
+        ----------
+        scores: pd.Series
+            Non-null scores to parse.
+
+        Returns:
+        -------
+        Tuple of a float series of cleaned scores, with NaN where the score cannot
+        be cleaned (e.g. a zero denominator), and a series naming the path each
+        score took: "manual", "numeric", "fraction", "letter", "capped" (numeric or
+        fraction above 100), "dropped" (NaN) or "other".
+        """
+        if pd.api.types.is_numeric_dtype(scores):
+            numeric = scores.astype("float64")
+            paths = pd.Series("numeric", index=scores.index, dtype="object")
+            paths[numeric > 100] = "capped"
+            paths[numeric.isna()] = "dropped"
+            return numeric.mask(numeric > 100, 100.0), paths
+
+        text = scores.astype(str)
+        cleaned = pd.Series(np.nan, index=scores.index, dtype="float64")
+        paths = pd.Series("other", index=scores.index, dtype="object")
+
+        # Manual corrections take precedence over every other path.
+        manual = text.map(self.manual_corrections)
+        resolved = manual.notna()
+        cleaned[resolved] = manual[resolved]
+        paths[resolved] = "manual"
+
+        # Scores which can already be converted to float, capped at 100.
+        numeric = pd.to_numeric(text[~resolved], errors="coerce").dropna()
+        cleaned[numeric.index] = numeric.mask(numeric > 100, 100.0)
+        paths[numeric.index] = np.where(numeric > 100, "capped", "numeric")
+        resolved[numeric.index] = True
+
+        # Fractions, capped at 100. A zero denominator leaves the score as NaN.
+        has_slash = text.str.contains("/", regex=False)
+        parts = text[has_slash & ~resolved].str.extract(r"^([^/]*)/([^/]*)$")
+        parts = parts.apply(pd.to_numeric, errors="coerce").dropna()
+        ratio = (parts[0] / parts[1].where(parts[1] != 0)) * 100
+        cleaned[ratio.index] = ratio.mask(ratio > 100, 100.0)
+        paths[ratio.index] = np.where(ratio > 100, "capped", "fraction")
+        resolved[ratio.index] = True
+
+        # Letter grades, ignoring any spaces.
+        letters = (
+            text[~has_slash & ~resolved]
+            .str.replace(" ", "", regex=False)
+            .map(self.score_substitutions)
+            .dropna()
+        )
+        cleaned[letters.index] = letters
+        paths[letters.index] = "letter"
+        resolved[letters.index] = True
+
+        # Anything left is unusual; defer to the per-score path (which raises
+        # ValueError for scores that cannot be processed).
+        if not resolved.all():
+            cleaned[~resolved] = scores[~resolved].map(self._clean_single_score)
+
+        paths[cleaned.isna()] = "dropped"
+        return cleaned, paths
 
     def _clean(self, data: pd.DataFrame) -> pd.DataFrame:
         """
@@ -211,81 +695,125 @@ class CriticsDataCleaner(DataCleaner):
         -------
         Cleaned pandas dataframe.
         """
-        data = data.loc[~data["review_score"].isna()]
+        if 1 < self.n_workers < data.shape[0]:
+            return self._clean_partitioned(data)
+
+        null_scores = data["review_score"].isna()
+        self.metrics.add("score_null", null_scores.sum())
+        data = data.loc[~null_scores].copy()
 
         # Standardize review scores between 0-100.
         # There are both numerical, ratio, and letter scores.
-        cleaned_review_scores = []
-        for _, row in data.iterrows():
-            cleaned_review_scores.append(self._clean_single_score(row["review_score"]))
+        data["review_score"] = self._clean_scores(data["review_score"])
 
-        data["review_score"] = cleaned_review_scores
+        self.score_cache.save()
 
         # Drop out any NA values from review score
         return data.loc[~data["review_score"].isna()]
 
-    def _validate(self, data: pd.DataFrame) -> None:
+    def _clean_partitioned(self, data: pd.DataFrame) -> pd.DataFrame:
         """
-        Validates critics oscars dataset.
-        Validation steps are:
-        1.) Assert no null values in reviews
-        2.) Assert the 'keep_columns' are in the data
+        Cleans data in n_workers row partitions in a process pool.
+
+        Every distinct score is cleaned here first, so each worker is sent only its
+        partition and the cleaned scores of that partition's distinct scores. The
+        workers count null scores and how often each raw score occurs, and the
+        counts are recorded in self.metrics here.
 
         Parameters:
         ----------
         data: pd.DataFrame
-            Data to validate
+
+        Returns:
+        -------
+        Cleaned pandas dataframe, with rows in their original order.
+        """
+        uniques = data["review_score"].dropna().unique()
+        cleaned_uniques, paths = self._lookup_scores(uniques)
+        self.score_cache.save()
+        cleaned_scores = dict(zip(uniques, cleaned_uniques))
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.n_workers)
+        bounds = np.linspace(0, data.shape[0], self.n_workers + 1).astype(int)
+        partitions = [data.iloc[start:end] for start, end in zip(bounds, bounds[1:])]
+        # Each worker gets the cleaned scores of its partition's distinct scores only.
+        partition_scores = [
+            {raw: cleaned_scores[raw] for raw in partition["review_score"].dropna().unique()}
+            for partition in partitions
+        ]
+        results = list(
+            self._executor.map(self._clean_score_partition, partitions, partition_scores)
+        )
+
+        counts = pd.Series(0, index=uniques, dtype="int64")
+        for _, null_scores, score_counts in results:
+            self.metrics.add("score_null", null_scores)
+            counts = counts.add(score_counts, fill_value=0).astype("int64")
+        self._record_score_paths(uniques, paths, counts.loc[uniques].to_numpy())
+        return pd.concat([cleaned for cleaned, _, _ in results])
+
+    @staticmethod
+    def _clean_score_partition(data: pd.DataFrame, cleaned_scores: dict) -> tuple:
         """
-        super()._validate(data)
-        self._validate_rating_col(data, "review_score")
+        Cleans one partition in a worker process, mapping raw scores to cleaned
+        scores.
+
+        Parameters:
+        ----------
+        data: pd.DataFrame
+            Partition to clean.
+        cleaned_scores: dict
+            Cleaned score of each distinct, non-null raw score in the partition.
+
+        Returns:
+        -------
+        Tuple of the cleaned partition, the number of null scores dropped, and a
+        series counting the rows holding each raw score.
+        """
+        null_scores = data["review_score"].isna()
+        data = data.loc[~null_scores].copy()
+        score_counts = data["review_score"].value_counts(sort=False)
+        data["review_score"] = data["review_score"].map(cleaned_scores).astype("float64")
+        return data.loc[~data["review_score"].isna()], int(null_scores.sum()), score_counts
 
 
 class MoviesDataCleaner(DataCleaner):
     """Clean movies dataset."""
 
-    keep_columns = [
-        "rotten_tomatoes_link",
-        "movie_title",
-        "tomatometer_rating",
-        "audience_rating",
+    schema = {
+        "rotten_tomatoes_link": "category",
+        "movie_title": "object",
+        "tomatometer_rating": "float64",
+        "audience_rating": "float64",
+    }
+    keep_columns = list(schema)
+    source_path = "./data/rotten_tomatoes_movies.csv"
+    # Assert no null values in tomatometer or audience rating, and all rating
+    # columns are floats between 0-100.
+    rules = [
+        ColumnRule(col, dtype="float", nullable=False, min_value=0, max_value=100)
+        for col in ["tomatometer_rating", "audience_rating"]
     ]
 
-    def _read(self) -> pd.DataFrame:
-        """Read input dataframe, and subset to required columns."""
-        data = pd.read_csv("./data/rotten_tomatoes_movies.csv")
-        return data[self.keep_columns]
-
     def _clean(self, data: pd.DataFrame) -> pd.DataFrame:
         """Clean Oscars movies dataset. Drop observations that are NA."""
         data = data.loc[~data["tomatometer_rating"].isna()]
         data = data.loc[~data["audience_rating"].isna()]
         return data
 
-    def _validate(self, data: pd.DataFrame) -> None:
-        """
-        Validate moves dataset. Steps are:
-        1.) Assert no null values in tomatometer or audience rating
-        2.) Assert all rating columns between 0-100
-
-        Parameters:
-        ----------
-        data: pd.DataFrame
-            Data to validate
-        """
-        super()._validate(data)
-        self._validate_rating_col(data, "tomatometer_rating")
-        self._validate_rating_col(data, "audience_rating")
-
 
 class OscarsDataCleaner(DataCleaner):
     """Base class for cleaning Oscars data."""
 
-    keep_columns = ["year_film", "category", "film", "winner"]
-
-    def _read(self) -> pd.DataFrame:
-        """Read in Oscars csv."""
-        data = pd.read_csv("./data/the_oscar_award.csv")
-        return data[self.keep_columns]
+    schema = {
+        "year_film": "int16",
+        "category": "category",
+        "film": "object",
+        "winner": "boolean",
+    }
+    keep_columns = list(schema)
+    source_path = "./data/the_oscar_award.csv"
 
     def _clean(self, data: pd.DataFrame) -> pd.DataFrame:
         """Drop any observations where winner is NA."""
@@ -296,6 +824,19 @@ class OscarsDataCleaner(DataCleaner):
 class BestPictureOscarsDataCleaner(OscarsDataCleaner):
     """Produce a dataset of best-picture winners."""
 
+    shared_base = OscarsDataCleaner
+    # A film is nominated once per category and year, so winner follows from these.
+    identity_columns = ["year_film", "category", "film"]
+    # Assert no NAs in winner, and at most one best picture winner in a given year.
+    rules = [ColumnRule("winner", nullable=False)]
+    unique_rules = [
+        UniqueRule(
+            ["year_film"],
+            where="winner",
+            message="More than one best picture winner found in a given year!",
+        )
+    ]
+
     def _clean(self, data: pd.DataFrame) -> pd.DataFrame:
         """
         Clean raw Oscars data and process best picture column.
@@ -309,7 +850,10 @@ class BestPictureOscarsDataCleaner(OscarsDataCleaner):
         -------
         Data subset to best picture categories only.
         """
-        data = super()._clean(data)
+        return self._derive(super()._clean(data))
+
+    def _derive(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Subset Oscars data cleaned by OscarsDataCleaner to best picture categories."""
         # Only keep best-picture winning categories
         best_picture_categories = [
             "BEST MOTION PICTURE",
@@ -320,46 +864,41 @@ class BestPictureOscarsDataCleaner(OscarsDataCleaner):
             "BEST MOTION PICTURE",
         ]
         data = data.loc[data["category"].isin(best_picture_categories)]
-        data = data.drop_duplicates().reset_index(drop=True)
-        return data
+        data, dropped = dedup(data, self.identity_columns, metrics=self.metrics)
+        self.metrics.add("duplicate_rows", dropped)
+        return data.reset_index(drop=True)
 
-    def _validate(self, data: pd.DataFrame) -> None:
+    def _clean_chunk(self, chunk: pd.DataFrame) -> pd.DataFrame:
         """
-        Validates best picture data.
-
-        Parameters:
-        ----------
-        data: pd.DataFrame
-            Data to validate
-
-        Returns:
-        -------
-        None
-
-        Raises:
-        -------
-        ValidationException if NAs found in 'winner' column
-        ValidationException if more than one best picture winner found in a given year.
+        Clean one chunk, also dropping rows already kept from earlier chunks and
+        continuing the index from the previous chunk.
         """
-        super()._validate(data)
-        if any(data["winner"].isna()):
-            raise ValidationException("NAs found in winner categories! Review.")
-        # Assert no duplicate years of winners
-        winner_years = data.loc[data["winner"], "year_film"]
-        value_counts = winner_years.value_counts().reset_index()
-        if value_counts.loc[value_counts["year_film"] > 1].shape[0] > 0:
-            raise ValidationException(
-                "More than one best picture winner found in a given year!"
-            )
+        data = self._clean(chunk)
+        seen_rows = self._chunk_state.setdefault("seen_rows", {})
+        data, dropped = dedup(data, self.identity_columns, seen=seen_rows, metrics=self.metrics)
+        self.metrics.add("duplicate_rows", dropped)
+
+        offset = self._chunk_state.get("num_rows", 0)
+        data.index = range(offset, offset + data.shape[0])
+        self._chunk_state["num_rows"] = offset + data.shape[0]
+        return data
 
 
 class AnyWinOscarsDataCleaner(OscarsDataCleaner):
     """Calculates movies with any win from Oscars dataset."""
 
+    # Wins are summed over the whole file, so cannot be computed chunk by chunk.
+    chunkable = False
+    shared_base = OscarsDataCleaner
+    identity_columns = ["year_film", "film"]
+
     def _clean(self, data: pd.DataFrame) -> pd.DataFrame:
         """Generates any win dataset."""
-        data = super()._clean(data)
-        data["winner"] = data["winner"].astype("int")
+        return self._derive(super()._clean(data))
+
+    def _derive(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Count wins per film from Oscars data cleaned by OscarsDataCleaner."""
+        data = data.assign(winner=data["winner"].astype("int"))
         data = data.groupby(["year_film", "film"]).sum("winner").reset_index()
         data.columns = ["year_film", "film", "num_wins"]
         return data
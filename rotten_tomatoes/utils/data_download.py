@@ -12,17 +12,47 @@ Pre-Requisite 2b: Save the kaggle.json file. Can be saved in the rotten_tomatoes
 or anywhere on local machine. ().gitignore file includes rotten_tomatoes/kaggle.json)
 
 
-utils. data_download exports the following functions:
+utils. data_download exports the following classes and functions:
+    DatasetDownloadException
     get_kaggle_creds
     validate_kaggle_dataset_list
     download_kaggle_datasets
 """
 import os
 import json
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from .mirror import DatasetMirror, mirror_directory
 
 # pylint: disable=C0103
 
 
+class DatasetDownloadException(ValueError):
+    """Raised when one or more kaggle datasets could not be downloaded.
+
+    Attributes
+    ----------
+    errors : dict
+        Kaggle dataset -> exception raised while downloading it
+    downloaded : dict
+        Kaggle dataset -> paths of the extracted files, for the datasets which
+        were downloaded
+    """
+
+    def __init__(self, errors, downloaded):
+        self.errors = errors
+        self.downloaded = downloaded
+        failures = "\n".join(
+            f"- {kaggle_dataset}: {error}" for kaggle_dataset, error in errors.items()
+        )
+        super().__init__(
+            f"Oops! {len(errors)} kaggle dataset(s) returned an exception.\n{failures}"
+            "\nEither the username/dataset in the kaggle_dataset_list is incorrect "
+            "or the username and password is incorrect. Please check both."
+        )
+
+
 def get_kaggle_creds(kaggle_json_file_loc):
     """Returns a username and password (key) from kaggle.json file
 
@@ -81,9 +111,27 @@ def validate_kaggle_dataset_list(kaggle_dataset_list):
             )
 
 
-def download_kaggle_datasets(username, password, kaggle_dataset_list, file_output):
+def download_kaggle_datasets(  # pylint: disable=R0913,R0914,R0917
+    username,
+    password,
+    kaggle_dataset_list,
+    file_output,
+    max_workers=1,
+    api=None,
+    source=None,
+    unzip=True,
+):
     """Downloads all files from kaggle_dataset_list to the file_output location
 
+    file_output is kept as a mirror (see utils.mirror): the version, file sizes
+    and checksums of each dataset downloaded are recorded in its manifest, and a
+    dataset is skipped while its upstream version is unchanged and its files
+    still match their checksums.
+
+    Up to max_workers datasets are downloaded and extracted at once, in threads.
+    A dataset which fails does not stop the others; the errors of every failed
+    dataset are raised together once the others are done.
+
     Parameters
     ----------
     username : string
@@ -96,16 +144,62 @@ def download_kaggle_datasets(username, password, kaggle_dataset_list, file_outpu
     file_output : string
         String for location where downloaded files should be saved.
         Recommend saving in data/ directory
+    max_workers : int
+        Number of datasets to download at once. Defaults to 1, one after another
+    api : KaggleApi or None
+        Authenticated Kaggle API to download with, e.g. a fake one in tests.
+        By default, one is authenticated with username and password
+    source : string or None
+        Directory or file:// URL of another mirror to copy the datasets from,
+        instead of downloading them from Kaggle. No credentials are needed
+    unzip : bool
+        If False, the zip files downloaded from Kaggle are kept as they are,
+        instead of being extracted. The cleaners read csvs straight out of them
+
+    Returns
+    -------
+    downloaded : dict
+        Kaggle dataset -> paths of its files in file_output
 
     ValueError
         - Any of the strings in the kaggle_dataset_list
             are not in the username/dataset format
+        - max_workers is less than 1
+        - source is not a directory or a file:// URL
+
+    DatasetDownloadException (a ValueError)
         - Any of the strings in the kaggle_dataset_list
             return 403 error from the kaggle.api.dataset_download_files api call
+    """
+    validate_kaggle_dataset_list(kaggle_dataset_list)
+    if max_workers < 1:
+        raise ValueError(f"Oops! max_workers must be at least 1, not {max_workers}")
+    source_mirror = None if source is None else DatasetMirror(mirror_directory(source))
+    if api is None and source_mirror is None:
+        api = _authenticate(username, password)
+    mirror = DatasetMirror(file_output)
 
+    # Datasets are I/O bound, so threads download them concurrently.
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            kaggle_dataset: executor.submit(
+                _fetch_dataset, api, source_mirror, mirror, kaggle_dataset, unzip
+            )
+            for kaggle_dataset in kaggle_dataset_list
+        }
+    downloaded, errors = {}, {}
+    for kaggle_dataset, future in futures.items():
+        try:
+            downloaded[kaggle_dataset] = future.result()
+        except Exception as e:  # pylint: disable=W0703
+            errors[kaggle_dataset] = e
+    if errors:
+        raise DatasetDownloadException(errors, downloaded)
+    return downloaded
 
-    """
 
+def _authenticate(username, password):
+    """Returns a Kaggle API authenticated with username and password (key)"""
     os.environ["KAGGLE_USERNAME"] = username
     os.environ["KAGGLE_KEY"] = password
 
@@ -119,22 +213,75 @@ def download_kaggle_datasets(username, password, kaggle_dataset_list, file_outpu
 
     # pylint: disable=E0611
     from kaggle.api.kaggle_api_extended import KaggleApi  # pylint: disable=C0415
-    import kaggle  # pylint: disable=C0415
 
     api = KaggleApi()
     api.authenticate()
+    return api
 
-    validate_kaggle_dataset_list(kaggle_dataset_list)
 
-    # If all kaggle_datasets in the kaggle_dataset_list are correct, download the files
-    for kaggle_dataset in kaggle_dataset_list:
-        try:
-            kaggle.api.dataset_download_files(
-                kaggle_dataset, path=file_output, unzip=True
-            )
-        except Exception as e:
-            raise ValueError(  # pylint: disable=W0707
-                f"Oops! the kaggle_dataset {kaggle_dataset} returned an exception. {e}"
-                "\nEither the username/dataset in the kaggle_dataset_list is incorrect "
-                "or the username and password is incorrect. Please check both."
-            )
+def _fetch_dataset(api, source_mirror, mirror, kaggle_dataset, unzip):
+    """Downloads one kaggle dataset into mirror from Kaggle, or copies it from
+    source_mirror, unless mirror already holds its current version (extracted,
+    or as a zip file, as unzip asks, if downloading from Kaggle)
+
+    Returns
+    -------
+    paths : list
+        Paths of the dataset's files in mirror
+    """
+    if source_mirror is not None:
+        version = source_mirror.version(kaggle_dataset)
+    else:
+        version = _kaggle_version(api, kaggle_dataset)
+    previous = mirror.files(kaggle_dataset)
+    zipped = bool(previous) and all(path.endswith(".zip") for path in previous)
+    if mirror.is_current(kaggle_dataset, version) and (
+        source_mirror is not None or zipped != unzip
+    ):
+        return previous
+
+    if source_mirror is not None:
+        paths = source_mirror.copy_to(kaggle_dataset, mirror)
+    else:
+        paths = _download_dataset(api, kaggle_dataset, mirror.directory, unzip)
+        mirror.record(kaggle_dataset, version, paths)
+    # Files of the previous download which are no longer part of the dataset,
+    # e.g. csvs extracted before the zip file was kept, would be read instead.
+    for path in set(previous) - set(paths):
+        if os.path.exists(path):
+            os.remove(path)
+    return paths
+
+
+def _kaggle_version(api, kaggle_dataset):
+    """Returns the current version number of a kaggle dataset, or None if the
+    Kaggle API cannot tell, in which case the dataset is always downloaded"""
+    owner_slug, dataset_slug = kaggle_dataset.split("/")
+    try:
+        view = api.process_response(
+            api.datasets_view_with_http_info(owner_slug, dataset_slug)
+        )
+        return int(view["currentVersionNumber"])
+    except Exception:  # pylint: disable=W0703
+        return None
+
+
+def _download_dataset(api, kaggle_dataset, file_output, unzip=True):
+    """Downloads one kaggle dataset's zip file to file_output, and unless unzip is
+    False, extracts it there and removes the zip file
+
+    Returns
+    -------
+    paths : list
+        Paths of the extracted files, or of the zip file
+    """
+    api.dataset_download_files(kaggle_dataset, path=file_output, unzip=False)
+    # The Kaggle API names the zip file after the dataset.
+    zip_path = os.path.join(file_output, f"{kaggle_dataset.split('/')[1]}.zip")
+    if not unzip:
+        return [zip_path]
+    with zipfile.ZipFile(zip_path) as archive:
+        names = [name for name in archive.namelist() if not name.endswith("/")]
+        archive.extractall(file_output)
+    os.remove(zip_path)
+    return [os.path.join(file_output, name) for name in names]
@@ -0,0 +1,142 @@
+"""
+Read and write the merged analysis datasets as Parquet.
+
+Datasets are written as a directory of compressed Parquet files partitioned by
+year_film (one year_film=<year> subdirectory per year), so loading a range of
+years only reads those partitions, and loading a few columns only reads those
+columns. Column dtypes, including categoricals, are kept. A DatasetSink writes a
+dataset chunk by chunk, so it need not be held in memory.
+
+utils.datasets exports the following classes and functions:
+    DatasetSink
+    write_dataset
+    load_dataset
+"""
+import os
+import shutil
+from typing import Optional, Sequence, Tuple
+import pandas as pd
+
+from .data_cleaning import OscarsDataCleaner
+
+PARTITION_COLUMN = "year_film"
+
+
+class DatasetSink:
+    """Writes chunks to a Parquet dataset partitioned by year_film (see
+    utils.streaming), replacing any dataset at path once closed."""
+
+    def __init__(self, path: str) -> None:
+        """
+        Initialize a DatasetSink. Nothing is written to path until it is closed.
+
+        Parameters:
+        ----------
+        path: str
+            Directory to write the dataset to.
+        """
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        self.rows_written = 0
+        self._chunks_written = 0
+        self._columns: Optional[pd.DataFrame] = None
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        """Append a chunk to the dataset. The index is not written."""
+        if chunk.empty:
+            # Partitioned writes of empty data write nothing.
+            if self._columns is None:
+                self._columns = chunk
+            return
+        # Files are named in chunk order, which is the order they are loaded in.
+        chunk.to_parquet(
+            self.tmp_path,
+            partition_cols=[PARTITION_COLUMN],
+            compression="snappy",
+            index=False,
+            basename_template=f"part-{self._chunks_written:06d}-{{i}}.parquet",
+        )
+        self._chunks_written += 1
+        self.rows_written += chunk.shape[0]
+
+    def close(self) -> None:
+        """
+        Replace any dataset at path with the chunks written. Empty data, which has
+        no partitions, is written as one file holding only the columns, so it
+        loads back as an empty frame.
+        """
+        if self._chunks_written == 0:
+            os.makedirs(self.tmp_path, exist_ok=True)
+            if self._columns is not None:
+                # Partition columns are loaded after the other columns.
+                columns = [col for col in self._columns if col != PARTITION_COLUMN]
+                self._columns[columns + [PARTITION_COLUMN]].to_parquet(
+                    os.path.join(self.tmp_path, "empty.parquet"),
+                    compression="snappy",
+                    index=False,
+                )
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.replace(self.tmp_path, self.path)
+
+
+def write_dataset(data: pd.DataFrame, path: str) -> None:
+    """
+    Write data to a Parquet dataset partitioned by year_film, replacing any
+    dataset already at path. The index is not written. Empty data is written
+    as for DatasetSink.
+
+    Parameters:
+    ----------
+    data: pd.DataFrame
+        Merged data, with a year_film column.
+    path: str
+        Directory to write the dataset to.
+    """
+    sink = DatasetSink(path)
+    sink.write(data)
+    sink.close()
+
+
+def load_dataset(
+    path: str,
+    columns: Optional[Sequence[str]] = None,
+    years: Optional[Tuple[Optional[int], Optional[int]]] = None,
+) -> pd.DataFrame:
+    """
+    Load a dataset written by write_dataset.
+
+    Parameters:
+    ----------
+    path: str
+        Directory the dataset was written to.
+    columns: Optional[Sequence[str]]
+        Columns to load. Defaults to every column. year_film is only loaded if
+        listed.
+    years: Optional[Tuple[Optional[int], Optional[int]]]
+        Inclusive (first, last) range of year_film to load; either end may be None.
+        Only the partitions in range are read.
+
+    Returns:
+    -------
+    Pandas DataFrame, ordered by year_film, with a fresh RangeIndex.
+    """
+    filters = []
+    if years is not None:
+        first, last = years
+        if first is not None:
+            filters.append((PARTITION_COLUMN, ">=", first))
+        if last is not None:
+            filters.append((PARTITION_COLUMN, "<=", last))
+
+    data = pd.read_parquet(
+        path,
+        columns=None if columns is None else list(columns),
+        filters=filters or None,
+    )
+    if PARTITION_COLUMN in data:
+        # Partition values are read back as a categorical.
+        data[PARTITION_COLUMN] = data[PARTITION_COLUMN].astype(
+            OscarsDataCleaner.schema[PARTITION_COLUMN]
+        )
+    return data
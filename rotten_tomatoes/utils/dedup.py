@@ -0,0 +1,110 @@
+"""
+Deduplication by 64-bit row fingerprints.
+
+Rather than comparing whole rows, dedup hashes only the identity columns of each
+row into a 64-bit fingerprint (pandas' hash_pandas_object) and finds rows whose
+fingerprint was already seen, in one vectorized pass. Categorical columns are
+hashed by value, so fingerprints agree across chunks with different categories.
+
+Only the few rows repeating a fingerprint have their identity columns compared,
+and a row is dropped only if they equal an earlier row's. So fingerprints of
+distinct rows which collide never drop a row; such rows are kept, and counted.
+
+utils.dedup exports the following functions:
+    row_fingerprints
+    dedup
+"""
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+from .metrics import CleaningMetrics
+
+
+def row_fingerprints(
+    data: pd.DataFrame, subset: Optional[Sequence[str]] = None
+) -> np.ndarray:
+    """
+    Hash the subset columns of each row into a 64-bit fingerprint.
+
+    Parameters:
+    ----------
+    data: pd.DataFrame
+        Data to fingerprint.
+    subset: Optional[Sequence[str]]
+        Identity columns. Defaults to every column.
+
+    Returns:
+    -------
+    uint64 numpy array with one fingerprint per row.
+    """
+    keys = data if subset is None else data[list(subset)]
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy()
+
+
+def _key(row: tuple) -> tuple:
+    """Returns identity column values with every missing value as None, so keys
+    with missing values compare equal."""
+    return tuple(None if pd.isna(value) else value for value in row)
+
+
+def dedup(
+    data: pd.DataFrame,
+    subset: Optional[Sequence[str]] = None,
+    seen: Optional[Dict[int, List[Tuple[Hashable, ...]]]] = None,
+    metrics: Optional[CleaningMetrics] = None,
+) -> Tuple[pd.DataFrame, int]:
+    """
+    Drop rows whose identity columns repeat an earlier row, keeping the first.
+
+    Parameters:
+    ----------
+    data: pd.DataFrame
+        Data to deduplicate.
+    subset: Optional[Sequence[str]]
+        Identity columns. Defaults to every column.
+    seen: Optional[Dict[int, List[Tuple[Hashable, ...]]]]
+        Fingerprint -> identity columns of the rows kept from earlier chunks. Rows
+        matching them are also dropped, and the kept rows are added, so a stream of
+        chunks can be deduplicated chunk by chunk in time proportional to each
+        chunk.
+    metrics: Optional[CleaningMetrics]
+        If given, rows kept although their fingerprint repeats an earlier row's are
+        counted as fingerprint_collisions.
+
+    Returns:
+    -------
+    Tuple of the deduplicated data, with its original index, and the number of
+    rows dropped.
+    """
+    keys = data if subset is None else data[list(subset)]
+    fingerprints = row_fingerprints(keys)
+    repeated = pd.Series(fingerprints).duplicated().to_numpy()
+    keep = ~repeated
+    if repeated.any():
+        # Rows sharing a repeated fingerprint are compared exactly.
+        shared = np.isin(fingerprints, np.unique(fingerprints[repeated]))
+        keep[shared] = ~keys.loc[shared].duplicated().to_numpy()
+    collisions = int(repeated.sum() - (~keep).sum())
+
+    if seen is not None:
+        rows = np.flatnonzero(keep)
+        known = [
+            (row, fingerprint)
+            for row, fingerprint in zip(rows.tolist(), fingerprints[rows].tolist())
+            if fingerprint in seen
+        ]
+        for row, fingerprint in known:
+            if _key(keys.iloc[row]) in seen[fingerprint]:
+                keep[row] = False
+            else:
+                collisions += 1
+        kept = np.flatnonzero(keep)
+        for fingerprint, row in zip(
+            fingerprints[kept].tolist(), keys.iloc[kept].itertuples(index=False, name=None)
+        ):
+            seen.setdefault(fingerprint, []).append(_key(row))
+
+    if metrics is not None and collisions:
+        metrics.add("fingerprint_collisions", collisions)
+    return data.loc[keep], int(data.shape[0] - keep.sum())
@@ -0,0 +1,40 @@
+"""
+Modules imported on first use.
+
+Heavy libraries only some functions of a module need, e.g. plotting or model
+libraries, are bound to a LazyModule instead of being imported, so importing the
+module stays fast and has no side effects such as starting a plotting backend.
+The library is imported the first time one of its attributes is used.
+
+utils.lazy exports the following classes:
+    LazyModule
+"""
+import importlib
+from types import ModuleType
+from typing import Any, Optional
+
+
+class LazyModule:
+    """Stand-in for a module, importing it on first attribute access."""
+
+    def __init__(self, name: str) -> None:
+        """
+        Initialize a LazyModule. Nothing is imported.
+
+        Parameters:
+        ----------
+        name: str
+            Absolute name of the module, e.g. "matplotlib.pyplot".
+        """
+        self._name = name
+        self._module: Optional[ModuleType] = None
+
+    def __getattr__(self, attr: str) -> Any:
+        """Returns an attribute of the module, importing it if needed."""
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+    def __repr__(self) -> str:
+        state = "imported" if self._module is not None else "not imported"
+        return f"<LazyModule {self._name!r} ({state})>"
@@ -0,0 +1,95 @@
+"""
+Counters recorded while running DataCleaners and pipeline steps.
+
+Counts are aggregated (e.g. the number of review scores capped at 100) rather
+than logged per row, with a few sample values kept for each counter.
+
+utils.metrics exports the following classes and functions:
+    CleaningMetrics
+    write_report
+"""
+import json
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+
+class CleaningMetrics:
+    """Named counters, each with a few sample values."""
+
+    def __init__(self, max_samples: int = 5) -> None:
+        """
+        Initialize empty metrics.
+
+        Parameters:
+        ----------
+        max_samples: int
+            Maximum number of distinct sample values kept per counter.
+        """
+        self.max_samples = max_samples
+        self.counts = Counter()
+        self.samples: Dict[str, list] = {}
+
+    def add(self, name: str, count: int = 1, samples: Iterable = ()) -> None:
+        """
+        Increment a counter.
+
+        Parameters:
+        ----------
+        name: str
+            Counter to increment.
+        count: int
+            Amount to increment by.
+        samples: Iterable
+            Example values, e.g. the raw scores that were counted. Only the first
+            max_samples distinct values are kept.
+        """
+        self.counts[name] += int(count)
+        kept = self.samples.setdefault(name, [])
+        for sample in samples:
+            if len(kept) >= self.max_samples:
+                break
+            if sample not in kept:
+                kept.append(sample)
+        if not kept:
+            del self.samples[name]
+
+    def merge(self, other: "CleaningMetrics") -> None:
+        """Add the counts and samples of other to these metrics."""
+        for name, count in other.counts.items():
+            self.add(name, count, other.samples.get(name, ()))
+
+    def __getitem__(self, name: str) -> int:
+        return self.counts[name]
+
+    def to_dict(self) -> dict:
+        """Returns the counters and samples as a JSON-serializable dict."""
+        return {
+            "counts": dict(self.counts),
+            "samples": {name: [str(s) for s in kept] for name, kept in self.samples.items()},
+        }
+
+    def to_json(self, path: Optional[str] = None) -> str:
+        """
+        Returns the metrics as a JSON string, also writing it to path if given.
+        """
+        report = json.dumps(self.to_dict(), indent=2, sort_keys=True)
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(report)
+        return report
+
+
+def write_report(metrics: Dict[str, CleaningMetrics], path: str) -> None:
+    """
+    Write the metrics of several cleaners or steps to one JSON report.
+
+    Parameters:
+    ----------
+    metrics: Dict[str, CleaningMetrics]
+        Step name -> metrics of that step.
+    path: str
+        JSON file to write.
+    """
+    report = {name: step.to_dict() for name, step in metrics.items()}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
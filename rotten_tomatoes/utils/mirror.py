@@ -0,0 +1,190 @@
+"""
+Local mirrors of Kaggle datasets, with a checksum manifest.
+
+A mirror is a directory of downloaded dataset files, with a manifest recording
+the version of each dataset and the size and sha256 checksum of each of its
+files. A dataset whose recorded version is the upstream version, and whose
+files still match their checksums, does not need downloading again. Any mirror,
+e.g. a shared directory filled by a node with network access, can in turn be the
+source of another one, so air-gapped nodes can copy the datasets at disk speed.
+
+utils.mirror exports the following classes and functions:
+    DatasetMirror
+    mirror_directory
+"""
+import datetime
+import json
+import os
+import shutil
+import threading
+from typing import List, Optional
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+from .cache import file_fingerprint
+
+# Name of the manifest file in a mirror directory.
+MANIFEST_NAME = "kaggle_manifest.json"
+
+
+def mirror_directory(source: str) -> str:
+    """Returns the directory of a mirror given as a directory or a file:// URL.
+
+    Parameters
+    ----------
+    source : string
+        Directory, or file:// URL of a directory
+
+    Returns
+    -------
+    directory : string
+        Directory of the mirror
+
+    ValueError
+        - source is a URL with a scheme other than file://
+        - source is not a directory
+    """
+    directory = source
+    if not os.path.isdir(source):
+        parsed = urlparse(source)
+        if parsed.scheme == "file":
+            directory = url2pathname(parsed.netloc + parsed.path)
+        elif parsed.scheme and len(parsed.scheme) > 1:
+            raise ValueError(
+                f"Oops! the mirror {source} is not a directory or a file:// URL"
+            )
+    if not os.path.isdir(directory):
+        raise ValueError(f"Oops! the mirror directory {directory} does not exist")
+    return directory
+
+
+class DatasetMirror:
+    """Directory of Kaggle dataset files, with the version and checksums of each
+    dataset recorded in a manifest."""
+
+    def __init__(self, directory: str) -> None:
+        """Open the mirror in directory, reading its manifest if there is one.
+
+        Parameters
+        ----------
+        directory : string
+            Directory the dataset files are (or will be) in
+        """
+        self.directory = directory
+        self.path = os.path.join(directory, MANIFEST_NAME)
+        self._manifest = {"datasets": {}}
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._manifest = json.load(f)
+        # Datasets may be recorded from several download threads at once.
+        self._lock = threading.Lock()
+
+    def version(self, kaggle_dataset: str) -> Optional[int]:
+        """Returns the recorded version of a dataset, or None if not recorded."""
+        entry = self._manifest["datasets"].get(kaggle_dataset)
+        return None if entry is None else entry["version"]
+
+    def files(self, kaggle_dataset: str) -> List[str]:
+        """Returns the paths of the recorded files of a dataset."""
+        entry = self._manifest["datasets"].get(kaggle_dataset, {"files": {}})
+        return [os.path.join(self.directory, name) for name in entry["files"]]
+
+    def verify(self, kaggle_dataset: str) -> bool:
+        """Whether a dataset is recorded, and each of its files has the recorded
+        size and checksum. Sizes are checked first, so a changed file is usually
+        caught without hashing it."""
+        entry = self._manifest["datasets"].get(kaggle_dataset)
+        if entry is None:
+            return False
+        for name, recorded in entry["files"].items():
+            path = os.path.join(self.directory, name)
+            if not os.path.isfile(path) or os.path.getsize(path) != recorded["size"]:
+                return False
+        return all(
+            file_fingerprint(os.path.join(self.directory, name)) == recorded["sha256"]
+            for name, recorded in entry["files"].items()
+        )
+
+    def is_current(self, kaggle_dataset: str, version: Optional[int]) -> bool:
+        """Whether a dataset's recorded version is version, and its files are
+        unchanged. An unknown version is never current."""
+        return (
+            version is not None
+            and self.version(kaggle_dataset) == version
+            and self.verify(kaggle_dataset)
+        )
+
+    def record(self, kaggle_dataset: str, version: Optional[int], paths: List[str]) -> None:
+        """Record the version of a dataset, and the sizes and checksums of its
+        files, which must be in the mirror directory."""
+        files = {
+            os.path.relpath(path, self.directory): {
+                "size": os.path.getsize(path),
+                "sha256": file_fingerprint(path),
+            }
+            for path in paths
+        }
+        with self._lock:
+            self._manifest["datasets"][kaggle_dataset] = {
+                "version": version,
+                "files": files,
+                "updated": datetime.datetime.now().isoformat(timespec="seconds"),
+            }
+            self.save()
+
+    def forget(self, kaggle_dataset: str) -> None:
+        """Forget a dataset, so it is downloaded again."""
+        with self._lock:
+            if self._manifest["datasets"].pop(kaggle_dataset, None) is not None:
+                self.save()
+
+    def copy_to(self, kaggle_dataset: str, target: "DatasetMirror") -> List[str]:
+        """Copy a dataset's files to another mirror, checking their checksums, and
+        record the dataset there.
+
+        Files already in the target with the recorded checksum are not copied.
+
+        Returns
+        -------
+        paths : list
+            Paths of the dataset's files in the target mirror
+
+        ValueError
+            - The dataset is not in this mirror
+            - A copied file does not match its recorded checksum
+        """
+        entry = self._manifest["datasets"].get(kaggle_dataset)
+        if entry is None:
+            raise ValueError(
+                f"Oops! the kaggle_dataset {kaggle_dataset} is not in the mirror "
+                f"{self.directory}"
+            )
+        paths = []
+        for name, recorded in entry["files"].items():
+            path = os.path.join(target.directory, name)
+            if not (
+                os.path.isfile(path)
+                and os.path.getsize(path) == recorded["size"]
+                and file_fingerprint(path) == recorded["sha256"]
+            ):
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                tmp_path = f"{path}.tmp"
+                shutil.copyfile(os.path.join(self.directory, name), tmp_path)
+                if file_fingerprint(tmp_path) != recorded["sha256"]:
+                    os.remove(tmp_path)
+                    raise ValueError(
+                        f"Oops! {name} of the kaggle_dataset {kaggle_dataset} does "
+                        f"not match its checksum in the mirror {self.directory}"
+                    )
+                os.replace(tmp_path, path)
+            paths.append(path)
+        target.record(kaggle_dataset, entry["version"], paths)
+        return paths
+
+    def save(self) -> None:
+        """Write the manifest, replacing the previous one atomically."""
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._manifest, f, indent=2)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,324 @@
+"""
+Helpers for running the cleaning pipeline: running independent cleaners
+concurrently, then merging their outputs.
+
+utils.pipeline exports the following functions:
+    run_cleaners
+    unique_sides
+    check_merge_cardinality
+    merge_movie_titles
+    aggregate_critics
+    merge_oscars
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+import pandas as pd
+
+from .data_cleaning import DataCleaner, MergeExpansionException
+from .dedup import dedup
+from .metrics import CleaningMetrics
+from .profiling import StageProfile
+from .title_matching import TitleMatcher
+
+
+def _run_group(
+    group: List[Tuple[str, DataCleaner]]
+) -> Dict[str, Tuple[pd.DataFrame, CleaningMetrics, StageProfile]]:
+    """
+    Run a group of cleaners in order, returning their outputs, metrics and profiles
+    by name.
+    """
+    return {
+        name: (*cleaner.run(return_metrics=True), cleaner.profile) for name, cleaner in group
+    }
+
+
+def run_cleaners(
+    cleaners: Dict[str, DataCleaner], max_workers: Optional[int] = None
+) -> Dict[str, pd.DataFrame]:
+    """Runs independent cleaners concurrently in a process pool
+
+    Cleaners reading the same source_path are run together in one worker, in the
+    order given, so cleaners sharing a SharedSources registry still share one read
+    of their source. Everything else runs in parallel, so the wall-clock time is
+    close to that of the slowest source rather than the sum of all of them.
+
+    Each cleaner's metrics and profile attributes are set to the metrics and
+    stage profile of its run, including runs in worker processes.
+
+    Before the pool is started, the raw files of cleaners caching their outputs
+    are fingerprinted here, so workers sharing a cache directory only read its
+    remembered hashes rather than all adding to them at once.
+
+    Parameters
+    ----------
+    cleaners : dict
+        Output name -> DataCleaner to run
+    max_workers : int or None
+        Maximum number of worker processes. Defaults to one per source. If 1, the
+        cleaners are run in this process, without a pool.
+
+    Returns
+    -------
+    outputs : dict
+        Output name -> cleaned DataFrame, in the order of cleaners
+    """
+    groups: Dict[str, List[Tuple[str, DataCleaner]]] = {}
+    for name, cleaner in cleaners.items():
+        groups.setdefault(cleaner.source_path, []).append((name, cleaner))
+
+    if max_workers is None:
+        max_workers = len(groups)
+
+    outputs = {}
+    if max_workers <= 1:
+        for group in groups.values():
+            outputs.update(_run_group(group))
+    else:
+        for cleaner in cleaners.values():
+            if cleaner.cache is not None:
+                cleaner.cache.key(cleaner)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for group_outputs in executor.map(_run_group, groups.values()):
+                outputs.update(group_outputs)
+
+    for name, cleaner in cleaners.items():
+        cleaner.metrics, cleaner.profile = outputs[name][1:]
+    return {name: outputs[name][0] for name in cleaners}
+
+
+def unique_sides(validate: str) -> Tuple[str, ...]:
+    """Returns the sides of a merge whose keys must be unique for a cardinality
+
+    Parameters
+    ----------
+    validate : str
+        "one_to_one", "one_to_many" or "many_to_one", as for pd.merge
+
+    Returns
+    -------
+    sides : tuple
+        "left" and/or "right"
+
+    ValueError
+        - validate is not one of the supported values
+    """
+    sides = {
+        "one_to_one": ("left", "right"),
+        "one_to_many": ("left",),
+        "many_to_one": ("right",),
+    }
+    if validate not in sides:
+        raise ValueError(f"Unsupported merge cardinality {validate}!")
+    return sides[validate]
+
+
+def check_merge_cardinality(
+    left: pd.DataFrame,
+    right: pd.DataFrame,
+    on: Sequence[str],
+    validate: str = "many_to_one",
+    max_keys: int = 5,
+) -> None:
+    """Checks the key cardinality of a merge before it is done
+
+    Only the key columns are hashed for duplicates, so a bad merge fails fast,
+    without building the expanded result.
+
+    Parameters
+    ----------
+    left : pd.DataFrame
+        Left side of the merge
+    right : pd.DataFrame
+        Right side of the merge
+    on : sequence of str
+        Key columns
+    validate : str
+        "one_to_one", "one_to_many" or "many_to_one", as for pd.merge. Keys must be
+        unique on each "one" side
+    max_keys : int
+        Maximum number of duplicated keys listed in the error message
+
+    Raises
+    ------
+    ValueError
+        - validate is not one of the supported values
+    MergeExpansionException
+        - The keys are duplicated on a "one" side. The message lists the
+          duplicated keys
+    """
+    on = list(on)
+    for side in unique_sides(validate):
+        keys = (left if side == "left" else right)[on]
+        duplicated = keys.loc[keys.duplicated()].drop_duplicates()
+        if not duplicated.empty:
+            examples = list(duplicated.head(max_keys).itertuples(index=False, name=None))
+            raise MergeExpansionException(
+                f"{duplicated.shape[0]} keys {on} are duplicated in the {side} data, "
+                f"so a {validate} merge would expand rows. Duplicated keys include "
+                f"{examples}."
+            )
+
+
+def merge_movie_titles(
+    critics_data: pd.DataFrame,
+    movies_data: pd.DataFrame,
+    metrics: Optional[CleaningMetrics] = None,
+) -> pd.DataFrame:
+    """Merges movie titles from the movies data onto the critics data
+
+    Does an inner merge on rotten_tomatoes_link, to drop reviews of movies we don't
+    have titles for.
+
+    Parameters
+    ----------
+    critics_data : pd.DataFrame
+        Output of CriticsDataCleaner
+    movies_data : pd.DataFrame
+        Output of MoviesDataCleaner
+    metrics : CleaningMetrics or None
+        If given, the number of reviews dropped for lack of a movie title is
+        counted as rows_without_title
+
+    Returns
+    -------
+    critics_data : pd.DataFrame
+        Critics data with a movie_title column
+
+    MergeExpansionException
+        - A rotten_tomatoes_link has more than one title, so the merge would
+          increase the number of critic rows
+    """
+    movie_titles, _ = dedup(
+        movies_data[["rotten_tomatoes_link", "movie_title"]],
+        ["rotten_tomatoes_link", "movie_title"],
+    )
+    check_merge_cardinality(
+        critics_data, movie_titles, ["rotten_tomatoes_link"], validate="many_to_one"
+    )
+    start_rows = critics_data.shape[0]
+    critics_data = critics_data.merge(
+        movie_titles, on="rotten_tomatoes_link", how="inner"
+    )
+    end_rows = critics_data.shape[0]
+    if metrics is not None:
+        metrics.add("rows_without_title", start_rows - end_rows)
+    return critics_data
+
+
+def aggregate_critics(critics_data: pd.DataFrame) -> pd.DataFrame:
+    """Reduces critics data to one row per movie
+
+    Merging the aggregates onto the Oscars data, instead of every review, keeps
+    the merged datasets about 100x smaller.
+
+    Parameters
+    ----------
+    critics_data : pd.DataFrame
+        Output of merge_movie_titles
+
+    Returns
+    -------
+    aggregated : pd.DataFrame
+        One row per rotten_tomatoes_link and movie_title, with columns:
+        num_reviews, review_score (mean score), median_review_score,
+        top_critic_score (mean score of top critics, NaN if there are none) and
+        fresh_ratio (share of reviews which are Fresh)
+    """
+    scores = critics_data["review_score"]
+    top_critic = critics_data["top_critic"].fillna(False).astype(bool)
+    reviews = pd.DataFrame(
+        {
+            "review_score": scores,
+            "top_critic_score": scores.where(top_critic),
+            "fresh": (critics_data["review_type"] == "Fresh").astype("float64"),
+        }
+    )
+    grouped = reviews.groupby(
+        [critics_data["rotten_tomatoes_link"], critics_data["movie_title"]],
+        observed=True,
+    )
+    aggregated = grouped.agg(
+        num_reviews=("review_score", "size"),
+        review_score=("review_score", "mean"),
+        median_review_score=("review_score", "median"),
+        top_critic_score=("top_critic_score", "mean"),
+        fresh_ratio=("fresh", "mean"),
+    )
+    return aggregated.reset_index()
+
+
+def merge_oscars(  # pylint: disable=R0913
+    oscars_data: pd.DataFrame,
+    critics_data: pd.DataFrame,
+    validate: Optional[str] = None,
+    metrics: Optional[CleaningMetrics] = None,
+    matcher: Optional[TitleMatcher] = None,
+    *,
+    oscars_keys: Optional[Sequence[str]] = None,
+    critics_keys: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """Merges critics data onto Oscars data by movie title
+
+    Does an inner merge, to drop movies we don't have scores for. This is expected
+    to expand the rows, because there is more than 1 critic review per movie.
+
+    Duplicate rows are dropped from each side before merging, rather than from
+    the much larger merged frame; the result is the same, since a merged row is a
+    duplicate exactly when both of its source rows are. Rows are duplicates when
+    their identity columns repeat (see utils.dedup), which only need to be hashed.
+
+    Parameters
+    ----------
+    oscars_data : pd.DataFrame
+        Output of an Oscars cleaner, with a film column
+    critics_data : pd.DataFrame
+        Output of merge_movie_titles, or of aggregate_critics
+    validate : str or None
+        If given, the movie_title cardinality checked before merging (see
+        check_merge_cardinality). By default titles may repeat on both sides
+    metrics : CleaningMetrics or None
+        If given, the duplicate Oscars and critic rows dropped are counted as
+        duplicate_oscars_rows and duplicate_critics_rows, and Oscars titles
+        changed by matcher as matched_titles
+    matcher : TitleMatcher or None
+        If given, Oscars titles are first matched to the critics titles they
+        differ from only in case, punctuation, articles or small typos
+    oscars_keys : sequence of str or None
+        Identity columns of oscars_data, e.g. its cleaner's identity_columns.
+        By default every column
+    critics_keys : sequence of str or None
+        Identity columns of critics_data. By default every column
+
+    Returns
+    -------
+    merged : pd.DataFrame
+        One row per Oscars row and matching review (or movie), without duplicates
+    """
+    oscars_data = oscars_data.rename(columns={"film": "movie_title"})
+    if matcher is not None:
+        matched = matcher.match(
+            oscars_data["movie_title"], pd.Series(critics_data["movie_title"].unique())
+        )
+        matched = matched.fillna(oscars_data["movie_title"])
+        if metrics is not None:
+            metrics.add(
+                "matched_titles",
+                (matched != oscars_data["movie_title"]).sum(),
+                oscars_data.loc[matched != oscars_data["movie_title"], "movie_title"],
+            )
+        oscars_data = oscars_data.assign(movie_title=matched)
+    # Reviews of movies without an Oscars row would be dropped by the merge anyway.
+    critics_data = critics_data.loc[
+        critics_data["movie_title"].isin(oscars_data["movie_title"])
+    ]
+    if oscars_keys is not None:
+        oscars_keys = ["movie_title" if col == "film" else col for col in oscars_keys]
+    oscars_data, oscars_dropped = dedup(oscars_data, oscars_keys, metrics=metrics)
+    critics_data, critics_dropped = dedup(critics_data, critics_keys, metrics=metrics)
+    if metrics is not None:
+        metrics.add("duplicate_oscars_rows", oscars_dropped)
+        metrics.add("duplicate_critics_rows", critics_dropped)
+    if validate is not None:
+        check_merge_cardinality(oscars_data, critics_data, ["movie_title"], validate)
+    return oscars_data.merge(critics_data, on="movie_title", how="inner")
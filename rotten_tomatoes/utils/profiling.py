@@ -0,0 +1,208 @@
+"""
+Timing and memory profiles of the stages of DataCleaners and pipeline steps.
+
+Each stage (e.g. read, clean, validate, or a merge) records its wall time, CPU
+time, rows in and out, and memory: if memory tracing is on, the peak memory
+traced by tracemalloc while the stage ran, and always the peak resident set size
+of the whole process so far when the stage ended (process_max_rss_bytes), which
+is not specific to the stage. Stages run more than once, like the reads of each
+chunk, are summed.
+Stages may optionally be profiled with cProfile, writing one .prof file per
+stage, for comparing runs with pstats or snakeviz.
+
+utils.profiling exports the following classes and functions:
+    StageProfile
+    write_run_report
+"""
+import cProfile
+import datetime
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, Optional
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# If set, stages are profiled with cProfile into this directory by default.
+CPROFILE_DIR_VARIABLE = "ROTTEN_TOMATOES_CPROFILE_DIR"
+
+
+def _process_max_rss_bytes() -> Optional[int]:
+    """Returns the peak resident set size of this process over its lifetime, where
+    available."""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, and kilobytes elsewhere.
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+class StageProfile:
+    """Wall time, CPU time, rows and memory of named stages."""
+
+    def __init__(
+        self,
+        name: str = "",
+        trace_memory: bool = False,
+        cprofile_dir: Optional[str] = None,
+    ) -> None:
+        """
+        Initialize an empty profile.
+
+        Parameters:
+        ----------
+        name: str
+            Name of the profiled cleaner or step, used to name cProfile files.
+        trace_memory: bool
+            If True, trace allocations with tracemalloc while each stage runs, and
+            record the peak. Tracing slows allocation-heavy code down noticeably.
+        cprofile_dir: Optional[str]
+            If set, each stage is profiled with cProfile, and its stats written to
+            <cprofile_dir>/<name>.<stage>.prof. Defaults to the directory in the
+            ROTTEN_TOMATOES_CPROFILE_DIR environment variable, if set.
+        """
+        self.name = name
+        self.trace_memory = trace_memory
+        self.cprofile_dir = cprofile_dir or os.environ.get(CPROFILE_DIR_VARIABLE)
+        self.stages: Dict[str, dict] = {}
+        self._profilers: Dict[str, cProfile.Profile] = {}
+
+    def reset(self) -> None:
+        """Clear the recorded stages, keeping the settings."""
+        self.stages = {}
+        self._profilers = {}
+
+    @contextmanager
+    def stage(self, stage: str, rows_in: Optional[int] = None) -> Iterator[dict]:
+        """
+        Record a run of a stage. Stages must not be nested.
+
+        Parameters:
+        ----------
+        stage: str
+            Stage name. Runs of a stage with the same name are summed.
+        rows_in: Optional[int]
+            Number of rows the stage receives.
+
+        Returns:
+        -------
+        Context manager yielding a dict, in which the number of rows the stage
+        produces can be set as rows_out.
+        """
+        run = {"rows_in": rows_in, "rows_out": None}
+        tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        profiler = None
+        if self.cprofile_dir is not None:
+            profiler = self._profilers.setdefault(stage, cProfile.Profile())
+            profiler.enable()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield run
+        finally:
+            wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+            if profiler is not None:
+                profiler.disable()
+            peak = None
+            if tracing:
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            self._record(stage, wall, cpu, run, peak)
+
+    def iterate(self, stage: str, items: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """
+        Iterate over chunks, recording the time taken to produce each one (e.g. to
+        read it) as a run of stage, with the chunk's rows as rows_out.
+        """
+        items = iter(items)
+        while True:
+            with self.stage(stage) as run:
+                item = next(items, None)
+                if item is not None:
+                    run["rows_out"] = item.shape[0]
+            if item is None:
+                return
+            yield item
+
+    def finish(self) -> None:
+        """Write the cProfile stats of each stage, if profiling with cProfile."""
+        if self.cprofile_dir is None or not self._profilers:
+            return
+        os.makedirs(self.cprofile_dir, exist_ok=True)
+        for stage, profiler in self._profilers.items():
+            file_name = f"{self.name}.{stage}.prof" if self.name else f"{stage}.prof"
+            profiler.dump_stats(os.path.join(self.cprofile_dir, file_name))
+        self._profilers = {}
+
+    def __getstate__(self) -> dict:
+        """Returns the profile to pickle, e.g. to send it to or from a worker
+        process, without the cProfile profilers of its stages, which cannot be
+        pickled. Their stats are only written by the original profile."""
+        state = self.__dict__.copy()
+        state["_profilers"] = {}
+        return state
+
+    def __getitem__(self, stage: str) -> dict:
+        return self.stages[stage]
+
+    def to_dict(self) -> dict:
+        """Returns the stages, in the order first run, as a JSON-serializable dict."""
+        return {stage: dict(record) for stage, record in self.stages.items()}
+
+    def _record(
+        self, stage: str, wall: float, cpu: float, run: dict, peak: Optional[int]
+    ) -> None:
+        """Add a run of stage to its totals."""
+        record = self.stages.setdefault(
+            stage,
+            {
+                "calls": 0,
+                "wall_seconds": 0.0,
+                "cpu_seconds": 0.0,
+                "rows_in": None,
+                "rows_out": None,
+                "peak_traced_bytes": None,
+                "process_max_rss_bytes": None,
+            },
+        )
+        record["calls"] += 1
+        record["wall_seconds"] += wall
+        record["cpu_seconds"] += cpu
+        for rows in ["rows_in", "rows_out"]:
+            if run[rows] is not None:
+                record[rows] = (record[rows] or 0) + int(run[rows])
+        if peak is not None:
+            record["peak_traced_bytes"] = max(record["peak_traced_bytes"] or 0, peak)
+        record["process_max_rss_bytes"] = _process_max_rss_bytes()
+
+
+def write_run_report(profiles: Dict[str, StageProfile], path: str) -> None:
+    """
+    Write the stage profiles of several cleaners or steps to one JSON report, with
+    the time and environment of the run, so runs can be compared over time.
+
+    Parameters:
+    ----------
+    profiles: Dict[str, StageProfile]
+        Step name -> profile of that step.
+    path: str
+        JSON file to write.
+    """
+    report = {
+        "finished": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "steps": {name: profile.to_dict() for name, profile in profiles.items()},
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
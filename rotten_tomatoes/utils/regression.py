@@ -4,10 +4,14 @@ from typing import Dict, Literal, Optional, Union
 import pandas as pd
 import numpy as np
 
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LinearRegression, LogisticRegression
-import matplotlib.pyplot as plt
-import seaborn as sns
+from .lazy import LazyModule
+
+# Imported on first use, so importing this module, e.g. for batch scoring or with
+# the cleaning pipeline, neither loads them nor starts a plotting backend.
+linear_model = LazyModule("sklearn.linear_model")
+model_selection = LazyModule("sklearn.model_selection")
+plt = LazyModule("matplotlib.pyplot")
+sns = LazyModule("seaborn")
 
 # pylint: disable=C0103,R0902,R0913
 
@@ -48,9 +52,9 @@ class RegressionAnalysis:
         self.random_state = 123
 
         if is_categorical:
-            self.model_ = LogisticRegression(class_weight=class_weights)
+            self.model_ = linear_model.LogisticRegression(class_weight=class_weights)
         else:
-            self.model_ = LinearRegression()
+            self.model_ = linear_model.LinearRegression()
 
         (
             self.X_train_,
@@ -83,7 +87,7 @@ class RegressionAnalysis:
             X_train = X_test = X
             y_train = y_test = y
         else:
-            X_train, X_test, y_train, y_test = train_test_split(
+            X_train, X_test, y_train, y_test = model_selection.train_test_split(
                 X, y, test_size=test_size, random_state=random_state
             )
 
@@ -0,0 +1,154 @@
+"""
+Bounded cache of raw review score strings to cleaned scores.
+
+The review_score column only has a few thousand distinct values, so a cache of
+raw string -> cleaned float lets repeated runs (and different critic datasets)
+skip parsing values they have already seen. Each entry also records which
+cleaning path produced it (e.g. "fraction" or "capped"), for run metrics. The
+cache can be persisted to a JSON file between runs.
+
+Entries are kept in namespaces, e.g. one per cleaner class, version and
+correction tables (see CriticsDataCleaner.score_namespace), so scores cleaned
+under one set of rules are never returned under another.
+
+utils.score_cache exports the following classes:
+    ScoreCache
+"""
+import json
+import math
+import os
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class ScoreCache:
+    """Least-recently-used cache of (namespace, raw score string) -> cleaned score."""
+
+    def __init__(self, max_size: int = 100_000, path: Optional[str] = None) -> None:
+        """
+        Initialize a ScoreCache, loading any entries saved at path.
+
+        Parameters:
+        ----------
+        max_size: int
+            Maximum number of entries to hold. Least recently used entries are
+            evicted first.
+        path: Optional[str]
+            JSON file the cache is loaded from and saved to. If None, the cache
+            only lives in memory.
+        """
+        if max_size <= 0:
+            raise ValueError("max_size must be positive!")
+        self.max_size = max_size
+        self.path = path
+        # (namespace, raw score) -> (cleaned score, cleaning path)
+        self._entries = OrderedDict()
+        self._dirty = False
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, raw: str) -> bool:
+        """Whether raw is cached in the default namespace."""
+        return ("", raw) in self._entries
+
+    def lookup(
+        self, raw_scores: Iterable[str], namespace: str = ""
+    ) -> Tuple[Dict[str, float], List[str]]:
+        """
+        Look up many raw scores at once.
+
+        Parameters:
+        ----------
+        raw_scores: Iterable[str]
+            Raw score strings to look up.
+        namespace: str
+            Namespace to look the scores up in.
+
+        Returns:
+        -------
+        Tuple of a dict of cached raw score -> cleaned score, and a list of the
+        raw scores that were not cached.
+        """
+        hits = {}
+        misses = []
+        for raw in raw_scores:
+            key = (namespace, raw)
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                hits[raw] = self._entries[key][0]
+            else:
+                misses.append(raw)
+        return hits, misses
+
+    def paths(self, raw_scores: Iterable[str], namespace: str = "") -> List[Optional[str]]:
+        """
+        Returns the cleaning path recorded for each raw score in namespace, or None
+        if the score is not cached or no path was recorded. Does not affect recency.
+        """
+        return [
+            self._entries[(namespace, raw)][1] if (namespace, raw) in self._entries else None
+            for raw in raw_scores
+        ]
+
+    def update(
+        self,
+        cleaned: Dict[str, float],
+        paths: Optional[Dict[str, str]] = None,
+        namespace: str = "",
+    ) -> None:
+        """
+        Add cleaned scores to the cache, evicting the oldest entries if needed.
+
+        Parameters:
+        ----------
+        cleaned: Dict[str, float]
+            Raw score -> cleaned score. NaN marks a score that cannot be cleaned
+            (e.g. a zero denominator).
+        paths: Optional[Dict[str, str]]
+            Raw score -> name of the cleaning path that produced the cleaned score.
+        namespace: str
+            Namespace to add the scores to.
+        """
+        paths = paths or {}
+        for raw, score in cleaned.items():
+            self._entries[(namespace, raw)] = (float(score), paths.get(raw))
+            self._entries.move_to_end((namespace, raw))
+            self._dirty = True
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def load(self) -> None:
+        """Replace the cache contents with the entries saved at self.path."""
+        with open(self.path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        self._entries = OrderedDict()
+        for namespace, entries in saved.items():
+            # Older files hold entries without a namespace, so it is not known
+            # which rules cleaned them. Skip those, so the scores are parsed again.
+            if not isinstance(entries, dict):
+                continue
+            cleaned = {}
+            paths = {}
+            for raw, (score, path) in entries.items():
+                cleaned[raw] = math.nan if score is None else score
+                paths[raw] = path
+            self.update(cleaned, paths, namespace)
+        self._dirty = False
+
+    def save(self) -> None:
+        """Write the cache to self.path, if it has changed since it was loaded."""
+        if self.path is None or not self._dirty:
+            return
+        entries = {}
+        for (namespace, raw), (score, path) in self._entries.items():
+            entries.setdefault(namespace, {})[raw] = [
+                None if math.isnan(score) else score, path
+            ]
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
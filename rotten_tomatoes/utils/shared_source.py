@@ -0,0 +1,72 @@
+"""
+In-memory registry of base-cleaned source frames shared between DataCleaners.
+
+Several cleaners can be built on the same raw file and the same base cleaning
+(e.g. the Oscars cleaners, which all start from OscarsDataCleaner._clean). With a
+SharedSources registry, the first such cleaner reads and base-cleans the file,
+and the others reuse that frame, applying only their own derivation.
+
+A registry pickles as an empty registry, so cleaners sent to another process
+together (e.g. by utils.pipeline.run_cleaners) still share one read there.
+
+utils.shared_source exports the following classes:
+    SharedSources
+"""
+import threading
+from typing import Callable, Dict, Hashable, Tuple
+import pandas as pd
+
+
+class SharedSources:
+    """Registry of base-cleaned frames, keyed by source and base cleaning."""
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._frames: Dict[Hashable, pd.DataFrame] = {}
+        self._rows_read: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def __getstate__(self):
+        """Pickle an empty registry; frames and the lock stay in this process."""
+        return {}
+
+    def __setstate__(self, state):
+        self.__init__()
+
+    def get(
+        self, key: Hashable, load: Callable[[], Tuple[pd.DataFrame, int]]
+    ) -> pd.DataFrame:
+        """
+        Returns the frame for key, calling load to build it on first use.
+
+        The returned frame is shared, so callers must treat it as read-only.
+
+        Parameters:
+        ----------
+        key: Hashable
+            Identifies the source file and base cleaning.
+        load: Callable[[], Tuple[pd.DataFrame, int]]
+            Reads and base-cleans the source, returning the frame and the number
+            of raw rows read.
+
+        Returns:
+        -------
+        Shared pandas DataFrame.
+        """
+        with self._lock:
+            if key not in self._frames:
+                self._frames[key], self._rows_read[key] = load()
+                self.loads += 1
+            return self._frames[key]
+
+    def rows_read(self, key: Hashable) -> int:
+        """Returns the number of raw rows read to build the frame for key."""
+        with self._lock:
+            return self._rows_read[key]
+
+    def clear(self) -> None:
+        """Release every shared frame."""
+        with self._lock:
+            self._frames.clear()
+            self._rows_read.clear()
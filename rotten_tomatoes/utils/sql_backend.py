@@ -0,0 +1,501 @@
+"""
+Out-of-core merges and aggregations in an embedded SQLite database.
+
+Cleaners stream their chunks into tables (see SqlBackend.sink), and the merge
+and aggregation steps of utils.pipeline are then run as SQL inside the database,
+which spills sorts, joins and groupings to disk rather than holding them in
+memory. Results are read back with the row order and dtypes (including
+categories) of the pandas steps: the dtypes are found by running the pandas
+step on empty frames with the dtypes of the input tables.
+
+utils.sql_backend exports the following classes:
+    SqlTableSink
+    SqlBackend
+"""
+import os
+import sqlite3
+import tempfile
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+import pandas as pd
+
+from .data_cleaning import AnyWinOscarsDataCleaner, MergeExpansionException
+from .metrics import CleaningMetrics
+from .pipeline import aggregate_critics, merge_movie_titles, merge_oscars, unique_sides
+
+
+def _quote(name: str) -> str:
+    """Quote a table or column name for SQL."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _columns(names: List[str], alias: Optional[str] = None) -> str:
+    """Comma separated quoted column names, optionally qualified by a table alias."""
+    prefix = "" if alias is None else f"{alias}."
+    return ", ".join(prefix + _quote(name) for name in names)
+
+
+class SqlTableSink:
+    """Appends DataCleaner chunks to a table of a SqlBackend."""
+
+    def __init__(self, backend: "SqlBackend", table: str) -> None:
+        """
+        Initialize a SqlTableSink. Any existing table of that name is replaced.
+
+        Parameters:
+        ----------
+        backend: SqlBackend
+            Database to write to.
+        table: str
+            Table to write.
+        """
+        self.backend = backend
+        self.table = table
+        self.rows_written = 0
+        backend.drop(table)
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        """Append a chunk to the table."""
+        self.backend.append(self.table, chunk)
+        self.rows_written += chunk.shape[0]
+
+    def close(self) -> None:
+        """Commit the rows written."""
+        self.backend.connection.commit()
+
+
+class SqlBackend:
+    """Runs the pipeline merges and aggregations in an on-disk SQLite database."""
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        """
+        Open (or create) the database.
+
+        Parameters:
+        ----------
+        path: Optional[str]
+            Database file. If None, a temporary file is used, and removed by close().
+        """
+        self._tmp_path = None
+        if path is None:
+            fd, path = tempfile.mkstemp(suffix=".sqlite")
+            os.close(fd)
+            self._tmp_path = path
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        # The database is scratch space rebuilt on every run, so skip durability,
+        # and keep temporary sort and index structures on disk too.
+        self.connection.execute("PRAGMA journal_mode = OFF")
+        self.connection.execute("PRAGMA synchronous = OFF")
+        self.connection.execute("PRAGMA temp_store = FILE")
+        # Table name -> empty frame with the pandas dtypes of the table.
+        self._templates: Dict[str, pd.DataFrame] = {}
+
+    def sink(self, table: str) -> SqlTableSink:
+        """Returns a sink writing DataCleaner output to table (see utils.streaming)."""
+        return SqlTableSink(self, table)
+
+    def write(self, table: str, data: pd.DataFrame) -> None:
+        """Write data to table, replacing any existing table of that name."""
+        self.drop(table)
+        self.append(table, data)
+        self.connection.commit()
+
+    def append(self, table: str, data: pd.DataFrame) -> None:
+        """
+        Append data to table, creating it if needed. Categories of categorical
+        columns are combined with those of earlier appends.
+        """
+        template = data.iloc[:0]
+        if table in self._templates:
+            previous = self._templates[table]
+            for col, dtype in previous.dtypes.items():
+                if isinstance(dtype, pd.CategoricalDtype):
+                    categories = sorted(
+                        set(dtype.categories) | set(data[col].cat.categories)
+                    )
+                    template = template.astype(
+                        {col: pd.CategoricalDtype(categories)}
+                    )
+        self._templates[table] = template
+
+        # SQLite stores plain Python values: categories as their values, and
+        # missing values of nullable extension dtypes as NULL.
+        values = data.copy()
+        for col, dtype in data.dtypes.items():
+            if pd.api.types.is_extension_array_dtype(dtype):
+                values[col] = data[col].astype("object").where(data[col].notna(), None)
+        values.to_sql(table, self.connection, if_exists="append", index=False)
+
+    def read(
+        self, table: str, chunksize: Optional[int] = None
+    ) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+        """
+        Read a table, in the order its rows were written, with its pandas dtypes.
+
+        Parameters:
+        ----------
+        table: str
+            Table to read.
+        chunksize: Optional[int]
+            If given, an iterator of chunks of this many rows is returned.
+
+        Returns:
+        -------
+        Pandas DataFrame with a RangeIndex, or an iterator of DataFrame chunks
+        continuing it.
+        """
+        template = self._templates[table]
+        query = f"SELECT * FROM {_quote(table)} ORDER BY rowid"
+        if chunksize is None:
+            return self._restore(
+                pd.read_sql_query(query, self.connection), template
+            )
+        return self._read_chunks(query, template, chunksize)
+
+    def drop(self, table: str) -> None:
+        """Drop table, if it exists."""
+        self.connection.execute(f"DROP TABLE IF EXISTS {_quote(table)}")
+        self._templates.pop(table, None)
+
+    def close(self) -> None:
+        """Close the connection, removing the database if it was temporary."""
+        self.connection.close()
+        if self._tmp_path is not None and os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+    def merge_movie_titles(
+        self,
+        critics: str,
+        movies: str,
+        out: str,
+        metrics: Optional[CleaningMetrics] = None,
+    ) -> None:
+        """
+        Run utils.pipeline.merge_movie_titles on the critics and movies tables,
+        writing the result to table out. If metrics is given, the reviews dropped
+        for lack of a movie title are counted as rows_without_title.
+
+        Raises:
+        -------
+        MergeExpansionException
+            A rotten_tomatoes_link has more than one title.
+        """
+        key = _quote("rotten_tomatoes_link")
+        title_columns = _columns(["rotten_tomatoes_link", "movie_title"])
+        self._execute_script(
+            f"""
+            DROP TABLE IF EXISTS temp.titles;
+            CREATE TEMP TABLE titles AS
+                SELECT {title_columns} FROM {_quote(movies)}
+                WHERE rowid IN (
+                    SELECT MIN(rowid) FROM {_quote(movies)} GROUP BY {title_columns}
+                )
+                ORDER BY rowid;
+            CREATE INDEX temp.titles_link ON titles ({key});
+            """
+        )
+        self._check_unique("titles", ["rotten_tomatoes_link"], "many_to_one", "right")
+
+        critics_columns = list(self._templates[critics].columns)
+        self._create(
+            out,
+            self._inner_join(
+                _quote(critics),
+                "temp.titles",
+                "rotten_tomatoes_link",
+                critics_columns,
+                ["movie_title"],
+            ),
+            merge_movie_titles(self._templates[critics], self._templates[movies]),
+        )
+        self.connection.execute("DROP TABLE temp.titles")
+        if metrics is not None:
+            metrics.add(
+                "rows_without_title", self._count(_quote(critics)) - self._count(_quote(out))
+            )
+
+    def aggregate_critics(self, critics: str, out: str, chunksize: int = 100_000) -> None:
+        """
+        Run utils.pipeline.aggregate_critics on the critics table, writing the
+        result to table out.
+
+        The reviews are read sorted by movie, with each movie's reviews in the
+        order they were written, and aggregate_critics itself is run on chunks of
+        whole movies. So the aggregates are exactly those of pandas, summed in the
+        same order, while only about chunksize reviews are held in memory.
+        """
+        keys = ["rotten_tomatoes_link", "movie_title"]
+        columns = keys + ["review_score", "top_critic", "review_type"]
+        template = self._templates[critics][columns]
+        scratch = f"{out}_movies"
+        self.write(scratch, aggregate_critics(template))
+
+        chunks = pd.read_sql_query(
+            f"""
+            SELECT {_columns(columns)} FROM {_quote(critics)}
+            WHERE {" AND ".join(f"{_quote(key)} IS NOT NULL" for key in keys)}
+            ORDER BY {_columns(keys)}, rowid
+            """,
+            self.connection,
+            chunksize=chunksize,
+        )
+        carried = template.iloc[:0]
+        for chunk in chunks:
+            chunk = pd.concat([carried, self._restore(chunk, template)], ignore_index=True)
+            # The last movie may continue in the next chunk, so is carried over.
+            last = (chunk[keys] == chunk[keys].iloc[-1]).all(axis=1)
+            carried = chunk.loc[last]
+            if not last.all():
+                self.append(scratch, aggregate_critics(chunk.loc[~last]))
+        if not carried.empty:
+            self.append(scratch, aggregate_critics(carried))
+
+        self._create(
+            out,
+            f"SELECT * FROM {_quote(scratch)} ORDER BY {_columns(keys)}",
+            aggregate_critics(template),
+        )
+        self.drop(scratch)
+
+    def merge_oscars(  # pylint: disable=R0913
+        self,
+        oscars: str,
+        critics: str,
+        out: str,
+        validate: Optional[str] = None,
+        metrics: Optional[CleaningMetrics] = None,
+        *,
+        oscars_keys: Optional[Sequence[str]] = None,
+        critics_keys: Optional[Sequence[str]] = None,
+    ) -> None:
+        """
+        Run utils.pipeline.merge_oscars on the oscars and critics tables, writing
+        the result to table out. validate, metrics and the identity columns
+        oscars_keys and critics_keys are as for merge_oscars; title matching is
+        not supported.
+
+        Raises:
+        -------
+        MergeExpansionException
+            validate is given, and the movie titles do not have that cardinality.
+        """
+        title = _quote("movie_title")
+        oscars_columns = list(self._templates[oscars].columns)
+        renamed = ["movie_title" if col == "film" else col for col in oscars_columns]
+        critics_columns = list(self._templates[critics].columns)
+        other_columns = [col for col in critics_columns if col != "movie_title"]
+        oscars_keys = oscars_columns if oscars_keys is None else list(oscars_keys)
+        critics_keys = critics_columns if critics_keys is None else list(critics_keys)
+        select_renamed = ", ".join(
+            f"{_quote(col)} AS {_quote(name)}"
+            for col, name in zip(oscars_columns, renamed)
+        )
+        self._execute_script(
+            f"""
+            DROP TABLE IF EXISTS temp.oscars_rows;
+            DROP TABLE IF EXISTS temp.critics_rows;
+            CREATE TEMP TABLE oscars_rows AS
+                SELECT {select_renamed}
+                FROM {_quote(oscars)}
+                WHERE rowid IN (
+                    SELECT MIN(rowid) FROM {_quote(oscars)}
+                    GROUP BY {_columns(oscars_keys)}
+                )
+                ORDER BY rowid;
+            CREATE INDEX temp.oscars_rows_title ON oscars_rows ({title});
+            CREATE TEMP TABLE critics_rows AS
+                SELECT {_columns(critics_columns)}
+                FROM {_quote(critics)}
+                WHERE rowid IN (
+                    SELECT MIN(c.rowid) FROM {_quote(critics)} AS c
+                    WHERE EXISTS (
+                        SELECT 1 FROM temp.oscars_rows AS o
+                        WHERE o.{title} IS c.{title}
+                    )
+                    GROUP BY {_columns(critics_keys, "c")}
+                )
+                ORDER BY rowid;
+            CREATE INDEX temp.critics_rows_title ON critics_rows ({title});
+            """
+        )
+        if metrics is not None:
+            metrics.add(
+                "duplicate_oscars_rows",
+                self._count(_quote(oscars)) - self._count("temp.oscars_rows"),
+            )
+            reviewed = self._count(
+                f"""{_quote(critics)} AS c
+                WHERE EXISTS (
+                    SELECT 1 FROM temp.oscars_rows AS o WHERE o.{title} IS c.{title}
+                )"""
+            )
+            metrics.add(
+                "duplicate_critics_rows", reviewed - self._count("temp.critics_rows")
+            )
+        if validate is not None:
+            self._check_cardinality("oscars_rows", "critics_rows", validate)
+
+        self._create(
+            out,
+            self._inner_join(
+                "temp.oscars_rows",
+                "temp.critics_rows",
+                "movie_title",
+                renamed,
+                other_columns,
+            ),
+            merge_oscars(self._templates[oscars], self._templates[critics]),
+        )
+        self._execute_script(
+            "DROP TABLE temp.oscars_rows; DROP TABLE temp.critics_rows;"
+        )
+
+    def any_win(self, oscars: str, out: str) -> None:
+        """
+        Count wins per film from the output of OscarsDataCleaner in the oscars
+        table, as AnyWinOscarsDataCleaner does, writing the result to table out.
+        """
+        keys = _columns(["year_film", "film"])
+        self._create(
+            out,
+            f"""
+            SELECT {keys}, SUM(CAST({_quote("winner")} AS INTEGER)) AS num_wins
+            FROM {_quote(oscars)}
+            WHERE {_quote("year_film")} IS NOT NULL AND {_quote("film")} IS NOT NULL
+            GROUP BY {keys}
+            ORDER BY {keys}
+            """,
+            AnyWinOscarsDataCleaner()._derive(self._templates[oscars]),  # pylint: disable=W0212
+        )
+
+    def _inner_join(
+        self,
+        left: str,
+        right: str,
+        key: str,
+        left_columns: List[str],
+        right_columns: List[str],
+    ) -> str:
+        """
+        Returns a query for the inner join of left and right on key, with the row
+        order of pandas' inner merge (pandas 1.5). That is the order of the left
+        rows if each matches exactly one right row. Otherwise rows are grouped by
+        key, in order of each key's first left row, and by left row and then right
+        row within each key.
+
+        Parameters:
+        ----------
+        left: str
+            Left table.
+        right: str
+            Right table.
+        key: str
+            Join column. Missing keys match each other, as in pandas.
+        left_columns: List[str]
+            Columns selected from left, in order.
+        right_columns: List[str]
+            Columns selected from right, after those of left.
+        """
+        key = _quote(key)
+        # Right keys are counted once, rather than once per left row.
+        (left_order,) = self.connection.execute(
+            f"""
+            WITH counts AS (
+                SELECT {key}, COUNT(*) AS n FROM {right} GROUP BY {key}
+            )
+            SELECT NOT EXISTS (
+                SELECT 1 FROM {left} AS l
+                LEFT JOIN counts AS c ON l.{key} IS c.{key}
+                WHERE c.n IS NOT 1
+            )
+            """
+        ).fetchone()
+        order = (
+            "left_row, right_row"
+            if left_order
+            else "key_row, left_row, right_row"
+        )
+        return f"""
+            SELECT {_columns(left_columns + right_columns)} FROM (
+                SELECT {_columns(left_columns, "l")}, {_columns(right_columns, "r")},
+                    l.rowid AS left_row,
+                    r.rowid AS right_row,
+                    MIN(l.rowid) OVER (PARTITION BY l.{key}) AS key_row
+                FROM {left} AS l
+                JOIN {right} AS r ON l.{key} IS r.{key}
+            )
+            ORDER BY {order}
+        """
+
+    def _read_chunks(
+        self, query: str, template: pd.DataFrame, chunksize: int
+    ) -> Iterator[pd.DataFrame]:
+        """Yields the rows of query in chunks, with the dtypes of template."""
+        offset = 0
+        for chunk in pd.read_sql_query(query, self.connection, chunksize=chunksize):
+            chunk.index = pd.RangeIndex(offset, offset + chunk.shape[0])
+            offset += chunk.shape[0]
+            yield self._restore(chunk, template)
+
+    def _count(self, rows: str) -> int:
+        """Returns the number of rows of a table, optionally followed by a WHERE clause."""
+        (count,) = self.connection.execute(f"SELECT COUNT(*) FROM {rows}").fetchone()
+        return count
+
+    def _execute_script(self, script: str) -> None:
+        """Run several SQL statements."""
+        self.connection.executescript(script)
+
+    def _create(self, table: str, query: str, template: pd.DataFrame) -> None:
+        """Store the result of query as table, with the dtypes of template."""
+        self.drop(table)
+        self.connection.execute(f"CREATE TABLE {_quote(table)} AS {query}")
+        self.connection.commit()
+        # pandas merges of empty frames may order columns differently, so only the
+        # dtypes are taken from template; the query orders columns as pandas does.
+        columns = [
+            description[0]
+            for description in self.connection.execute(
+                f"SELECT * FROM {_quote(table)} LIMIT 0"
+            ).description
+        ]
+        self._templates[table] = template.iloc[:0][columns]
+
+    def _check_cardinality(self, left: str, right: str, validate: str) -> None:
+        """Check the movie_title cardinality of a merge of two temp tables."""
+        for side in unique_sides(validate):
+            table = left if side == "left" else right
+            self._check_unique(table, ["movie_title"], validate, side)
+
+    def _check_unique(
+        self, table: str, on: List[str], validate: str, side: str, max_keys: int = 5
+    ) -> None:
+        """
+        Raise a MergeExpansionException, as check_merge_cardinality does, if the on
+        columns of the temp table on the given side of a merge are not unique.
+        """
+        duplicated = self.connection.execute(
+            f"""
+            SELECT {_columns(on)} FROM temp.{_quote(table)}
+            GROUP BY {_columns(on)} HAVING COUNT(*) > 1
+            ORDER BY MIN(rowid)
+            """
+        ).fetchall()
+        if duplicated:
+            raise MergeExpansionException(
+                f"{len(duplicated)} keys {on} are duplicated in the {side} data, "
+                f"so a {validate} merge would expand rows. Duplicated keys include "
+                f"{duplicated[:max_keys]}."
+            )
+
+    @staticmethod
+    def _restore(data: pd.DataFrame, template: pd.DataFrame) -> pd.DataFrame:
+        """Cast columns read from SQLite back to the dtypes of template."""
+        columns = {}
+        for col, dtype in template.dtypes.items():
+            if dtype == object:
+                # NULLs come back as None, where pandas has NaN.
+                columns[col] = data[col].where(data[col].notna(), float("nan"))
+            else:
+                columns[col] = data[col].astype(dtype)
+        return pd.DataFrame(columns, index=data.index)
@@ -0,0 +1,157 @@
+"""
+Reading and writing DataCleaner data in chunks.
+
+A sink receives each cleaned, validated chunk through write(), and is closed
+once the last chunk has been written. prefetch reads chunks ahead in a
+background thread, so the next chunk is parsed while the current one is
+cleaned.
+
+utils.streaming exports the following classes and functions:
+    prefetch
+    DataFrameSink
+    CsvSink
+"""
+import os
+import queue
+import threading
+from typing import Iterable, Iterator, List, Optional, TypeVar
+import pandas as pd
+
+T = TypeVar("T")
+
+# Seconds a blocked producer waits before checking whether it should stop.
+_POLL_INTERVAL = 0.1
+
+
+def prefetch(items: Iterable[T], depth: int = 2) -> Iterator[T]:
+    """
+    Iterate over items, producing them in a background thread up to depth items
+    ahead of the consumer.
+
+    The queue between the threads holds at most depth items, so at most depth + 2
+    items (queued, being produced and being consumed) are in memory at once.
+    Exceptions raised while producing are re-raised to the consumer. If the
+    consumer stops early, the producer stops after the item it is producing.
+
+    Parameters:
+    ----------
+    items: Iterable[T]
+        Items to produce, e.g. the chunks of a pd.read_csv reader. Reading a csv
+        releases the GIL for much of its I/O and parsing.
+    depth: int
+        Maximum number of items produced ahead.
+
+    Returns:
+    -------
+    Iterator over items, in order.
+    """
+    if depth < 1:
+        raise ValueError("Prefetch depth must be at least 1!")
+    return _prefetch(items, depth)
+
+
+def _prefetch(items: Iterable[T], depth: int) -> Iterator[T]:
+    """Generator for prefetch, which starts its producer on the first next()."""
+    buffer: queue.Queue = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(entry) -> bool:
+        """Queue an entry, returning False if the consumer stopped first."""
+        while not stop.is_set():
+            try:
+                buffer.put(entry, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in items:
+                if not put(("item", item)):
+                    return
+        except BaseException as error:  # pylint: disable=W0718
+            put(("error", error))
+            return
+        put(("done", None))
+
+    producer = threading.Thread(target=produce, name="prefetch", daemon=True)
+    producer.start()
+    try:
+        while True:
+            kind, value = buffer.get()
+            if kind == "done":
+                return
+            if kind == "error":
+                raise value
+            yield value
+    finally:
+        stop.set()
+        producer.join()
+
+
+class DataFrameSink:
+    """Collects chunks in memory and concatenates them into one DataFrame."""
+
+    def __init__(self) -> None:
+        """Initialize an empty DataFrameSink."""
+        self.chunks: List[pd.DataFrame] = []
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        """Append a chunk."""
+        self.chunks.append(chunk)
+
+    def close(self) -> None:
+        """Nothing to release for an in-memory sink."""
+
+    def result(self) -> Optional[pd.DataFrame]:
+        """Returns all chunks concatenated, or None if nothing was written."""
+        if not self.chunks:
+            return None
+        data = pd.concat(self.chunks)
+        # Chunks with different categories concatenate to object columns, so
+        # restore the categorical dtype over the union of the chunks' categories,
+        # which matches the categories of a single read of the whole file.
+        for col, dtype in self.chunks[0].dtypes.items():
+            if isinstance(dtype, pd.CategoricalDtype):
+                categories = sorted(
+                    set().union(*(chunk[col].cat.categories for chunk in self.chunks))
+                )
+                data[col] = pd.Categorical(data[col], categories=categories)
+        return data
+
+
+class CsvSink:
+    """Appends chunks to a csv file, writing the header with the first chunk."""
+
+    def __init__(self, path: str, index: bool = False) -> None:
+        """
+        Initialize a CsvSink. Any existing file at path is replaced.
+
+        Parameters:
+        ----------
+        path: str
+            Output csv location.
+        index: bool
+            Whether to write the DataFrame index.
+        """
+        self.path = path
+        self.index = index
+        self.rows_written = 0
+        self._started = False
+        if os.path.exists(path):
+            os.remove(path)
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        """Append a chunk to the csv."""
+        chunk.to_csv(
+            self.path,
+            mode="a" if self._started else "w",
+            header=not self._started,
+            index=self.index,
+        )
+        self._started = True
+        self.rows_written += chunk.shape[0]
+
+    def close(self) -> None:
+        """Nothing to release; each write opens and closes the file."""
@@ -0,0 +1,498 @@
+"""
+Synthetic, Kaggle-shaped raw datasets for benchmarking and load testing the
+pipeline offline.
+
+The generated rotten_tomatoes_critic_reviews.csv, rotten_tomatoes_movies.csv and
+the_oscar_award.csv have the columns of the Kaggle files, and about scale times
+their row counts (see REAL_ROW_COUNTS). They reproduce what the cleaners have to
+deal with: null scores, scores written as numbers, fractions out of 4, 5, 10 or
+100 and letter grades, a few malformed scores (manual corrections, zero
+denominators, scores over the maximum, spaced letters), null ratings and films,
+movies sharing a title, and Oscars films which are, or are not, Rotten Tomatoes
+titles, some written a little differently.
+
+Generation is vectorized and seeded: the same scale and seed always give the same
+files. The critic reviews are generated and written in chunks, so large scales
+do not need to fit in memory.
+
+utils.synthetic exports the following functions:
+    generate_movies
+    generate_oscars
+    generate_critic_reviews
+    write_synthetic_datasets
+"""
+import os
+from typing import Dict, Iterator
+
+import numpy as np
+import pandas as pd
+
+from .data_cleaning import CriticsDataCleaner, MoviesDataCleaner, OscarsDataCleaner
+
+# Generators build many columns, each in a local variable.
+# pylint: disable=R0914
+
+# Row counts of the Kaggle files, generated at scale 1.
+REAL_ROW_COUNTS = {"critics": 1_130_017, "movies": 17_712, "oscars": 10_395}
+
+# Share of each way of writing a review score. Null scores are drawn first, then
+# the format of the others.
+NULL_SCORE_SHARE = 0.27
+SCORE_FORMATS = {
+    "fraction_10": 0.33,
+    "fraction_5": 0.24,
+    "fraction_4": 0.18,
+    "fraction_100": 0.02,
+    "letter": 0.15,
+    "numeric": 0.077,
+    "malformed": 0.003,
+}
+# Scores the cleaners correct manually, drop or cap, or only parse once spaces
+# are removed.
+MALFORMED_SCORES = list(CriticsDataCleaner.manual_corrections) + [
+    "0/0",
+    "3/0",
+    "6/5",
+    "11/10",
+    "105",
+    "120",
+    "B +",
+    "A -",
+]
+
+# Share of Oscars films which are Rotten Tomatoes titles, and the share of those
+# written differently (case, punctuation or a dropped leading article).
+TITLE_OVERLAP = 0.45
+TITLE_VARIANT_SHARE = 0.05
+
+# Movies sharing a title with another movie, e.g. remakes.
+DUPLICATE_TITLE_SHARE = 0.04
+
+# Critic reviews written per chunk.
+REVIEW_CHUNK_ROWS = 500_000
+
+# Oscars film years, and the name of the best picture category in each era.
+OSCARS_YEARS = (1927, 2019)
+BEST_PICTURE_ERAS = [
+    (1927, "OUTSTANDING PICTURE"),
+    (1941, "OUTSTANDING MOTION PICTURE"),
+    (1944, "BEST MOTION PICTURE"),
+    (1962, "BEST PICTURE"),
+]
+OSCARS_CATEGORIES = [
+    "ACTOR IN A LEADING ROLE",
+    "ACTRESS IN A LEADING ROLE",
+    "ACTOR IN A SUPPORTING ROLE",
+    "ACTRESS IN A SUPPORTING ROLE",
+    "DIRECTING",
+    "CINEMATOGRAPHY",
+    "FILM EDITING",
+    "ART DIRECTION",
+    "COSTUME DESIGN",
+    "MUSIC (Original Score)",
+    "MUSIC (Original Song)",
+    "SOUND",
+    "VISUAL EFFECTS",
+    "WRITING (Adapted Screenplay)",
+    "WRITING (Original Screenplay)",
+    "DOCUMENTARY (Feature)",
+    "FOREIGN LANGUAGE FILM",
+    "MAKEUP",
+]
+
+_ADJECTIVES = np.array([
+    "Silent", "Crimson", "Last", "Golden", "Broken", "Hidden", "Wild", "Lonely",
+    "Dark", "Bright", "Secret", "Lost", "Frozen", "Burning", "Quiet", "Endless",
+    "Savage", "Little", "Great", "Final", "Eternal", "Electric", "Forgotten",
+    "Restless", "Velvet", "Iron", "Scarlet", "Hollow", "Distant", "Midnight",
+    "Sweet", "Bitter", "Fallen", "Rising", "Shattered", "Gentle", "Fearless",
+    "Strange", "Invisible", "Northern",
+], dtype=object)
+_NOUNS = np.array([
+    "River", "Empire", "Garden", "Stranger", "Kingdom", "Summer", "Witness",
+    "Harbor", "Journey", "Promise", "Shadow", "Letter", "Island", "Mirror",
+    "Horizon", "Storm", "Heart", "Road", "Dream", "Sister", "Brother", "Soldier",
+    "Dancer", "Thief", "Queen", "King", "Winter", "Station", "Frontier", "Voyage",
+    "Song", "Game", "House", "Crown", "Circus", "Orchard", "Lighthouse", "Bridge",
+    "Desert", "Echo",
+], dtype=object)
+_PLACES = np.array([
+    "Paris", "Tokyo", "Brooklyn", "Texas", "the North", "the Sea", "Manhattan",
+    "Berlin", "the West", "Rome", "Cairo", "Mars", "Harlem", "Havana", "Dublin",
+    "Vienna", "Chicago", "Saigon", "the Moon", "Casablanca", "Bombay", "Alaska",
+    "London", "Tangier", "Nebraska", "Monaco", "Memphis", "Oslo", "Kyoto",
+    "Marseille", "Sicily", "Shanghai", "Lagos", "Lisbon", "Montana", "Seville",
+    "Madrid", "Athens", "Prague", "Venice",
+], dtype=object)
+_FIRST_NAMES = np.array([
+    "James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda",
+    "David", "Elizabeth", "Akira", "Sofia", "Pedro", "Ingrid", "Kenji", "Amara",
+    "Luca", "Mei", "Omar", "Greta",
+], dtype=object)
+_LAST_NAMES = np.array([
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis",
+    "Kurosawa", "Bergman", "Almodovar", "Rossi", "Nakamura", "Okafor", "Novak",
+    "Larsen", "Dubois", "Chen", "Haddad", "Walsh",
+], dtype=object)
+_REVIEW_CONTENT = np.array([
+    "A moving, beautifully acted film.",
+    "Overlong and underwritten, but never dull.",
+    "The cast is better than the material.",
+    "A bold, confident piece of filmmaking.",
+    "It never quite comes together.",
+    "Funny, sharp and surprisingly tender.",
+], dtype=object)
+_GENRES = np.array([
+    "Drama", "Comedy", "Action & Adventure", "Drama, Romance", "Documentary",
+    "Horror, Mystery & Suspense", "Art House & International, Drama",
+], dtype=object)
+_CONTENT_RATINGS = np.array(["G", "PG", "PG-13", "R", "NR"], dtype=object)
+
+
+def _rng(seed: int, *stream: int) -> np.random.Generator:
+    """Returns an independent random generator for one stream of one seed."""
+    return np.random.default_rng([seed, *stream])
+
+
+def _check_scale(scale: float) -> None:
+    """Raise a ValueError if scale is not a positive number."""
+    if not scale > 0:
+        raise ValueError(f"scale must be positive, not {scale}!")
+
+
+def _titles(ids: np.ndarray) -> np.ndarray:
+    """
+    Returns a distinct title for each distinct id, e.g. "The Silent River of
+    Paris", with a sequel number once the word combinations run out.
+    """
+    n_words = len(_ADJECTIVES)
+    combinations = 3 * n_words**3
+    rest, sequel = ids % combinations, ids // combinations
+    form, rest = rest % 3, rest // 3
+    adjectives = _ADJECTIVES[rest % n_words]
+    nouns = _NOUNS[(rest // n_words) % n_words]
+    places = _PLACES[rest // n_words**2]
+    titles = np.where(
+        form == 0,
+        "The " + adjectives + " " + nouns + " of " + places,
+        np.where(
+            form == 1,
+            adjectives + " " + nouns + " in " + places,
+            nouns + " of " + places + ": " + adjectives,
+        ),
+    )
+    numbered = sequel > 0
+    titles[numbered] = titles[numbered] + " " + (sequel[numbered] + 1).astype(str)
+    return titles
+
+
+def _names(rng: np.random.Generator, size: int) -> np.ndarray:
+    """Returns random person names."""
+    return (
+        rng.choice(_FIRST_NAMES, size) + " " + rng.choice(_LAST_NAMES, size)
+    ).astype(object)
+
+
+def _dates(rng: np.random.Generator, size: int, start: str, end: str) -> np.ndarray:
+    """Returns random "YYYY-MM-DD" dates between start and end."""
+    first, last = np.datetime64(start, "D"), np.datetime64(end, "D")
+    days = rng.integers(0, (last - first).astype(int) + 1, size)
+    return (first + days).astype(str).astype(object)
+
+
+def _with_nulls(rng: np.random.Generator, values: np.ndarray, share: float) -> np.ndarray:
+    """Returns values as objects, with about share of them replaced by None."""
+    values = values.astype(object)
+    values[rng.random(values.shape[0]) < share] = None
+    return values
+
+
+def _scaled(name: str, scale: float) -> int:
+    """Returns the number of rows of a dataset at scale, at least 1."""
+    return max(1, round(REAL_ROW_COUNTS[name] * scale))
+
+
+def generate_movies(scale: float = 1.0, seed: int = 0) -> pd.DataFrame:
+    """
+    Generate rotten_tomatoes_movies.csv rows.
+
+    Parameters:
+    ----------
+    scale: float
+        Multiple of the Kaggle row count to generate.
+    seed: int
+        Seed of the generated rows.
+
+    Returns:
+    -------
+    Movies, with a unique rotten_tomatoes_link each. Some movies share a title.
+    """
+    _check_scale(scale)
+    rng = _rng(seed, 0)
+    n_movies = _scaled("movies", scale)
+
+    # Title ids are drawn from twice as many titles as needed, so the Oscars can
+    # use the titles of the other half as films which have no reviews.
+    n_titles = max(1, round(n_movies * (1 - DUPLICATE_TITLE_SHARE)))
+    title_ids = rng.permutation(2 * n_movies)[:n_titles]
+    title_ids = np.concatenate(
+        [title_ids, rng.choice(title_ids, n_movies - n_titles)]
+    )
+    rng.shuffle(title_ids)
+    titles = _titles(title_ids)
+
+    # Links are slugs of the titles, numbered when the title is already taken.
+    slugs = (
+        pd.Series(titles)
+        .str.lower()
+        .str.replace(r"[^a-z0-9]+", "_", regex=True)
+        .str.strip("_")
+    )
+    duplicated = slugs.duplicated()
+    slugs[duplicated] = slugs[duplicated] + "_" + slugs.index[duplicated].astype(str)
+
+    tomatometer = rng.beta(5, 3, n_movies) * 100
+    audience = np.clip(tomatometer + rng.normal(0, 15, n_movies), 0, 100)
+    status = np.where(
+        tomatometer >= 75, "Certified-Fresh", np.where(tomatometer >= 60, "Fresh", "Rotten")
+    )
+    return pd.DataFrame({
+        "rotten_tomatoes_link": ("m/" + slugs).to_numpy(dtype=object),
+        "movie_title": titles,
+        "movie_info": rng.choice(_REVIEW_CONTENT, n_movies),
+        "content_rating": rng.choice(_CONTENT_RATINGS, n_movies),
+        "genres": rng.choice(_GENRES, n_movies),
+        "original_release_date": _with_nulls(
+            rng, _dates(rng, n_movies, "1914-01-01", "2020-10-31"), 0.07
+        ),
+        "runtime": _with_nulls(rng, rng.integers(70, 180, n_movies), 0.02),
+        "tomatometer_status": _with_nulls(rng, status, 0.0025),
+        "tomatometer_rating": _with_nulls(rng, tomatometer.round(), 0.0025),
+        "tomatometer_count": rng.integers(5, 500, n_movies),
+        "audience_rating": _with_nulls(rng, audience.round(), 0.017),
+        "audience_count": rng.integers(10, 250_000, n_movies),
+    }).astype({"tomatometer_rating": "float64", "audience_rating": "float64"})
+
+
+def generate_oscars(movies: pd.DataFrame, scale: float = 1.0, seed: int = 0) -> pd.DataFrame:
+    """
+    Generate the_oscar_award.csv rows.
+
+    Below scale 1, only the most recent years are generated; above it, each year
+    has more nominees. Every year has one best picture winner.
+
+    Parameters:
+    ----------
+    movies: pd.DataFrame
+        Output of generate_movies, whose titles some films take.
+    scale: float
+        Multiple of the Kaggle row count to generate.
+    seed: int
+        Seed of the generated rows.
+
+    Returns:
+    -------
+    Oscars nominations, in year order.
+    """
+    _check_scale(scale)
+    rng = _rng(seed, 1)
+    n_rows = _scaled("oscars", scale)
+    first_year, last_year = OSCARS_YEARS
+    all_years = last_year - first_year + 1
+    n_years = min(all_years, max(1, round(all_years * scale)))
+    years = np.arange(last_year - n_years + 1, last_year + 1)
+    rows_per_year = max(2, n_rows // n_years)
+
+    # Nominee j of a year: the first 5 (or more, at larger scales) are best
+    # picture nominees, and the rest are 5 nominees per other category.
+    n_best_picture = max(2, round(5 * scale))
+    year = np.repeat(years, rows_per_year)
+    nominee = np.tile(np.arange(rows_per_year), n_years)
+    best_picture = nominee < n_best_picture
+    other = nominee - n_best_picture
+    era_starts = [start for start, _ in BEST_PICTURE_ERAS]
+    era_names = np.array([name for _, name in BEST_PICTURE_ERAS], dtype=object)
+    category = np.where(
+        best_picture,
+        era_names[np.searchsorted(era_starts, year, side="right") - 1],
+        np.array(OSCARS_CATEGORIES, dtype=object)[(other // 5) % len(OSCARS_CATEGORIES)],
+    )
+    winner = np.where(best_picture, nominee == 0, other % 5 == 0)
+
+    # Films are Rotten Tomatoes titles, some written differently, or titles no
+    # movie has.
+    size = year.shape[0]
+    titles = movies["movie_title"].dropna().to_numpy()
+    film = _titles(rng.integers(2 * movies.shape[0], 4 * movies.shape[0] + 1, size))
+    overlap = rng.random(size) < TITLE_OVERLAP
+    film[overlap] = rng.choice(titles, overlap.sum())
+    variant = overlap & (rng.random(size) < TITLE_VARIANT_SHARE)
+    film[variant] = _title_variants(rng, film[variant])
+    # Some awards, e.g. for sound, went to no particular film.
+    film[~best_picture & (rng.random(size) < 0.02)] = None
+
+    return pd.DataFrame({
+        "year_film": year,
+        "year_ceremony": year + 1,
+        "ceremony": year - 1927 + 1,
+        "category": category,
+        "name": _names(rng, size),
+        "film": film,
+        "winner": winner,
+    })
+
+
+def _title_variants(rng: np.random.Generator, titles: np.ndarray) -> np.ndarray:
+    """Returns the titles upper cased, without a leading "The", or punctuated."""
+    titles = pd.Series(titles, dtype=object)
+    variant = rng.integers(0, 3, titles.shape[0])
+    titles = titles.where(variant != 0, titles.str.upper())
+    titles = titles.where(variant != 1, titles.str.replace(r"^The ", "", regex=True))
+    titles = titles.where(variant != 2, titles.str.replace(" ", ", ", n=1, regex=False))
+    return titles.to_numpy(dtype=object)
+
+
+def _review_scores(rng: np.random.Generator, quality: np.ndarray) -> np.ndarray:
+    """
+    Returns raw review scores for review qualities between 0 and 1, in the mix of
+    formats in NULL_SCORE_SHARE and SCORE_FORMATS.
+    """
+    size = quality.shape[0]
+    scores = np.full(size, None, dtype=object)
+    formats = np.array(list(SCORE_FORMATS))
+    shares = np.array(list(SCORE_FORMATS.values()))
+    chosen = formats[rng.choice(len(formats), size, p=shares / shares.sum())]
+    chosen[rng.random(size) < NULL_SCORE_SHARE] = "null"
+
+    # Scores are written from a table of every possible value, so no score is
+    # formatted one at a time.
+    for denominator, steps in [(10, 1), (5, 2), (4, 2), (100, 1)]:
+        mask = chosen == f"fraction_{denominator}"
+        labels = np.array(
+            [f"{step / steps:g}/{denominator}" for step in range(denominator * steps + 1)],
+            dtype=object,
+        )
+        scores[mask] = labels[np.rint(quality[mask] * denominator * steps).astype(int)]
+
+    mask = chosen == "numeric"
+    scores[mask] = np.arange(101).astype(str).astype(object)[
+        np.rint(quality[mask] * 100).astype(int)
+    ]
+
+    letters = pd.Series(CriticsDataCleaner.score_substitutions).sort_values()
+    mask = chosen == "letter"
+    midpoints = (letters.to_numpy()[1:] + letters.to_numpy()[:-1]) / 2
+    scores[mask] = letters.index.to_numpy(dtype=object)[
+        np.searchsorted(midpoints, quality[mask] * 100)
+    ]
+
+    mask = chosen == "malformed"
+    scores[mask] = rng.choice(np.array(MALFORMED_SCORES, dtype=object), mask.sum())
+    return scores
+
+
+def generate_critic_reviews(
+    movies: pd.DataFrame, scale: float = 1.0, seed: int = 0
+) -> Iterator[pd.DataFrame]:
+    """
+    Generate rotten_tomatoes_critic_reviews.csv rows, in chunks of about
+    REVIEW_CHUNK_ROWS rows.
+
+    Parameters:
+    ----------
+    movies: pd.DataFrame
+        Output of generate_movies, whose links are reviewed.
+    scale: float
+        Multiple of the Kaggle row count to generate.
+    seed: int
+        Seed of the generated rows.
+
+    Returns:
+    -------
+    Iterator over chunks of reviews, grouped by movie. A few movies have most
+    reviews, like in the Kaggle file.
+    """
+    _check_scale(scale)
+    rng = _rng(seed, 2)
+    n_reviews = _scaled("critics", scale)
+    n_movies = movies.shape[0]
+    popularity = rng.lognormal(0, 1.2, n_movies)
+    counts = rng.multinomial(n_reviews, popularity / popularity.sum())
+    movie_quality = movies["tomatometer_rating"].fillna(60).to_numpy() / 100
+
+    # Critics review at very different rates, and a fifth are top critics.
+    n_critics = max(1, round(11_108 * scale))
+    critic_weights = 1 / (np.arange(n_critics) + 10) ** 1.1
+    critic_weights /= critic_weights.sum()
+    critic_names = _with_nulls(rng, _names(rng, n_critics), 0.016)
+    top_critics = rng.random(n_critics) < 0.2
+    publishers = np.array(
+        [f"{noun} {kind}" for noun in _NOUNS for kind in ["Times", "Weekly", "Review"]],
+        dtype=object,
+    )[rng.integers(0, 3 * len(_NOUNS), n_critics)]
+
+    bounds = np.searchsorted(
+        np.cumsum(counts), np.arange(REVIEW_CHUNK_ROWS, n_reviews, REVIEW_CHUNK_ROWS)
+    )
+    for chunk, (start, end) in enumerate(
+        zip(np.r_[0, bounds + 1], np.r_[bounds + 1, n_movies])
+    ):
+        chunk_rng = _rng(seed, 2, chunk)
+        movie = np.repeat(np.arange(start, end), counts[start:end])
+        size = movie.shape[0]
+        if size == 0:
+            continue
+        quality = np.clip(movie_quality[movie] + chunk_rng.normal(0, 0.18, size), 0, 1)
+        critic = chunk_rng.choice(n_critics, size, p=critic_weights)
+        yield pd.DataFrame({
+            "rotten_tomatoes_link": movies["rotten_tomatoes_link"].to_numpy()[movie],
+            "critic_name": critic_names[critic],
+            "top_critic": top_critics[critic],
+            "publisher_name": publishers[critic],
+            "review_type": np.where(
+                quality + chunk_rng.normal(0, 0.05, size) >= 0.6, "Fresh", "Rotten"
+            ),
+            "review_date": _dates(chunk_rng, size, "2000-01-01", "2020-10-31"),
+            "review_score": _review_scores(chunk_rng, quality),
+            "review_content": _with_nulls(
+                chunk_rng, chunk_rng.choice(_REVIEW_CONTENT, size), 0.06
+            ),
+        })
+
+
+def write_synthetic_datasets(
+    directory: str = "./data", scale: float = 1.0, seed: int = 0
+) -> Dict[str, str]:
+    """
+    Write synthetic raw csvs under the file names the cleaners read.
+
+    Parameters:
+    ----------
+    directory: str
+        Directory to write the csvs to.
+    scale: float
+        Multiple of the Kaggle row counts to generate, e.g. 1 to 100.
+    seed: int
+        Seed of the generated rows.
+
+    Returns:
+    -------
+    Dict of "critics", "movies" and "oscars" -> path of the written csv.
+    """
+    _check_scale(scale)
+    os.makedirs(directory, exist_ok=True)
+    paths = {
+        name: os.path.join(directory, os.path.basename(cleaner.source_path))
+        for name, cleaner in [
+            ("critics", CriticsDataCleaner),
+            ("movies", MoviesDataCleaner),
+            ("oscars", OscarsDataCleaner),
+        ]
+    }
+    movies = generate_movies(scale, seed)
+    movies.to_csv(paths["movies"], index=False)
+    generate_oscars(movies, scale, seed).to_csv(paths["oscars"], index=False)
+    with open(paths["critics"], "w", encoding="utf-8", newline="") as f:
+        for chunk, reviews in enumerate(generate_critic_reviews(movies, scale, seed)):
+            reviews.to_csv(f, index=False, header=chunk == 0)
+    return paths
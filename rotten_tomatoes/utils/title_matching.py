@@ -0,0 +1,263 @@
+"""
+Matching movie titles which are written differently between datasets.
+
+Titles are first reduced to a normalized key (case, accents, punctuation and
+leading articles folded), and titles with the same key are matched directly.
+The remaining titles are matched fuzzily, but only against candidates in the
+same block: candidates sharing the first few characters of the key (and, if
+years are known on both sides, a release year within a tolerance). Each title
+is compared with a handful of candidates rather than all of them, so matching
+stays near-linear. Fuzzy matches can be cached to disk, and are reused for as
+long as the candidate titles and matching settings stay the same.
+
+utils.title_matching exports the following classes and functions:
+    normalize_titles
+    TitleMatcher
+"""
+import difflib
+import hashlib
+import json
+import os
+from typing import Dict, Iterator, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+# Leading articles dropped from normalized titles.
+ARTICLES = ("the", "a", "an")
+
+
+def normalize_titles(titles: pd.Series) -> pd.Series:
+    """
+    Normalize titles to a join key.
+
+    Titles are lower cased, accents are removed, "&" becomes "and", punctuation is
+    dropped, whitespace is collapsed, and a leading article ("The Artist") or a
+    trailing one ("Artist, The") is removed.
+
+    Parameters:
+    ----------
+    titles: pd.Series
+        Titles to normalize.
+
+    Returns:
+    -------
+    Series of normalized titles, with NaN where the title is NaN.
+    """
+    articles = "|".join(ARTICLES)
+    keys = (
+        titles.astype("string")
+        .str.normalize("NFKD")
+        .str.encode("ascii", errors="ignore")
+        .str.decode("ascii")
+        .str.lower()
+        .str.replace(rf",\s*(?:{articles})\s*$", "", regex=True)
+        .str.replace("&", " and ", regex=False)
+        .str.replace(r"[^\w\s]", "", regex=True)
+        .str.replace(r"\s+", " ", regex=True)
+        .str.strip()
+        .str.replace(rf"^(?:{articles}) ", "", regex=True)
+    )
+    return keys.astype("object").where(titles.notna())
+
+
+class TitleMatcher:
+    """Matches titles to candidate titles by normalized key, then fuzzily in blocks."""
+
+    def __init__(
+        self,
+        cache_path: Optional[str] = None,
+        prefix_length: int = 4,
+        cutoff: float = 0.9,
+        year_tolerance: int = 1,
+    ) -> None:
+        """
+        Initialize a TitleMatcher, loading any fuzzy matches cached at cache_path.
+
+        Parameters:
+        ----------
+        cache_path: Optional[str]
+            JSON file fuzzy matches are loaded from and saved to. If None, matches
+            are only cached in memory.
+        prefix_length: int
+            Number of leading characters of the normalized key that candidates must
+            share with a title to be compared with it.
+        cutoff: float
+            Minimum similarity (difflib ratio, 0-1) for a fuzzy match.
+        year_tolerance: int
+            If years are given, candidates must be within this many years of the
+            title.
+        """
+        self.cache_path = cache_path
+        self.prefix_length = prefix_length
+        self.cutoff = cutoff
+        self.year_tolerance = year_tolerance
+        self.comparisons = 0
+        # Fingerprint of the candidates and settings, and the fuzzy matches made
+        # against them.
+        self._cache = {"fingerprint": None, "matches": {}}
+        self._dirty = False
+        if cache_path is not None and os.path.exists(cache_path):
+            with open(cache_path, "r", encoding="utf-8") as f:
+                self._cache = json.load(f)
+
+    def match(
+        self,
+        titles: pd.Series,
+        candidates: pd.Series,
+        years: Optional[pd.Series] = None,
+        candidate_years: Optional[pd.Series] = None,
+    ) -> pd.Series:
+        """
+        Match each title to a candidate title.
+
+        Titles found among the candidates are matched to themselves. Otherwise a
+        candidate with the same normalized key is used, and failing that the most
+        similar candidate in the title's blocks, if it reaches the cutoff.
+
+        Parameters:
+        ----------
+        titles: pd.Series
+            Titles to match.
+        candidates: pd.Series
+            Titles to match them to.
+        years: Optional[pd.Series]
+            Year of each title. Only used together with candidate_years.
+        candidate_years: Optional[pd.Series]
+            Year of each candidate. If both are given, fuzzy matches must be within
+            year_tolerance years.
+
+        Returns:
+        -------
+        Series aligned with titles, holding the matched candidate title, or NaN.
+        """
+        # Without years, every title and candidate is given year 0.
+        use_years = years is not None and candidate_years is not None
+        candidates = _keyed_frame(
+            candidates, candidate_years if use_years else None
+        ).dropna(subset=["title"])
+        to_match = _keyed_frame(titles, years if use_years else None)
+
+        # The first candidate with each normalized key stands for it.
+        key_titles = dict(
+            zip(candidates["key"].iloc[::-1], candidates["title"].iloc[::-1])
+        )
+        exact = set(candidates["title"])
+        blocks = self._block_index(candidates)
+
+        def match_one(title, year, key):
+            if title in exact:
+                return title
+            if key in key_titles:
+                return key_titles[key]
+            best = self._fuzzy_match(key, year, blocks)
+            return key_titles[best] if best is not None else None
+
+        distinct = to_match.dropna(subset=["title"]).drop_duplicates()
+        distinct["matched"] = [
+            match_one(*row) for row in distinct.itertuples(index=False, name=None)
+        ]
+        self.save()
+
+        result = to_match.merge(distinct, on=["title", "year", "key"], how="left")[
+            "matched"
+        ]
+        result = pd.Series(result.to_numpy(), index=titles.index, dtype="object")
+        return result.where(result.notna())
+
+    def save(self) -> None:
+        """Write the fuzzy matches to cache_path, if they have changed."""
+        if self.cache_path is None or not self._dirty:
+            return
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._cache, f)
+        os.replace(tmp_path, self.cache_path)
+        self._dirty = False
+
+    def _block_index(
+        self, candidates: pd.DataFrame
+    ) -> Dict[Tuple, Tuple[np.ndarray, np.ndarray]]:
+        """
+        Returns (key prefix, year) -> the distinct candidate keys in that block, and
+        their lengths. Cached matches are dropped if the candidates have changed.
+        """
+        candidates = candidates.drop_duplicates(subset=["key", "year"])
+        candidates = candidates.assign(
+            prefix=candidates["key"].str[: self.prefix_length],
+            length=candidates["key"].str.len(),
+        )
+
+        entries = sorted(
+            f"{year}\t{key}" for year, key in zip(candidates["year"], candidates["key"])
+        )
+        settings = f"{self.prefix_length}\t{self.cutoff}\t{self.year_tolerance}"
+        fingerprint = hashlib.sha256(
+            "\n".join([settings] + entries).encode("utf-8")
+        ).hexdigest()
+        if fingerprint != self._cache["fingerprint"]:
+            self._cache = {"fingerprint": fingerprint, "matches": {}}
+            self._dirty = True
+
+        return {
+            block_key: (block["key"].to_numpy(), block["length"].to_numpy())
+            for block_key, block in candidates.groupby(["prefix", "year"], sort=False)
+        }
+
+    def _fuzzy_match(
+        self, key: str, year, blocks: Dict[Tuple, Tuple[np.ndarray, np.ndarray]]
+    ) -> Optional[str]:
+        """
+        Returns the most similar candidate key in the blocks of key and year, if it
+        reaches the cutoff, or None.
+        """
+        matches = self._cache["matches"]
+        cache_key = f"{year}\t{key}"
+        if cache_key in matches:
+            return matches[cache_key]
+
+        # The key is analysed once, and compared with each candidate in turn.
+        matcher = difflib.SequenceMatcher(None, b=key)
+        best, best_score = None, 0.0
+        for candidate in self._candidates_in_reach(key, year, blocks):
+            matcher.set_seq1(candidate)
+            # Cheap upper bounds of the ratio first.
+            if (
+                matcher.real_quick_ratio() < self.cutoff
+                or matcher.quick_ratio() < self.cutoff
+            ):
+                continue
+            self.comparisons += 1
+            score = matcher.ratio()
+            if score >= self.cutoff and score > best_score:
+                best, best_score = candidate, score
+
+        matches[cache_key] = best
+        self._dirty = True
+        return best
+
+    def _candidates_in_reach(
+        self, key: str, year, blocks: Dict[Tuple, Tuple[np.ndarray, np.ndarray]]
+    ) -> Iterator[str]:
+        """
+        Yields the candidate keys in the blocks of key and year which could reach
+        the cutoff. The ratio is at most 2 * min(len) / (sum of lens), so
+        candidates whose length alone rules them out are skipped.
+        """
+        prefix = key[: self.prefix_length]
+        for offset in range(-self.year_tolerance, self.year_tolerance + 1):
+            if (prefix, year + offset) not in blocks:
+                continue
+            keys, lengths = blocks[(prefix, year + offset)]
+            in_reach = 2 * np.minimum(lengths, len(key)) >= self.cutoff * (
+                lengths + len(key)
+            )
+            yield from keys[in_reach]
+
+
+def _keyed_frame(titles: pd.Series, years: Optional[pd.Series]) -> pd.DataFrame:
+    """Returns a frame of titles, their years (0 if None) and normalized keys."""
+    keyed = pd.DataFrame(
+        {"title": titles.to_numpy(), "year": 0 if years is None else years.to_numpy()}
+    )
+    keyed["key"] = normalize_titles(keyed["title"])
+    return keyed
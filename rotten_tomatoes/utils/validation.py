@@ -0,0 +1,186 @@
+"""
+Declarative validation rules for cleaned DataFrames.
+
+Each DataCleaner declares its rules; a FrameValidator checks them with dtype
+inspection and vectorized reductions, either over a whole frame or
+incrementally over chunks (carrying uniqueness state from chunk to chunk).
+
+utils.validation exports the following classes and exceptions:
+    ValidationException
+    ColumnRule
+    UniqueRule
+    FrameValidator
+"""
+from typing import List, Optional, Sequence
+import pandas as pd
+
+# pylint: disable=R0903,R0913
+
+
+class ValidationException(Exception):
+    """Raised for data validation errors."""
+
+
+class ColumnRule:
+    """Dtype, nullability and value range rules for one column."""
+
+    def __init__(
+        self,
+        column: str,
+        dtype: Optional[str] = None,
+        nullable: bool = True,
+        min_value: Optional[float] = None,
+        max_value: Optional[float] = None,
+    ) -> None:
+        """
+        Initialize a ColumnRule.
+
+        Parameters:
+        ----------
+        column: str
+            Column the rule applies to. The column must be present.
+        dtype: Optional[str]
+            If "float", every value must be a float.
+        nullable: bool
+            Whether null values are allowed.
+        min_value: Optional[float]
+            Smallest value allowed, if any.
+        max_value: Optional[float]
+            Largest value allowed, if any.
+        """
+        if dtype not in (None, "float"):
+            raise ValueError(f"Unsupported dtype rule {dtype}!")
+        self.column = column
+        self.dtype = dtype
+        self.nullable = nullable
+        self.min_value = min_value
+        self.max_value = max_value
+
+    def check(self, data: pd.DataFrame) -> None:
+        """
+        Check the rule against data.
+
+        Raises:
+        ------
+        ValidationException if the column is missing or breaks the rule.
+        """
+        if self.column not in data.columns:
+            raise ValidationException(
+                f"Column {self.column} not available in passed data!"
+            )
+        values = data[self.column]
+        if not self.nullable and values.isna().any():
+            raise ValidationException(f"Null values not allowed in {self.column}!")
+        if self.dtype == "float" and not _is_float(values):
+            raise ValidationException(f"Found non-float values for {self.column}!")
+        if self.min_value is not None and (values < self.min_value).any():
+            raise ValidationException(
+                f"Values below {self.min_value} found in {self.column}!"
+            )
+        if self.max_value is not None and (values > self.max_value).any():
+            raise ValidationException(
+                f"Values above {self.max_value} found in {self.column}!"
+            )
+
+
+class UniqueRule:
+    """Rule that a key is unique, optionally only among rows matching a flag."""
+
+    def __init__(
+        self, columns: Sequence[str], where: Optional[str] = None, message: str = None
+    ) -> None:
+        """
+        Initialize a UniqueRule.
+
+        Parameters:
+        ----------
+        columns: Sequence[str]
+            Columns making up the key.
+        where: Optional[str]
+            Boolean column. If given, the key only has to be unique among rows where
+            it is True.
+        message: str
+            Error message when the rule is broken.
+        """
+        self.columns = list(columns)
+        self.where = where
+        self.message = message or f"Duplicate values found for {self.columns}!"
+
+    def keys(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Returns the key columns of the rows the rule applies to."""
+        if self.where is not None:
+            data = data.loc[data[self.where].fillna(False).astype(bool)]
+        return data[self.columns]
+
+
+class FrameValidator:
+    """Checks required columns and rules, over a frame or a series of chunks."""
+
+    def __init__(
+        self,
+        required_columns: Sequence[str],
+        rules: Sequence[ColumnRule] = (),
+        unique_rules: Sequence[UniqueRule] = (),
+    ) -> None:
+        """
+        Initialize a FrameValidator.
+
+        Parameters:
+        ----------
+        required_columns: Sequence[str]
+            Columns which must be present.
+        rules: Sequence[ColumnRule]
+            Per-column rules.
+        unique_rules: Sequence[UniqueRule]
+            Uniqueness rules. In incremental use, keys must be unique across chunks.
+        """
+        self.required_columns = list(required_columns)
+        self.rules = list(rules)
+        self.unique_rules = list(unique_rules)
+        self._seen_keys: List[set] = [set() for _ in self.unique_rules]
+
+    def validate(self, data: pd.DataFrame) -> None:
+        """
+        Validate a whole frame.
+
+        Raises:
+        ------
+        ValidationException if any column is missing or any rule is broken.
+        """
+        self._check_columns(data)
+        for rule in self.unique_rules:
+            if rule.keys(data).duplicated().any():
+                raise ValidationException(rule.message)
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """
+        Validate one chunk, including uniqueness against keys from earlier chunks.
+
+        Raises:
+        ------
+        ValidationException if any column is missing or any rule is broken.
+        """
+        self._check_columns(chunk)
+        for rule, seen in zip(self.unique_rules, self._seen_keys):
+            keys = rule.keys(chunk)
+            key_tuples = pd.MultiIndex.from_frame(keys)
+            # Looked up in the set, so each chunk costs time in its own rows only.
+            if key_tuples.duplicated().any() or any(key in seen for key in key_tuples):
+                raise ValidationException(rule.message)
+            seen.update(key_tuples)
+
+    def _check_columns(self, data: pd.DataFrame) -> None:
+        for col in self.required_columns:
+            if col not in data:
+                raise ValidationException(f"Missing {col} from data!")
+        for rule in self.rules:
+            rule.check(data)
+
+
+def _is_float(values: pd.Series) -> bool:
+    """Whether every value in values is a float, without looping in Python."""
+    if pd.api.types.is_float_dtype(values):
+        return True
+    if values.dtype == object:
+        return pd.api.types.infer_dtype(values, skipna=False) == "floating"
+    return False
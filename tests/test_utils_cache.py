@@ -0,0 +1,155 @@
+"""
+Runs one shot tests and edge tests for rotten_tomatoes.utils.cache and cached
+DataCleaner runs
+
+test_utils_cache does not export any classes, exceptions, or functions
+"""
+
+
+import os
+import tempfile
+import unittest
+import pandas as pd
+import pyarrow.parquet as pq
+
+from rotten_tomatoes.utils.cache import ( # pylint: disable=E0401
+    file_fingerprint,
+    CleanedFrameCache
+)
+from rotten_tomatoes.utils.data_cleaning import CriticsDataCleaner # pylint: disable=E0401
+from rotten_tomatoes.utils.streaming import CsvSink # pylint: disable=E0401
+
+
+CRITICS = pd.DataFrame({
+    'rotten_tomatoes_link': ["m/a", "m/a", "m/b"],
+    'critic_name': ["x", "y", "z"],
+    'top_critic': [True, False, None],
+    'review_type': ["Fresh", "Rotten", "Fresh"],
+    'review_score': ["3/4", "C", "2/0"],
+})
+
+
+class OtherCriticsDataCleaner(CriticsDataCleaner):
+    """Critics cleaner subclass, which should not share cache entries."""
+
+
+def fail_clean(data):
+    """Replaces _clean on cleaners which are expected to hit the cache."""
+    raise AssertionError(f"Expected a cache hit, but cleaned {data.shape[0]} rows!")
+
+
+class TestUtilsCache(unittest.TestCase):
+    """ A class used to test the rotten_tomatoes.utils.cache module """
+
+    def setUp(self):
+        """Write the raw test csv to a temporary directory."""
+        self.tmp_dir = tempfile.TemporaryDirectory() # pylint: disable=R1732
+        self.cache_dir = os.path.join(self.tmp_dir.name, "cache")
+        self.critics_path = os.path.join(self.tmp_dir.name, "critics.csv")
+        CRITICS.to_csv(self.critics_path, index=False)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _cleaner(self, cls=CriticsDataCleaner, fail=False, **kwargs):
+        cleaner = cls(cache_dir=self.cache_dir, **kwargs)
+        cleaner.source_path = self.critics_path
+        if fail:
+            cleaner._clean = fail_clean # pylint: disable=W0212
+        return cleaner
+
+    # One shot tests
+    def test_file_fingerprint(self):
+        """Test passes if the fingerprint only changes when the file contents change"""
+
+        first = file_fingerprint(self.critics_path)
+        self.assertEqual(first, file_fingerprint(self.critics_path))
+
+        CRITICS.head(2).to_csv(self.critics_path, index=False)
+        self.assertNotEqual(first, file_fingerprint(self.critics_path))
+
+    def test_cache_hit(self):
+        """Test passes if a second run loads the first run's output from the cache
+        without cleaning, with the same values and dtypes, and the metrics returned
+        with each run count the cache hit"""
+
+        cleaned, metrics = self._cleaner().run(return_metrics=True)
+        cached, cached_metrics = self._cleaner(fail=True).run(return_metrics=True)
+
+        pd.testing.assert_frame_equal(cached, cleaned)
+        self.assertEqual(metrics["cache_hits"], 0)
+        self.assertEqual(cached_metrics["cache_hits"], 1)
+        self.assertEqual(cached_metrics["rows_out"], cleaned.shape[0])
+
+    def test_cache_key(self):
+        """Test passes if the key depends on the cleaner class and version"""
+
+        cache = CleanedFrameCache(self.cache_dir)
+        cleaner = self._cleaner()
+        other_version = self._cleaner()
+        other_version.version = "2"
+
+        self.assertEqual(cache.key(cleaner), cache.key(self._cleaner()))
+        self.assertNotEqual(cache.key(cleaner), cache.key(other_version))
+        self.assertNotEqual(
+            cache.key(cleaner), cache.key(self._cleaner(OtherCriticsDataCleaner))
+        )
+
+    def test_chunked_store(self):
+        """Test passes if a chunked run writes its chunks to the cache entry as row
+        groups while streaming to its sink, and a later run loads the same output as
+        a chunked run without a cache"""
+
+        expected = CriticsDataCleaner(chunksize=1)
+        expected.source_path = self.critics_path
+        expected = expected.run()
+
+        output_path = os.path.join(self.tmp_dir.name, "critics_cleaned.csv")
+        cleaner = self._cleaner(chunksize=1)
+        self.assertIsNone(cleaner.run(CsvSink(output_path)))
+        self.assertEqual(pd.read_csv(output_path).shape[0], expected.shape[0])
+        entry = cleaner.cache.path(cleaner.cache.key(cleaner))
+        # The last chunk's only review has an invalid score, so is combined with
+        # the chunk before it.
+        self.assertEqual(pq.ParquetFile(entry).num_row_groups, 2)
+        self.assertEqual(cleaner.profile["cache_store"]["rows_in"], expected.shape[0])
+
+        pd.testing.assert_frame_equal(self._cleaner(fail=True).run(), expected)
+        pd.testing.assert_frame_equal(self._cleaner(chunksize=1, force=True).run(), expected)
+
+    # Edge tests
+    def test_chunked_failure_edge(self):
+        """Test passes if a chunked run failing part way stores no entry and leaves
+        no temporary file"""
+
+        cleaner = self._cleaner(chunksize=1)
+        cleaner._validate_chunk = lambda chunk: fail_clean(chunk) if chunk.index[0] else None # pylint: disable=W0212
+        with self.assertRaises(AssertionError):
+            cleaner.run()
+
+        self.assertIsNone(cleaner.cache.get(cleaner.cache.key(cleaner)))
+        self.assertFalse([name for name in os.listdir(self.cache_dir) if name.endswith(".tmp")])
+
+    def test_changed_source(self):
+        """Test passes if changing the raw file misses the cache"""
+
+        self._cleaner().run()
+        CRITICS.head(2).to_csv(self.critics_path, index=False)
+
+        self.assertEqual(self._cleaner().run().shape[0], 2)
+
+    def test_force_and_invalidate(self):
+        """Test passes if force skips the cache and invalidate removes the entry"""
+
+        cleaner = self._cleaner()
+        cleaner.run()
+
+        with self.assertRaises(AssertionError):
+            self._cleaner(fail=True, force=True).run()
+
+        cleaner.invalidate()
+        self.assertIsNone(cleaner.cache.get(cleaner.cache.key(cleaner)))
+
+
+if __name__ == "__main__":
+    unittest.main()
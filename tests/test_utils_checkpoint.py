@@ -0,0 +1,144 @@
+"""
+Runs one shot tests and edge tests for the classes and functions imported from
+rotten_tomatoes.utils.checkpoint
+
+test_utils_checkpoint does not export any classes, exceptions, or functions
+"""
+
+
+import os
+import tempfile
+import unittest
+
+from rotten_tomatoes.utils.checkpoint import StageManifest # pylint: disable=E0401
+
+
+class TestUtilsCheckpoint(unittest.TestCase):
+    """ A class used to test the rotten_tomatoes.utils.checkpoint module """
+
+    def setUp(self):
+        """Create a raw input file and a manifest path in a temporary directory."""
+        self.tmp_dir = tempfile.TemporaryDirectory() # pylint: disable=R1732
+        self.raw_path = self.path("raw.csv")
+        self.output_path = self.path("output.csv")
+        self.manifest_path = self.path("manifest.json")
+        self.write(self.raw_path, "a,b\n1,2\n")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def path(self, *names):
+        """Returns a path in the temporary directory."""
+        return os.path.join(self.tmp_dir.name, *names)
+
+    @staticmethod
+    def write(path, text):
+        """Write text to path."""
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def run_stage(self, manifest, params=None):
+        """Run a stage copying the raw file to the output file."""
+        with manifest.stage(
+            "copy", inputs=[self.raw_path], params=params, outputs=[self.output_path]
+        ):
+            with open(self.raw_path, encoding="utf-8") as f:
+                self.write(self.output_path, f.read())
+
+    def is_complete(self, manifest, params=None):
+        """Whether the stage run by run_stage can be skipped."""
+        return manifest.is_complete(
+            "copy", inputs=[self.raw_path], params=params, outputs=[self.output_path]
+        )
+
+    # One shot tests
+    def test_complete(self):
+        """Test passes if a completed stage is skipped, also by a new manifest read
+        from disk, until its params or inputs change"""
+
+        manifest = StageManifest(self.manifest_path)
+        self.assertFalse(self.is_complete(manifest))
+        self.run_stage(manifest, params={"level": "review"})
+
+        manifest = StageManifest(self.manifest_path)
+        self.assertEqual(manifest.status("copy"), "complete")
+        self.assertTrue(self.is_complete(manifest, params={"level": "review"}))
+        self.assertFalse(self.is_complete(manifest, params={"level": "movie"}))
+
+        self.write(self.raw_path, "a,b\n1,3\n")
+        self.assertFalse(self.is_complete(manifest, params={"level": "review"}))
+
+    def test_outputs_changed(self):
+        """Test passes if a stage reruns once its output is modified or deleted, or
+        an output it did not record is asked for"""
+
+        manifest = StageManifest(self.manifest_path)
+        self.run_stage(manifest)
+        self.assertFalse(
+            manifest.is_complete(
+                "copy", inputs=[self.raw_path], outputs=[self.path("other.csv")]
+            )
+        )
+
+        self.write(self.output_path, "modified\n")
+        self.assertFalse(self.is_complete(manifest))
+
+        self.run_stage(manifest)
+        self.assertTrue(self.is_complete(manifest))
+        os.remove(self.output_path)
+        self.assertFalse(self.is_complete(manifest))
+
+        self.run_stage(manifest)
+        manifest.invalidate("copy")
+        self.assertIsNone(manifest.status("copy"))
+        self.assertFalse(self.is_complete(manifest))
+
+    def test_directory_outputs(self):
+        """Test passes if outputs added while a stage runs are recorded, and changes
+        to any file in an output directory are detected"""
+
+        manifest = StageManifest(self.manifest_path)
+        directory = self.path("dataset")
+        os.makedirs(os.path.join(directory, "year_film=2000"))
+        part = os.path.join(directory, "year_film=2000", "part.parquet")
+        with manifest.stage("write") as outputs:
+            self.write(part, "rows")
+            outputs.append(directory)
+
+        self.assertEqual(manifest.outputs("write"), [os.path.abspath(directory)])
+        self.assertTrue(manifest.is_complete("write"))
+        self.write(os.path.join(directory, "extra.parquet"), "rows")
+        self.assertFalse(manifest.is_complete("write"))
+
+    # Edge tests
+    def test_failed_stage_edge(self):
+        """Test passes if a stage raising an exception is recorded as failed and is
+        not complete, and the exception is not swallowed"""
+
+        manifest = StageManifest(self.manifest_path)
+        with self.assertRaises(KeyError):
+            with manifest.stage("copy", inputs=[self.raw_path], outputs=[self.output_path]):
+                self.write(self.output_path, "partial\n")
+                raise KeyError("review_score")
+
+        manifest = StageManifest(self.manifest_path)
+        self.assertEqual(manifest.status("copy"), "failed")
+        self.assertFalse(self.is_complete(manifest))
+        self.assertEqual(manifest.outputs("copy"), [])
+
+    def test_missing_input_edge(self):
+        """Test passes if a stage with a missing input completes, and reruns once
+        the input appears"""
+
+        manifest = StageManifest(self.manifest_path)
+        missing = self.path("missing.csv")
+        with manifest.stage("read", inputs=[missing]):
+            pass
+        self.assertTrue(manifest.is_complete("read", inputs=[missing]))
+
+        self.write(missing, "a\n")
+        self.assertFalse(manifest.is_complete("read", inputs=[missing]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+"""
+Runs one shot tests and edge tests for the functions imported from
+rotten_tomatoes.utils.columnar
+
+test_utils_columnar does not export any classes, exceptions, or functions
+"""
+
+
+import gzip
+import os
+import tempfile
+import unittest
+import pandas as pd
+import pyarrow.parquet as pq
+
+from rotten_tomatoes.utils.columnar import ( # pylint: disable=E0401
+    columnar_path,
+    fresh_columnar,
+    ingest_csv,
+    ingest_sources,
+    read_columnar
+)
+from rotten_tomatoes.utils.data_cleaning import ( # pylint: disable=E0401
+    CriticsDataCleaner,
+    OscarsDataCleaner
+)
+from rotten_tomatoes.utils.score_cache import ScoreCache # pylint: disable=E0401
+
+RAW_CRITICS = (
+    "rotten_tomatoes_link,critic_name,top_critic,publisher_name,review_type,review_score\n"
+    "m/a,x,True,p,Fresh,3/4\n"
+    "m/a,y,False,,Rotten,B\n"
+    "m/b,x,True,p,Fresh,\n"
+    "m/b,z,,p,Fresh,80\n"
+    "m/c,z,False,p,Rotten,2/5\n"
+)
+
+RAW_OSCARS = (
+    "year_film,year_ceremony,category,film,winner\n"
+    "1999,2000,BEST PICTURE,Movie A,True\n"
+    "2000,2001,BEST PICTURE,,False\n"
+    "2000,2001,BEST PICTURE,Movie B,True\n"
+    "2001,2002,ACTOR,Movie C,False\n"
+    "2002,2003,BEST PICTURE,Movie C,True\n"
+)
+
+
+class TestUtilsColumnar(unittest.TestCase):
+    """ A class used to test the rotten_tomatoes.utils.columnar module """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory() # pylint: disable=R1732
+        self.critics_path = os.path.join(self.tmp_dir.name, "critics.csv")
+        self.oscars_path = os.path.join(self.tmp_dir.name, "oscars.csv")
+        for path, contents in [(self.critics_path, RAW_CRITICS), (self.oscars_path, RAW_OSCARS)]:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(contents)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def critics_cleaner(self, chunksize=None):
+        """Returns a CriticsDataCleaner of the critics csv at critics_path."""
+        cleaner = CriticsDataCleaner(score_cache=ScoreCache(), chunksize=chunksize)
+        cleaner.source_path = self.critics_path
+        return cleaner
+
+    # One shot tests
+    def test_ingest_read(self):
+        """Test passes if a cleaner reads a fresh columnar copy of its csv, and
+        cleans it as it cleans the csv, in full and in chunks"""
+
+        expected = self.critics_cleaner().run()
+        expected_chunks = self.critics_cleaner(chunksize=2).run()
+
+        cleaner = self.critics_cleaner()
+        self.assertEqual(ingest_sources([cleaner]), [columnar_path(self.critics_path)])
+        self.assertEqual(
+            fresh_columnar(self.critics_path, CriticsDataCleaner.schema),
+            columnar_path(self.critics_path)
+        )
+
+        # Categories are sorted, rather than in the order read_csv finds them.
+        pd.testing.assert_frame_equal(cleaner.run(), expected, check_categorical=False)
+        self.assertEqual(cleaner.metrics.counts["columnar_reads"], 1)
+        cleaner = self.critics_cleaner(chunksize=2)
+        pd.testing.assert_frame_equal(cleaner.run(), expected_chunks, check_categorical=False)
+        self.assertEqual(cleaner.metrics.counts["columnar_reads"], 1)
+
+    def test_row_group_statistics(self):
+        """Test passes if rows are written in row groups with year_film statistics,
+        which filters use to skip row groups, and undeclared columns are strings"""
+
+        path = ingest_csv(self.oscars_path, OscarsDataCleaner.schema, row_group_size=2)
+
+        metadata = pq.ParquetFile(path).metadata
+        self.assertEqual(metadata.num_row_groups, 3)
+        year_film = metadata.schema.names.index("year_film")
+        statistics = metadata.row_group(1).column(year_film).statistics
+        self.assertEqual((statistics.min, statistics.max), (2000, 2001))
+
+        data = read_columnar(
+            path, OscarsDataCleaner.schema, filters=[("year_film", ">=", 2001)]
+        )
+        self.assertEqual(data["film"].tolist(), ["Movie C", "Movie C"])
+        self.assertEqual(str(data["year_film"].dtype), "int16")
+        data = read_columnar(path, {"year_ceremony": "object", "film": "object"})
+        self.assertEqual(data["year_ceremony"].tolist()[0], "2000")
+        self.assertTrue(pd.isna(data["film"][1]))
+
+    def test_compressed_source(self):
+        """Test passes if a csv stored gzip compressed is ingested"""
+
+        with open(self.oscars_path, "rb") as f, gzip.open(self.oscars_path + ".gz", "wb") as g:
+            g.write(f.read())
+        os.remove(self.oscars_path)
+
+        ingest_csv(self.oscars_path, OscarsDataCleaner.schema)
+        self.assertIsNotNone(fresh_columnar(self.oscars_path, OscarsDataCleaner.schema))
+
+    # Edge tests
+    def test_stale_edge(self):
+        """Test passes if a columnar copy is not read once its csv changes, or with
+        other dtypes, and a fresh copy is not written again"""
+
+        path = ingest_csv(self.oscars_path, OscarsDataCleaner.schema)
+        modified = os.path.getmtime(path) - 10
+        os.utime(path, (modified, modified))
+        ingest_csv(self.oscars_path, OscarsDataCleaner.schema)
+        self.assertEqual(os.path.getmtime(path), modified)
+
+        self.assertIsNone(fresh_columnar(self.oscars_path, {"year_film": "int32"}))
+        self.assertIsNone(fresh_columnar(self.oscars_path, {"year_ceremony": "object"}))
+
+        with open(self.oscars_path, "a", encoding="utf-8") as f:
+            f.write("2003,2004,BEST PICTURE,Movie D,True\n")
+        self.assertIsNone(fresh_columnar(self.oscars_path, OscarsDataCleaner.schema))
+        cleaner = OscarsDataCleaner()
+        cleaner.source_path = self.oscars_path
+        self.assertEqual(cleaner.run().shape[0], 6)
+        self.assertEqual(cleaner.metrics.counts["columnar_reads"], 0)
+
+        os.remove(self.oscars_path)
+        self.assertIsNone(fresh_columnar(self.oscars_path, OscarsDataCleaner.schema))
+        self.assertRaises(FileNotFoundError, ingest_csv, self.oscars_path)
+
+    def test_failed_ingest_edge(self):
+        """Test passes if an ingest failing part way writes no columnar copy and
+        leaves no temporary file"""
+
+        with open(self.oscars_path, "a", encoding="utf-8") as f:
+            f.write("not a year,2004,BEST PICTURE,Movie D,True\n")
+        with self.assertRaises(ValueError):
+            ingest_csv(self.oscars_path, OscarsDataCleaner.schema, row_group_size=2)
+
+        self.assertFalse(os.path.exists(columnar_path(self.oscars_path)))
+        self.assertFalse([name for name in os.listdir(self.tmp_dir.name) if name.endswith(".tmp")])
+
+
+if __name__ == "__main__":
+    unittest.main()
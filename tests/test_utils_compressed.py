@@ -0,0 +1,112 @@
+"""
+Runs one shot tests and edge tests for the functions imported from
+rotten_tomatoes.utils.compressed
+
+test_utils_compressed does not export any classes, exceptions, or functions
+"""
+
+
+import gzip
+import importlib.util
+import os
+import tempfile
+import unittest
+import zipfile
+import pandas as pd
+
+from rotten_tomatoes.utils.compressed import ( # pylint: disable=E0401
+    raw_source,
+    open_raw
+)
+from rotten_tomatoes.utils.data_cleaning import CriticsDataCleaner # pylint: disable=E0401
+from rotten_tomatoes.utils.score_cache import ScoreCache # pylint: disable=E0401
+
+RAW_CRITICS = (
+    "rotten_tomatoes_link,critic_name,top_critic,publisher_name,review_type,review_score\n"
+    "m/a,x,True,p,Fresh,3/4\n"
+    "m/a,y,False,p,Rotten,B\n"
+    "m/b,x,True,p,Fresh,\n"
+    "m/b,z,False,p,Fresh,80\n"
+)
+
+
+class TestUtilsCompressed(unittest.TestCase):
+    """ A class used to test the rotten_tomatoes.utils.compressed module """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory() # pylint: disable=R1732
+        self.critics_path = os.path.join(self.tmp_dir.name, "critics.csv")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_zip(self, members):
+        """Write a zip archive like a Kaggle dataset download, with members."""
+        archive_path = os.path.join(self.tmp_dir.name, "reviews-dataset.zip")
+        with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED) as archive:
+            for member, contents in members.items():
+                archive.writestr(member, contents)
+        return archive_path
+
+    def clean(self, chunksize=None):
+        """Clean the critics csv at critics_path, wherever it is stored."""
+        cleaner = CriticsDataCleaner(score_cache=ScoreCache(), chunksize=chunksize)
+        cleaner.source_path = self.critics_path
+        return cleaner.run().reset_index(drop=True)
+
+    # One shot tests
+    def test_zip_member(self):
+        """Test passes if a csv is found and cleaned out of a zip archive next to its
+        path, in full and in chunks, like the uncompressed csv"""
+
+        with open(self.critics_path, "w", encoding="utf-8") as f:
+            f.write(RAW_CRITICS)
+        expected = self.clean()
+        os.remove(self.critics_path)
+
+        archive_path = self.write_zip({"movies.csv": "a\n1\n", "data/critics.csv": RAW_CRITICS})
+        self.assertEqual(raw_source(self.critics_path), (archive_path, "data/critics.csv"))
+        with open_raw(self.critics_path) as source:
+            self.assertEqual(source.read().decode("utf-8"), RAW_CRITICS)
+
+        pd.testing.assert_frame_equal(self.clean(), expected)
+        pd.testing.assert_frame_equal(self.clean(chunksize=2), expected)
+
+    def test_gzip(self):
+        """Test passes if a gzip compressed csv is found, and parsed by pandas"""
+
+        with gzip.open(self.critics_path + ".gz", "wt", encoding="utf-8") as f:
+            f.write(RAW_CRITICS)
+
+        self.assertEqual(raw_source(self.critics_path), (self.critics_path + ".gz", None))
+        self.assertEqual(self.clean(chunksize=3).shape[0], 3)
+
+    @unittest.skipUnless(importlib.util.find_spec("zstandard"), "zstandard is not installed")
+    def test_zstd(self):
+        """Test passes if a zstandard compressed csv is found, and parsed by pandas"""
+
+        import zstandard # pylint: disable=C0415,E0401
+        with open(self.critics_path + ".zst", "wb") as f:
+            f.write(zstandard.ZstdCompressor().compress(RAW_CRITICS.encode("utf-8")))
+
+        self.assertEqual(self.clean().shape[0], 3)
+
+    # Edge tests
+    def test_precedence_edge(self):
+        """Test passes if an uncompressed csv is preferred to a compressed one, and a
+        csv stored nowhere raises a FileNotFoundError, also in chunked mode"""
+
+        self.write_zip({"critics.csv": RAW_CRITICS})
+        with open(self.critics_path, "w", encoding="utf-8") as f:
+            f.write(RAW_CRITICS)
+        self.assertEqual(raw_source(self.critics_path), (self.critics_path, None))
+
+        missing = os.path.join(self.tmp_dir.name, "missing.csv")
+        self.assertRaises(FileNotFoundError, raw_source, missing)
+        cleaner = CriticsDataCleaner(chunksize=2)
+        cleaner.source_path = missing
+        self.assertRaises(FileNotFoundError, cleaner.run)
+
+
+if __name__ == "__main__":
+    unittest.main()
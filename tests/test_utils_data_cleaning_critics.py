@@ -6,6 +6,8 @@ test_utils_data_cleaning_critics does not export any classes, exceptions, or fun
 """
 
 
+import os
+import tempfile
 import unittest
 import pandas as pd
 
@@ -14,6 +16,9 @@ from rotten_tomatoes.utils.data_cleaning import ( # pylint: disable=E0401
     CriticsDataCleaner,
     ValidationException
 )
+from rotten_tomatoes.utils.metrics import CleaningMetrics # pylint: disable=E0401
+from rotten_tomatoes.utils.profiling import StageProfile # pylint: disable=E0401
+from rotten_tomatoes.utils.score_cache import ScoreCache # pylint: disable=E0401
 
 
 class TestUtilsDataCleaningCritics(unittest.TestCase):
@@ -73,6 +78,40 @@ class TestUtilsDataCleaningCritics(unittest.TestCase):
         for input_str, output in scores_to_test.items():
             self.assertEqual(cleaner._clean_single_score(input_str), output) # pylint: disable=W0212
 
+    def test_clean_scores_matches_single_score(self):
+        """Test passes if the vectorized cleaner._clean_scores returns the same values as
+        calling cleaner._clean_single_score on every score"""
+
+        cleaner = CriticsDataCleaner()
+
+        scores = pd.Series([
+            # manual_corrections
+            "35/4", "920", "910", "25/4", "45/5",
+            # substitutions, with and without spaces
+            "A+", "B", "C-", "F", "B +", " A-",
+            # fractions, including zero denominators and scores over 100
+            "3/5", "7/10", "2/0", "0/0", "3/1", "3.5/4", " 4 / 5 ", "-1/4",
+            # number scores, including scores over 100
+            "110", "60", "-19", "92.5", "1e3", "0", "1_000",
+        ])
+
+        expected = pd.Series(
+            [cleaner._clean_single_score(score) for score in scores], # pylint: disable=W0212
+            dtype="float64"
+        )
+        cleaned = cleaner._clean_scores(scores) # pylint: disable=W0212
+
+        pd.testing.assert_series_equal(cleaned, expected)
+
+    def test_clean_scores_numeric_column(self):
+        """Test passes if a numeric score column is capped at 100 and returned as float"""
+
+        cleaner = CriticsDataCleaner()
+
+        cleaned = cleaner._clean_scores(pd.Series([50, 150, -3])) # pylint: disable=W0212
+
+        self.assertEqual(cleaned.tolist(), [50.0, 100.0, -3.0])
+
     def test_clean_critics(self):
         """Test passes if the _clean function removes rows with None in the review_score column """
 
@@ -101,6 +140,85 @@ class TestUtilsDataCleaningCritics(unittest.TestCase):
             input_df =pd.DataFrame(data)
             self.assertEqual(cleaner._clean(input_df).shape[0], numrows) # pylint: disable=W0212
 
+    def test_clean_metrics_critics(self):
+        """Test passes if _clean counts the rows taking each cleaning path, weighting
+        each distinct score by the rows holding it"""
+
+        cleaner = CriticsDataCleaner(score_cache=ScoreCache())
+
+        cleaner._clean(pd.DataFrame({ # pylint: disable=W0212
+            'review_score': ["3/4", "3/4", "B+", "80", "110", "35/4", "2/0", None, "30/10"]
+        }))
+
+        counts = cleaner.metrics.to_dict()["counts"]
+        self.assertEqual(counts, {
+            "score_null": 1,
+            "score_fraction": 2,
+            "score_letter": 1,
+            "score_numeric": 1,
+            "score_capped": 2,
+            "score_manual": 1,
+            "score_dropped": 1,
+        })
+        self.assertEqual(cleaner.metrics.samples["score_capped"], ["110", "30/10"])
+
+        # Paths are recorded for cached scores too
+        cleaner.metrics = CleaningMetrics()
+        cleaner._clean(pd.DataFrame({'review_score': ["110", "110"]})) # pylint: disable=W0212
+        self.assertEqual(cleaner.metrics["score_capped"], 2)
+
+    def test_clean_partitioned_critics(self):
+        """Test passes if cleaning with n_workers=3 gives the same rows, in the same order,
+        as cleaning in one process"""
+
+        data = pd.DataFrame({
+            'rotten_tomatoes_link': [f"m/{i}" for i in range(10)],
+            'review_score': ["3/4", None, "B+", "2/0", "110", "7/10", "A", "35/4", None, "60"],
+        })
+
+        serial_cleaner = CriticsDataCleaner()
+        serial = serial_cleaner._clean(data) # pylint: disable=W0212
+        cleaner = CriticsDataCleaner(n_workers=3)
+        try:
+            partitioned = cleaner._clean(data) # pylint: disable=W0212
+            # Scores are read as categories
+            categorical = CriticsDataCleaner(n_workers=3)
+            categorical._executor = cleaner._executor # pylint: disable=W0212
+            categorical_partitioned = categorical._clean( # pylint: disable=W0212
+                data.astype({'review_score': 'category'})
+            )
+        finally:
+            cleaner._executor.shutdown() # pylint: disable=W0212
+
+        pd.testing.assert_frame_equal(partitioned, serial)
+        pd.testing.assert_frame_equal(categorical_partitioned, serial)
+        self.assertEqual(cleaner.metrics.counts, serial_cleaner.metrics.counts)
+        self.assertEqual(categorical.metrics.counts, serial_cleaner.metrics.counts)
+        self.assertEqual(cleaner.metrics["score_null"], 2)
+        self.assertEqual(cleaner.metrics["score_fraction"], 2)
+        self.assertEqual(cleaner.metrics["score_capped"], 1)
+
+    def test_clean_partitioned_cprofile_critics(self):
+        """Test passes if a cleaner profiled with cProfile cleans with n_workers=2,
+        and the clean stage's stats are written"""
+
+        data = pd.DataFrame({
+            'rotten_tomatoes_link': [f"m/{i}" for i in range(4)],
+            'review_score': ["3/4", "B+", "7/10", "60"],
+        })
+        with tempfile.TemporaryDirectory() as cprofile_dir:
+            cleaner = CriticsDataCleaner(n_workers=2)
+            cleaner.profile = StageProfile("critics", cprofile_dir=cprofile_dir)
+            try:
+                with cleaner.profile.stage("clean"):
+                    cleaned = cleaner._clean(data) # pylint: disable=W0212
+            finally:
+                cleaner._executor.shutdown() # pylint: disable=W0212
+            cleaner.profile.finish()
+
+            self.assertEqual(cleaned.shape[0], 4)
+            self.assertEqual(os.listdir(cprofile_dir), ["critics.clean.prof"])
+
     def test_validate_critics(self):
         """Passes if no error thrown by cleaner._validate"""
 
@@ -140,6 +258,47 @@ class TestUtilsDataCleaningCritics(unittest.TestCase):
         for input_str in scores_to_test_for_error:
             self.assertRaises(ValueError, cleaner._clean_single_score,input_str) # pylint: disable=W0212
 
+    def test_clean_scores_edge_critics(self):
+        """Test passes if value error is thrown by cleaner._clean_scores when any score in
+        the column cannot be processed"""
+
+        cleaner = CriticsDataCleaner()
+
+        scores_to_test_for_error = [
+            ["A", "G"],
+            ["3/4", "some multi-word string"],
+            ["**"],
+            ["7/10", "?/10"],
+            ["3?/89", "B+"],
+            ["1/2/3"]
+        ]
+
+        for scores in scores_to_test_for_error:
+            self.assertRaises(
+                ValueError, cleaner._clean_scores, pd.Series(scores) # pylint: disable=W0212
+            )
+
+    def test_small_score_cache_edge(self):
+        """Test passes if the cleaning paths are counted correctly when there are more
+        distinct scores than the score cache holds, both for cached and new scores"""
+
+        cleaner = CriticsDataCleaner(score_cache=ScoreCache(max_size=2))
+        data = pd.DataFrame({'review_score': ["3/4", "B+", "80", "110", "2/0"]})
+        expected = {
+            "score_null": 0,
+            "score_fraction": 1,
+            "score_letter": 1,
+            "score_numeric": 1,
+            "score_capped": 1,
+            "score_dropped": 1,
+        }
+
+        for _ in range(2):
+            cleaner.metrics = CleaningMetrics()
+            cleaner._clean(data.copy()) # pylint: disable=W0212
+            self.assertEqual(cleaner.metrics.to_dict()["counts"], expected)
+            self.assertEqual(len(cleaner.score_cache), 2)
+
     def test_validate_edge(self):
         """Passes if Validation Exception thrown by _validate """
 
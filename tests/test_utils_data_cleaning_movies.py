@@ -6,6 +6,8 @@ test_utils_data_cleaning_movies does not export any classes, exceptions, or func
 """
 
 
+import os
+import tempfile
 import unittest
 import pandas as pd
 
@@ -52,6 +54,29 @@ class TestUtilsDataCleaningMovies(unittest.TestCase):
             input_df =pd.DataFrame(data)
             self.assertEqual(cleaner_movies._clean(input_df).shape[0], numrows) # pylint: disable=W0212
 
+    def test_read_movies(self):
+        """Test passes if _read parses only the schema columns, with the schema dtypes"""
+
+        cleaner = MoviesDataCleaner()
+
+        raw = pd.DataFrame({
+            'rotten_tomatoes_link': ["m/a", "m/b"],
+            'movie_title': ["Movie A", "Movie B"],
+            'movie_info': ["A long, free-text description.", "Another one."],
+            'tomatometer_rating': [49, 87],
+            'audience_rating': [53.0, None],
+        })
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cleaner.source_path = os.path.join(tmp_dir, "movies.csv")
+            raw.to_csv(cleaner.source_path, index=False)
+            data = cleaner._read() # pylint: disable=W0212
+
+        self.assertEqual(list(data.columns), cleaner.keep_columns)
+        self.assertEqual(
+            {col: str(dtype) for col, dtype in data.dtypes.items()}, cleaner.schema
+        )
+
     def test_validate_movies(self):
         """Passes if no error thrown by _validate"""
 
@@ -9,13 +9,65 @@ test_utils_data_download does not export any classes, exceptions, or functions
 import unittest
 import os
 import json
+import tempfile
+import threading
+import zipfile
 
 from rotten_tomatoes.utils.data_download import ( # pylint: disable=E0401
+    DatasetDownloadException,
     get_kaggle_creds,
     download_kaggle_datasets,
     validate_kaggle_dataset_list
 )
 
+
+class FakeKaggleApi: # pylint: disable=R0903
+    """Local stand-in for an authenticated KaggleApi, writing each dataset's zip
+    file like the Kaggle API does, without network access"""
+
+    def __init__(self, files, barrier=None):
+        """files maps each known username/dataset to its file name -> contents.
+        If barrier is set, every download waits on it, so the downloads only
+        finish if enough of them run at once"""
+        self.files = files
+        self.barrier = barrier
+        self.version = 1
+        self.downloads = []
+
+    def datasets_view_with_http_info(self, owner_slug, dataset_slug):
+        """Returns the dataset's details, like the Kaggle API"""
+        return {"ref": f"{owner_slug}/{dataset_slug}", "currentVersionNumber": self.version}
+
+    @staticmethod
+    def process_response(response):
+        """Returns the parsed response, like the Kaggle API"""
+        return response
+
+    def dataset_download_files(self, dataset, path, unzip):
+        """Write dataset's zip file to path, or raise like a 403 from Kaggle"""
+        if dataset not in self.files:
+            raise ValueError("(403) Reason: Forbidden")
+        self.downloads.append(dataset)
+        if self.barrier is not None:
+            self.barrier.wait()
+        assert not unzip
+        os.makedirs(path, exist_ok=True)
+        zip_path = os.path.join(path, f"{dataset.split('/')[1]}.zip")
+        with zipfile.ZipFile(zip_path, "w") as archive:
+            for file_name, contents in self.files[dataset].items():
+                archive.writestr(file_name, contents)
+
+
+FAKE_FILES = {
+    "stefanoleone992/rotten-tomatoes-movies-and-critic-reviews-dataset": {
+        "rotten_tomatoes_critic_reviews.csv": "rotten_tomatoes_link,review_score\nm/a,3/4\n",
+        "rotten_tomatoes_movies.csv": "rotten_tomatoes_link,movie_title\nm/a,Movie A\n",
+    },
+    "unanimad/the-oscar-award": {
+        "the_oscar_award.csv": "year_film,film,winner\n2000,Movie A,True\n",
+    },
+}
+
 class TestDataDownload(unittest.TestCase):
 
     """
@@ -107,6 +159,85 @@ class TestDataDownload(unittest.TestCase):
             kaggle_dataset_list,
         )
 
+    def test_download_kaggle_datasets_fake(self):
+        """One shot test passes if download_kaggle_datasets extracts every file of each
+        dataset from a fake Kaggle API, removes the zip files, and returns the files
+        of each dataset"""
+
+        with tempfile.TemporaryDirectory() as output_loc:
+            downloaded = download_kaggle_datasets(
+                "username", "key", list(FAKE_FILES), output_loc,
+                api=FakeKaggleApi(FAKE_FILES)
+            )
+
+            self.assertEqual(
+                sorted(os.listdir(output_loc)),
+                ["kaggle_manifest.json", "rotten_tomatoes_critic_reviews.csv",
+                 "rotten_tomatoes_movies.csv", "the_oscar_award.csv"]
+            )
+            self.assertEqual(
+                downloaded["unanimad/the-oscar-award"],
+                [os.path.join(output_loc, "the_oscar_award.csv")]
+            )
+
+    def test_download_kaggle_datasets_concurrent(self):
+        """One shot test passes if max_workers datasets are downloaded at once: each
+        download waits for the other, so they only finish if they run concurrently"""
+
+        with tempfile.TemporaryDirectory() as output_loc:
+            api = FakeKaggleApi(FAKE_FILES, barrier=threading.Barrier(2, timeout=5))
+            downloaded = download_kaggle_datasets(
+                "username", "key", list(FAKE_FILES), output_loc, max_workers=2, api=api
+            )
+
+        self.assertEqual(list(downloaded), list(FAKE_FILES))
+
+    def test_download_kaggle_datasets_skip(self):
+        """One shot test passes if datasets whose version and files are unchanged are
+        not downloaded again, while a new version, or a changed file, is"""
+
+        api = FakeKaggleApi(FAKE_FILES)
+        oscars = "unanimad/the-oscar-award"
+        with tempfile.TemporaryDirectory() as output_loc:
+            download_kaggle_datasets("username", "key", list(FAKE_FILES), output_loc, api=api)
+            downloaded = download_kaggle_datasets(
+                "username", "key", list(FAKE_FILES), output_loc, api=api
+            )
+            self.assertEqual(len(api.downloads), 2)
+            self.assertEqual(len(downloaded[oscars]), 1)
+
+            with open(downloaded[oscars][0], "a", encoding="utf-8") as f:
+                f.write("2001,Movie B,False\n")
+            download_kaggle_datasets("username", "key", [oscars], output_loc, api=api)
+            self.assertEqual(api.downloads[2:], [oscars])
+
+            api.version = 2
+            download_kaggle_datasets("username", "key", list(FAKE_FILES), output_loc, api=api)
+            self.assertEqual(len(api.downloads), 5)
+
+    def test_download_kaggle_datasets_keep_archives(self):
+        """One shot test passes if unzip=False keeps each dataset's zip file, and
+        downloading the dataset extracted later replaces the zip file"""
+
+        api = FakeKaggleApi(FAKE_FILES)
+        oscars = "unanimad/the-oscar-award"
+        with tempfile.TemporaryDirectory() as output_loc:
+            downloaded = download_kaggle_datasets(
+                "username", "key", [oscars], output_loc, api=api, unzip=False
+            )
+            self.assertEqual(
+                downloaded[oscars], [os.path.join(output_loc, "the-oscar-award.zip")]
+            )
+            self.assertEqual(
+                sorted(os.listdir(output_loc)), ["kaggle_manifest.json", "the-oscar-award.zip"]
+            )
+
+            download_kaggle_datasets("username", "key", [oscars], output_loc, api=api)
+            self.assertEqual(
+                sorted(os.listdir(output_loc)), ["kaggle_manifest.json", "the_oscar_award.csv"]
+            )
+            self.assertEqual(len(api.downloads), 2)
+
     @unittest.skip("Kaggle API key is required to download the data. Time intensive test.")
     def test_download_kaggle_datasets(self):
         """One shot test passes if download_kaggle_datasets downloads the following files
@@ -138,6 +269,33 @@ class TestDataDownload(unittest.TestCase):
         self.assertTrue(all(file in file_names for file in files_to_check_for))
 
     # Edge Tests
+    def test_download_kaggle_datasets_fake_edge(self):
+        """download_kaggle_datasets Edge test: with a fake Kaggle API, passes if a
+        dataset which fails does not stop the others, its error is raised in a
+        DatasetDownloadException (a ValueError) with the downloaded files, and
+        max_workers below 1 throws a ValueError"""
+
+        kaggle_dataset_list = ["madeupuser/missing-dataset", "unanimad/the-oscar-award"]
+        with tempfile.TemporaryDirectory() as output_loc:
+            with self.assertRaises(DatasetDownloadException) as context:
+                download_kaggle_datasets(
+                    "username", "key", kaggle_dataset_list, output_loc, max_workers=2,
+                    api=FakeKaggleApi(FAKE_FILES)
+                )
+            self.assertTrue(os.path.exists(os.path.join(output_loc, "the_oscar_award.csv")))
+
+        self.assertIsInstance(context.exception, ValueError)
+        self.assertEqual(list(context.exception.errors), ["madeupuser/missing-dataset"])
+        self.assertIn("403", str(context.exception))
+        self.assertEqual(list(context.exception.downloaded), ["unanimad/the-oscar-award"])
+
+        self.assertRaises(
+            ValueError,
+            download_kaggle_datasets,
+            "username", "key", kaggle_dataset_list, "data/", max_workers=0,
+            api=FakeKaggleApi(FAKE_FILES)
+        )
+
     @unittest.skip("Kaggle API key is required to download the data. Time intensive test")
     def test_download_kaggle_datasets_edge1(self):
         """download_kaggle_datasets Edge test 1: invalid username/dataset returns 403 error,
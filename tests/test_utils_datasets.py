@@ -0,0 +1,110 @@
+"""
+Runs one shot tests and edge tests for the functions imported from
+rotten_tomatoes.utils.datasets
+
+test_utils_datasets does not export any classes, exceptions, or functions
+"""
+
+
+import os
+import tempfile
+import unittest
+import pandas as pd
+
+from rotten_tomatoes.utils.datasets import ( # pylint: disable=E0401
+    DatasetSink,
+    write_dataset,
+    load_dataset
+)
+
+
+MERGED_DATA = pd.DataFrame({
+    'year_film': pd.array([2001, 2000, 2002, 2000], dtype="int16"),
+    'category': pd.Categorical(["BEST PICTURE"] * 4),
+    'movie_title': ["Movie B", "Movie A", "Movie C", "Movie A"],
+    'winner': pd.array([True, False, None, False], dtype="boolean"),
+    'review_score': [75.0, 85.0, 50.0, 60.0],
+})
+
+
+class TestUtilsDatasets(unittest.TestCase):
+    """ A class used to test the rotten_tomatoes.utils.datasets module """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory() # pylint: disable=R1732
+        self.path = os.path.join(self.tmp_dir.name, "best_picture_data")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    # One shot tests
+    def test_round_trip(self):
+        """Test passes if a written dataset loads back with the same rows and dtypes,
+        ordered by year_film"""
+
+        write_dataset(MERGED_DATA, self.path)
+
+        self.assertTrue(os.path.isdir(os.path.join(self.path, "year_film=2000")))
+        loaded = load_dataset(self.path)
+        expected = (
+            MERGED_DATA.sort_values("year_film", kind="stable")
+            .reset_index(drop=True)[loaded.columns]
+        )
+        pd.testing.assert_frame_equal(loaded, expected)
+
+    def test_projection_and_pruning(self):
+        """Test passes if only the requested columns and years are loaded"""
+
+        write_dataset(MERGED_DATA, self.path)
+
+        loaded = load_dataset(self.path, columns=["movie_title"], years=(2001, None))
+        self.assertEqual(loaded.columns.tolist(), ["movie_title"])
+        self.assertEqual(loaded["movie_title"].tolist(), ["Movie B", "Movie C"])
+
+        loaded = load_dataset(self.path, years=(None, 2000))
+        self.assertEqual(loaded["year_film"].tolist(), [2000, 2000])
+
+    def test_sink(self):
+        """Test passes if chunks written to a sink load back as the whole frame written
+        at once, in the same order"""
+
+        write_dataset(MERGED_DATA, self.path)
+        expected = load_dataset(self.path)
+
+        sink = DatasetSink(self.path)
+        for start in range(0, MERGED_DATA.shape[0], 3):
+            sink.write(MERGED_DATA.iloc[start:start + 3])
+        sink.write(MERGED_DATA.iloc[:0])
+        sink.close()
+
+        pd.testing.assert_frame_equal(load_dataset(self.path), expected)
+        self.assertEqual(sink.rows_written, MERGED_DATA.shape[0])
+
+    # Edge tests
+    def test_overwrite(self):
+        """Test passes if writing a dataset replaces, rather than adds to, the last one"""
+
+        write_dataset(MERGED_DATA, self.path)
+        write_dataset(MERGED_DATA.iloc[:1], self.path)
+
+        self.assertEqual(load_dataset(self.path).shape[0], 1)
+        self.assertEqual(load_dataset(self.path, years=(1990, 1999)).shape[0], 0)
+
+    def test_empty_edge(self):
+        """Test passes if an empty frame is written, replacing the last dataset, and
+        loads back empty with its columns and dtypes"""
+
+        write_dataset(MERGED_DATA, self.path)
+        write_dataset(MERGED_DATA.iloc[:0], self.path)
+
+        loaded = load_dataset(self.path)
+        expected = MERGED_DATA.iloc[:0].reset_index(drop=True)[loaded.columns]
+        # Parquet keeps no categories for an empty categorical.
+        pd.testing.assert_frame_equal(loaded, expected, check_categorical=False)
+        self.assertEqual(sorted(loaded.columns), sorted(MERGED_DATA.columns))
+        loaded = load_dataset(self.path, columns=["movie_title"], years=(2000, 2001))
+        self.assertEqual(loaded.shape, (0, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+Runs one shot tests and edge tests for the functions imported from
+rotten_tomatoes.utils.dedup
+
+test_utils_dedup does not export any classes, exceptions, or functions
+"""
+
+
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+
+from rotten_tomatoes.utils.dedup import ( # pylint: disable=E0401
+    row_fingerprints,
+    dedup
+)
+from rotten_tomatoes.utils.metrics import CleaningMetrics # pylint: disable=E0401
+
+
+class TestUtilsDedup(unittest.TestCase):
+    """ A class used to test the rotten_tomatoes.utils.dedup module """
+
+    # One shot tests
+    def test_dedup(self):
+        """Test passes if dedup keeps the first of each duplicated row, like
+        drop_duplicates, and counts the rows dropped"""
+
+        data = pd.DataFrame({
+            'year_film': [2000, 2000, 2001, 2000],
+            'film': ["Movie A", "Movie A", "Movie A", "Movie A"],
+            'category': pd.Categorical(["BEST PICTURE", "BEST PICTURE", None, "ACTOR"]),
+        })
+
+        deduped, dropped = dedup(data)
+
+        pd.testing.assert_frame_equal(deduped, data.drop_duplicates())
+        self.assertEqual(dropped, 1)
+
+    def test_dedup_subset(self):
+        """Test passes if only the identity columns are compared"""
+
+        data = pd.DataFrame({
+            'link': ["m/a", "m/a", "m/b"],
+            'score': [75.0, 80.0, 75.0],
+        })
+
+        deduped, dropped = dedup(data, ["link"])
+
+        self.assertEqual(deduped.index.tolist(), [0, 2])
+        self.assertEqual(dropped, 1)
+
+    def test_dedup_chunks(self):
+        """Test passes if rows seen in earlier chunks are dropped, even when chunks
+        have different categories"""
+
+        seen = {}
+        first, _ = dedup(pd.DataFrame({'film': pd.Categorical(["A", "B"])}), seen=seen)
+        second, dropped = dedup(pd.DataFrame({'film': pd.Categorical(["B", "C"])}), seen=seen)
+
+        self.assertEqual(first["film"].tolist(), ["A", "B"])
+        self.assertEqual(second["film"].tolist(), ["C"])
+        self.assertEqual(dropped, 1)
+        self.assertEqual(len(seen), 3)
+
+    # Edge tests
+    def test_collision_edge(self):
+        """Test passes if rows with colliding fingerprints are only dropped when their
+        identity columns are equal, within and across chunks, and collisions are
+        counted"""
+
+        data = pd.DataFrame({
+            'film': ["A", "B", "A", "B", None, None],
+            'year_film': [2000, 2000, 2000, 2000, 2001, 2001],
+        })
+        metrics = CleaningMetrics()
+        seen = {}
+        collide = lambda data, subset=None: np.zeros(data.shape[0], dtype=np.uint64)
+
+        with mock.patch("rotten_tomatoes.utils.dedup.row_fingerprints", collide):
+            deduped, dropped = dedup(data, ["film"], seen=seen, metrics=metrics)
+            self.assertEqual(deduped.index.tolist(), [0, 1, 4])
+            self.assertEqual(dropped, 3)
+            self.assertEqual(metrics["fingerprint_collisions"], 2)
+
+            second, dropped = dedup(
+                pd.DataFrame({'film': ["C", "B", None]}), seen=seen, metrics=metrics
+            )
+            self.assertEqual(second["film"].tolist(), ["C"])
+            self.assertEqual(dropped, 2)
+            self.assertEqual(metrics["fingerprint_collisions"], 5)
+
+    def test_empty(self):
+        """Test passes if an empty frame is returned unchanged"""
+
+        deduped, dropped = dedup(pd.DataFrame({'film': []}))
+
+        self.assertEqual(deduped.shape[0], 0)
+        self.assertEqual(dropped, 0)
+        self.assertEqual(len(row_fingerprints(pd.DataFrame({'film': []}))), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
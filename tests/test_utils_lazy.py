@@ -0,0 +1,87 @@
+"""
+Runs one shot tests and edge tests for the classes imported from
+rotten_tomatoes.utils.lazy, and the imports of the modules using them
+
+test_utils_lazy does not export any classes, exceptions, or functions
+"""
+
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+from rotten_tomatoes.utils.lazy import LazyModule # pylint: disable=E0401
+
+# Libraries which must not be imported by merely importing a module.
+HEAVY_MODULES = ["sklearn", "matplotlib", "seaborn"]
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORTED_MODULES = """
+import json, sys
+steps = []
+for step in sys.argv[1:]:
+    exec(step)
+    steps.append(sorted(name for name in sys.modules if "." not in name))
+print(json.dumps(steps))
+"""
+
+
+def imported_modules(*steps):
+    """Runs each step of Python code in order in a new interpreter, returning the
+    top level modules imported after each step."""
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORTED_MODULES, *steps],
+        cwd=REPO_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output)
+
+
+class TestUtilsLazy(unittest.TestCase):
+    """ A class used to test the rotten_tomatoes.utils.lazy module """
+
+    # One shot tests
+    def test_lazy_module(self):
+        """Test passes if the module is only imported once an attribute is used"""
+
+        module = LazyModule("json")
+        self.assertIn("not imported", repr(module))
+        self.assertEqual(module.dumps([1]), "[1]")
+        self.assertIs(module.loads, json.loads)
+        self.assertNotIn("not imported", repr(module))
+
+    def test_lazy_imports(self):
+        """Test passes if importing the package and the data download and cache
+        modules imports neither pandas, pyarrow nor kaggle until pandas and pyarrow
+        are first used, and the cleaning and regression modules import no model or
+        plotting library until first used"""
+
+        imported, used = imported_modules(
+            "import rotten_tomatoes.utils.data_download, rotten_tomatoes.utils.cache",
+            "from rotten_tomatoes.utils import cache; cache.pd.DataFrame; cache.pq.ParquetFile",
+        )
+        for module in ["pandas", "pyarrow", "kaggle"]:
+            self.assertNotIn(module, imported, module)
+        self.assertIn("pandas", used)
+        self.assertIn("pyarrow", used)
+
+        imported, used = imported_modules(
+            "import rotten_tomatoes.utils.data_cleaning, rotten_tomatoes.utils.regression",
+            "from rotten_tomatoes.utils import regression; regression.linear_model.LinearRegression",
+        )
+        for heavy_module in HEAVY_MODULES:
+            self.assertNotIn(heavy_module, imported, heavy_module)
+        self.assertIn("sklearn", used)
+
+    # Edge tests
+    def test_missing_module_edge(self):
+        """Test passes if a missing module only raises once an attribute is used"""
+
+        module = LazyModule("madeup_module_that_does_not_exist")
+        with self.assertRaises(ModuleNotFoundError):
+            module.anything # pylint: disable=W0104
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Runs one shot tests and edge tests for the classes and functions imported from
+rotten_tomatoes.utils.metrics
+
+test_utils_metrics does not export any classes, exceptions, or functions
+"""
+
+
+import json
+import os
+import tempfile
+import unittest
+
+from rotten_tomatoes.utils.metrics import ( # pylint: disable=E0401
+    CleaningMetrics,
+    write_report
+)
+
+
+class TestUtilsMetrics(unittest.TestCase):
+    """ A class used to test the rotten_tomatoes.utils.metrics module """
+
+    # One shot tests
+    def test_add_merge(self):
+        """Test passes if counts add up across add and merge, with distinct samples"""
+
+        metrics = CleaningMetrics()
+        metrics.add("score_capped", 3, ["110", "150", "110"])
+        metrics.add("rows_out", 10)
+
+        other = CleaningMetrics()
+        other.add("score_capped", 2, ["200"])
+        metrics.merge(other)
+
+        self.assertEqual(metrics["score_capped"], 5)
+        self.assertEqual(metrics["rows_out"], 10)
+        self.assertEqual(metrics["score_letter"], 0)
+        self.assertEqual(metrics.to_dict()["samples"], {"score_capped": ["110", "150", "200"]})
+
+    def test_write_report(self):
+        """Test passes if the report holds the counts and samples of every step"""
+
+        cleaner_metrics = CleaningMetrics()
+        cleaner_metrics.add("score_dropped", 1, ["2/0"])
+        merge_metrics = CleaningMetrics()
+        merge_metrics.add("rows_without_title", 4)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "report.json")
+            write_report({"critics": cleaner_metrics, "merge": merge_metrics}, path)
+            with open(path, "r", encoding="utf-8") as f:
+                report = json.load(f)
+
+        self.assertEqual(report["critics"]["counts"], {"score_dropped": 1})
+        self.assertEqual(report["critics"]["samples"], {"score_dropped": ["2/0"]})
+        self.assertEqual(report["merge"]["counts"], {"rows_without_title": 4})
+        self.assertEqual(json.loads(merge_metrics.to_json()), report["merge"])
+
+    # Edge test
+    def test_max_samples(self):
+        """Test passes if no more than max_samples samples are kept per counter"""
+
+        metrics = CleaningMetrics(max_samples=2)
+        metrics.add("score_other", 4, ["a", "b", "c", "d"])
+
+        self.assertEqual(metrics["score_other"], 4)
+        self.assertEqual(metrics.samples["score_other"], ["a", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+Runs one shot tests and edge tests for the classes and functions imported from
+rotten_tomatoes.utils.mirror
+
+test_utils_mirror does not export any classes, exceptions, or functions
+"""
+
+
+import os
+import pathlib
+import tempfile
+import unittest
+
+from rotten_tomatoes.utils.data_download import download_kaggle_datasets # pylint: disable=E0401
+from rotten_tomatoes.utils.mirror import ( # pylint: disable=E0401
+    DatasetMirror,
+    mirror_directory
+)
+
+OSCARS = "unanimad/the-oscar-award"
+
+
+class TestUtilsMirror(unittest.TestCase):
+    """ A class used to test the rotten_tomatoes.utils.mirror module """
+
+    def setUp(self):
+        """Fill a shared mirror with one dataset, and make an empty output directory."""
+        self.tmp_dir = tempfile.TemporaryDirectory() # pylint: disable=R1732
+        self.shared = os.path.join(self.tmp_dir.name, "shared")
+        self.output = os.path.join(self.tmp_dir.name, "data")
+        os.makedirs(os.path.join(self.shared, "awards"))
+        self.oscars_path = os.path.join(self.shared, "awards", "the_oscar_award.csv")
+        with open(self.oscars_path, "w", encoding="utf-8") as f:
+            f.write("year_film,film,winner\n2000,Movie A,True\n")
+        DatasetMirror(self.shared).record(OSCARS, 3, [self.oscars_path])
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    # One shot tests
+    def test_manifest(self):
+        """Test passes if a recorded dataset's version and files are read back, and
+        it is current until its version or files change"""
+
+        mirror = DatasetMirror(self.shared)
+        self.assertEqual(mirror.version(OSCARS), 3)
+        self.assertEqual(mirror.files(OSCARS), [self.oscars_path])
+        self.assertTrue(mirror.is_current(OSCARS, 3))
+        self.assertFalse(mirror.is_current(OSCARS, 4))
+        self.assertFalse(mirror.is_current(OSCARS, None))
+
+        with open(self.oscars_path, "w", encoding="utf-8") as f:
+            f.write("year_film,film,winner\n2000,Movie B,True\n")
+        self.assertFalse(mirror.verify(OSCARS))
+
+        mirror.forget(OSCARS)
+        self.assertIsNone(DatasetMirror(self.shared).version(OSCARS))
+
+    def test_download_from_mirror(self):
+        """Test passes if datasets are copied from a file:// mirror without a Kaggle
+        API, keeping their relative paths and version, and files already copied are
+        left alone"""
+
+        source = pathlib.Path(self.shared).as_uri()
+        downloaded = download_kaggle_datasets(None, None, [OSCARS], self.output, source=source)
+
+        copied = os.path.join(self.output, "awards", "the_oscar_award.csv")
+        self.assertEqual(downloaded, {OSCARS: [copied]})
+        self.assertTrue(DatasetMirror(self.output).is_current(OSCARS, 3))
+
+        modified = os.path.getmtime(copied) - 10
+        os.utime(copied, (modified, modified))
+        download_kaggle_datasets(None, None, [OSCARS], self.output, source=self.shared)
+        self.assertEqual(os.path.getmtime(copied), modified)
+
+    # Edge tests
+    def test_corrupt_mirror_edge(self):
+        """Test passes if a file which no longer matches its checksum in the source
+        mirror, or a dataset the mirror does not have, raises a ValueError, and the
+        bad file is not copied"""
+
+        with open(self.oscars_path, "a", encoding="utf-8") as f:
+            f.write("2001,Movie B,False\n")
+        os.makedirs(self.output)
+        source = DatasetMirror(self.shared)
+        target = DatasetMirror(self.output)
+
+        with self.assertRaisesRegex(ValueError, "checksum"):
+            source.copy_to(OSCARS, target)
+        self.assertEqual(os.listdir(os.path.join(self.output, "awards")), [])
+        self.assertRaises(ValueError, source.copy_to, "madeupuser/missing", target)
+
+    def test_mirror_directory_edge(self):
+        """Test passes if directories and file:// URLs resolve to the directory, and
+        other URLs or missing directories raise a ValueError"""
+
+        self.assertEqual(mirror_directory(self.shared), self.shared)
+        self.assertEqual(
+            os.path.normpath(mirror_directory(pathlib.Path(self.shared).as_uri())),
+            os.path.normpath(self.shared)
+        )
+        self.assertRaises(ValueError, mirror_directory, "https://example.com/mirror")
+        self.assertRaises(ValueError, mirror_directory, os.path.join(self.shared, "missing"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,260 @@
+"""
+Runs one shot tests and edge tests for the functions imported from
+rotten_tomatoes.utils.pipeline
+
+test_utils_pipeline does not export any classes, exceptions, or functions
+"""
+
+
+import json
+import os
+import tempfile
+import unittest
+import pandas as pd
+
+from rotten_tomatoes.utils.cache import CleanedFrameCache # pylint: disable=E0401
+from rotten_tomatoes.utils.data_cleaning import ( # pylint: disable=E0401
+    CriticsDataCleaner,
+    MoviesDataCleaner,
+    BestPictureOscarsDataCleaner,
+    AnyWinOscarsDataCleaner,
+    MergeExpansionException
+)
+from rotten_tomatoes.utils.pipeline import ( # pylint: disable=E0401
+    run_cleaners,
+    check_merge_cardinality,
+    merge_movie_titles,
+    aggregate_critics,
+    merge_oscars
+)
+from rotten_tomatoes.utils.metrics import CleaningMetrics # pylint: disable=E0401
+from rotten_tomatoes.utils.shared_source import SharedSources # pylint: disable=E0401
+from rotten_tomatoes.utils.title_matching import TitleMatcher # pylint: disable=E0401
+
+
+RAW_DATA = {
+    "critics.csv": pd.DataFrame({
+        'rotten_tomatoes_link': ["m/a", "m/a", "m/b", "m/c"],
+        'critic_name': ["x", "y", "x", "z"],
+        'top_critic': [True, False, True, False],
+        'review_type': ["Fresh", "Rotten", "Fresh", "Fresh"],
+        'review_score': ["3/4", "B", "1/2", "8/10"],
+    }),
+    "movies.csv": pd.DataFrame({
+        'rotten_tomatoes_link': ["m/a", "m/b", "m/c"],
+        'movie_title': ["Movie A", "Movie B", "Movie C"],
+        'tomatometer_rating': [80.0, 70.0, 60.0],
+        'audience_rating': [50.0, 60.0, 70.0],
+    }),
+    "oscars.csv": pd.DataFrame({
+        'year_film': [2000, 2000, 2001],
+        'category': ["BEST PICTURE", "BEST PICTURE", "ACTOR"],
+        'film': ["Movie A", "Movie B", "Movie C"],
+        'winner': [True, False, True],
+    }),
+}
+
+
+class TestUtilsPipeline(unittest.TestCase):
+    """ A class used to test the rotten_tomatoes.utils.pipeline module """
+
+    def setUp(self):
+        """Write the raw test csvs to a temporary directory."""
+        self.tmp_dir = tempfile.TemporaryDirectory() # pylint: disable=R1732
+        for file_name, data in RAW_DATA.items():
+            data.to_csv(os.path.join(self.tmp_dir.name, file_name), index=False)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _cleaners(self):
+        shared_sources = SharedSources()
+        cleaners = {
+            "any_win": AnyWinOscarsDataCleaner(shared_sources=shared_sources),
+            "best_picture": BestPictureOscarsDataCleaner(shared_sources=shared_sources),
+            "movies": MoviesDataCleaner(),
+            "critics": CriticsDataCleaner(),
+        }
+        for name, cleaner in cleaners.items():
+            file_name = {"movies": "movies.csv", "critics": "critics.csv"}.get(
+                name, "oscars.csv"
+            )
+            cleaner.source_path = os.path.join(self.tmp_dir.name, file_name)
+        return cleaners
+
+    # One shot tests
+    def test_run_cleaners(self):
+        """Test passes if cleaners run in a process pool give the same outputs, in the
+        same order, as running each cleaner directly"""
+
+        cleaners = self._cleaners()
+        outputs = run_cleaners(cleaners, max_workers=2)
+        expected = {name: cleaner.run() for name, cleaner in self._cleaners().items()}
+
+        self.assertEqual(list(outputs), list(expected))
+        for name, data in expected.items():
+            pd.testing.assert_frame_equal(outputs[name], data)
+
+        # Metrics of runs in worker processes are copied back onto the cleaners
+        self.assertEqual(cleaners["critics"].metrics["rows_read"], 4)
+        self.assertEqual(cleaners["critics"].metrics["score_fraction"], 3)
+        self.assertEqual(cleaners["movies"].metrics["rows_out"], 3)
+        # And so are their stage profiles
+        self.assertEqual(cleaners["critics"].profile["clean"]["rows_in"], 4)
+        self.assertEqual(cleaners["critics"].profile["clean"]["rows_out"], 4)
+
+    def test_run_cleaners_serial(self):
+        """Test passes if max_workers=1 runs the cleaners in this process, sharing the
+        Oscars read"""
+
+        cleaners = self._cleaners()
+        outputs = run_cleaners(cleaners, max_workers=1)
+
+        self.assertEqual(len(outputs), 4)
+        self.assertEqual(cleaners["any_win"].shared_sources.loads, 1)
+
+    def test_run_cleaners_cached(self):
+        """Test passes if cached cleaners sharing a cache directory run concurrently,
+        fingerprinting each raw file once, and a second run loads every output
+        from the cache"""
+
+        cache_dir = os.path.join(self.tmp_dir.name, "cache")
+        expected = {name: cleaner.run() for name, cleaner in self._cleaners().items()}
+        for _ in range(2):
+            cleaners = self._cleaners()
+            for cleaner in cleaners.values():
+                cleaner.cache = CleanedFrameCache(cache_dir)
+            outputs = run_cleaners(cleaners, max_workers=3)
+            for name, data in expected.items():
+                pd.testing.assert_frame_equal(outputs[name], data)
+
+        self.assertEqual(
+            sum(cleaner.metrics["cache_hits"] for cleaner in cleaners.values()), 4
+        )
+        with open(os.path.join(cache_dir, "fingerprints.json"), encoding="utf-8") as f:
+            self.assertEqual(len(json.load(f)), 3)
+        self.assertEqual([f for f in os.listdir(cache_dir) if f.endswith(".tmp")], [])
+
+    def test_merges(self):
+        """Test passes if reviews are merged onto titles, then onto Oscars by title"""
+
+        metrics = CleaningMetrics()
+        critics_data = merge_movie_titles(
+            pd.DataFrame({'rotten_tomatoes_link': ["m/a", "m/a", "m/d"],
+                          'review_score': [75.0, 85.0, 50.0]}),
+            pd.DataFrame({'rotten_tomatoes_link': ["m/a", "m/b"],
+                          'movie_title': ["Movie A", "Movie B"]}),
+            metrics=metrics
+        )
+        self.assertEqual(critics_data["movie_title"].tolist(), ["Movie A", "Movie A"])
+        self.assertEqual(metrics["rows_without_title"], 1)
+
+        merge_metrics = CleaningMetrics()
+        merged = merge_oscars(
+            pd.DataFrame({'year_film': [2000, 2000, 2000],
+                          'film': ["Movie A", "Movie B", "Movie A"]}),
+            pd.concat([critics_data, critics_data.iloc[:1]]),
+            metrics=merge_metrics
+        )
+        self.assertEqual(merged.shape[0], 2)
+        self.assertEqual(merged["review_score"].tolist(), [75.0, 85.0])
+        self.assertEqual(merge_metrics["duplicate_oscars_rows"], 1)
+        self.assertEqual(merge_metrics["duplicate_critics_rows"], 1)
+
+    def test_merge_oscars_keys(self):
+        """Test passes if rows are duplicates when their identity columns repeat, with
+        the Oscars keys named as in the input"""
+
+        metrics = CleaningMetrics()
+        merged = merge_oscars(
+            pd.DataFrame({'year_film': [2000, 2000, 2001],
+                          'film': ["Movie A", "Movie A", "Movie A"],
+                          'name': ["Producer A", "Producer B", "Producer A"]}),
+            pd.DataFrame({'movie_title': ["Movie A", "Movie A"],
+                          'critic_name': ["x", "x"],
+                          'review_score': [75.0, 80.0]}),
+            metrics=metrics,
+            oscars_keys=["year_film", "film"],
+            critics_keys=["movie_title", "critic_name"]
+        )
+
+        self.assertEqual(merged["name"].tolist(), ["Producer A", "Producer A"])
+        self.assertEqual(merged["review_score"].tolist(), [75.0, 75.0])
+        self.assertEqual(metrics["duplicate_oscars_rows"], 1)
+        self.assertEqual(metrics["duplicate_critics_rows"], 1)
+
+    def test_merge_oscars_matcher(self):
+        """Test passes if Oscars titles written differently are matched before merging"""
+
+        metrics = CleaningMetrics()
+        merged = merge_oscars(
+            pd.DataFrame({'year_film': [2000, 2001], 'film': ["The Artist", "Titanic"]}),
+            pd.DataFrame({'movie_title': ["Artist, The", "Artist, The", "Other"],
+                          'review_score': [75.0, 85.0, 50.0]}),
+            metrics=metrics,
+            matcher=TitleMatcher()
+        )
+
+        self.assertEqual(merged["movie_title"].tolist(), ["Artist, The", "Artist, The"])
+        self.assertEqual(metrics["matched_titles"], 1)
+        self.assertEqual(metrics.samples["matched_titles"], ["The Artist"])
+
+    def test_aggregate_critics(self):
+        """Test passes if reviews are reduced to one row of aggregates per movie"""
+
+        aggregated = aggregate_critics(pd.DataFrame({
+            'rotten_tomatoes_link': pd.Categorical(["m/a", "m/a", "m/a", "m/b"]),
+            'movie_title': ["Movie A", "Movie A", "Movie A", "Movie B"],
+            'top_critic': pd.array([True, False, None, False], dtype="boolean"),
+            'review_type': pd.Categorical(["Fresh", "Rotten", "Fresh", "Rotten"]),
+            'review_score': [90.0, 40.0, 80.0, 30.0],
+        }))
+
+        self.assertEqual(aggregated["movie_title"].tolist(), ["Movie A", "Movie B"])
+        self.assertEqual(aggregated["num_reviews"].tolist(), [3, 1])
+        self.assertEqual(aggregated["review_score"].tolist(), [70.0, 30.0])
+        self.assertEqual(aggregated["median_review_score"].tolist(), [80.0, 30.0])
+        self.assertEqual(aggregated["top_critic_score"].iloc[0], 90.0)
+        self.assertTrue(pd.isna(aggregated["top_critic_score"].iloc[1]))
+        self.assertAlmostEqual(aggregated["fresh_ratio"].iloc[0], 2 / 3)
+        self.assertEqual(aggregated["fresh_ratio"].iloc[1], 0.0)
+
+        merged = merge_oscars(
+            pd.DataFrame({'year_film': [2000], 'film': ["Movie A"]}),
+            aggregated,
+            validate="many_to_one"
+        )
+        self.assertEqual(merged.shape[0], 1)
+
+    # Edge test
+    def test_merge_movie_titles_expansion(self):
+        """Test passes if a link with two titles raises a MergeExpansionException"""
+
+        self.assertRaises(
+            MergeExpansionException,
+            merge_movie_titles,
+            pd.DataFrame({'rotten_tomatoes_link': ["m/a"], 'review_score': [75.0]}),
+            pd.DataFrame({'rotten_tomatoes_link': ["m/a", "m/a"],
+                          'movie_title': ["Movie A", "Movie A (2000)"]})
+        )
+
+    def test_check_merge_cardinality_edge(self):
+        """Test passes if duplicated keys on a "one" side raise a
+        MergeExpansionException listing them, and unique keys pass"""
+
+        left = pd.DataFrame({'movie_title': ["Movie A", "Movie A", "Movie B"]})
+        right = pd.DataFrame({'movie_title': ["Movie A", "Movie B", "Movie B", "Movie B"]})
+
+        check_merge_cardinality(left, right.drop_duplicates(), ["movie_title"])
+
+        with self.assertRaisesRegex(MergeExpansionException, r"1 keys.*right.*'Movie B'"):
+            check_merge_cardinality(left, right, ["movie_title"], validate="many_to_one")
+        with self.assertRaisesRegex(MergeExpansionException, r"left.*'Movie A'"):
+            check_merge_cardinality(left, right, ["movie_title"], validate="one_to_one")
+        self.assertRaises(
+            ValueError, check_merge_cardinality, left, right, ["movie_title"], "many_to_many"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+"""
+Runs one shot tests and edge tests for the classes and functions imported from
+rotten_tomatoes.utils.profiling
+
+test_utils_profiling does not export any classes, exceptions, or functions
+"""
+
+
+import json
+import os
+import pstats
+import tempfile
+import tracemalloc
+import unittest
+from unittest import mock
+import pandas as pd
+
+from rotten_tomatoes.utils.profiling import ( # pylint: disable=E0401
+    StageProfile,
+    write_run_report
+)
+
+
+class TestUtilsProfiling(unittest.TestCase):
+    """ A class used to test the rotten_tomatoes.utils.profiling module """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory() # pylint: disable=R1732
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    # One shot tests
+    def test_stage(self):
+        """Test passes if repeated runs of a stage are summed, with their rows"""
+
+        profile = StageProfile()
+        for rows in [3, 4]:
+            with profile.stage("clean", rows_in=rows) as stage:
+                stage["rows_out"] = rows - 1
+        with profile.stage("validate"):
+            pass
+
+        self.assertEqual(list(profile.to_dict()), ["clean", "validate"])
+        self.assertEqual(profile["clean"]["calls"], 2)
+        self.assertEqual(profile["clean"]["rows_in"], 7)
+        self.assertEqual(profile["clean"]["rows_out"], 5)
+        self.assertIsNone(profile["validate"]["rows_in"])
+        self.assertGreaterEqual(profile["clean"]["wall_seconds"], 0.0)
+        self.assertGreaterEqual(profile["clean"]["cpu_seconds"], 0.0)
+        self.assertIsNone(profile["clean"]["peak_traced_bytes"])
+        # Only the process' peak is known without tracing
+        self.assertIn("process_max_rss_bytes", profile["clean"])
+        self.assertNotIn("max_rss_bytes", profile["clean"])
+
+    def test_iterate(self):
+        """Test passes if producing each chunk is recorded as a run of the stage"""
+
+        profile = StageProfile()
+        chunks = [pd.DataFrame({'a': [1, 2]}), pd.DataFrame({'a': [3]})]
+
+        self.assertEqual(len(list(profile.iterate("read", chunks))), 2)
+        self.assertEqual(profile["read"]["rows_out"], 3)
+
+    def test_trace_memory(self):
+        """Test passes if the peak memory allocated in a traced stage is recorded, and
+        tracing stops with the stage"""
+
+        profile = StageProfile(trace_memory=True)
+        with profile.stage("allocate"):
+            data = bytearray(10_000_000)
+        del data
+
+        self.assertGreaterEqual(profile["allocate"]["peak_traced_bytes"], 10_000_000)
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_cprofile(self):
+        """Test passes if each stage's cProfile stats are written on finish, to the
+        directory in the environment variable by default"""
+
+        with mock.patch.dict(
+            os.environ, {"ROTTEN_TOMATOES_CPROFILE_DIR": self.tmp_dir.name}
+        ):
+            profile = StageProfile("critics")
+        with profile.stage("clean"):
+            sorted(range(1000))
+        profile.finish()
+
+        path = os.path.join(self.tmp_dir.name, "critics.clean.prof")
+        self.assertTrue(os.path.exists(path))
+        pstats.Stats(path)
+
+    def test_write_run_report(self):
+        """Test passes if profiles are written to a JSON report, with the run
+        environment"""
+
+        profile = StageProfile()
+        with profile.stage("merge", rows_in=2) as stage:
+            stage["rows_out"] = 1
+        path = os.path.join(self.tmp_dir.name, "run_report.json")
+
+        write_run_report({"pipeline": profile}, path)
+
+        with open(path, encoding="utf-8") as f:
+            report = json.load(f)
+        self.assertEqual(report["steps"]["pipeline"]["merge"]["rows_out"], 1)
+        self.assertEqual(report["pandas"], pd.__version__)
+
+    # Edge tests
+    def test_failed_stage_edge(self):
+        """Test passes if a stage raising an exception is still recorded, and the
+        exception is not swallowed"""
+
+        profile = StageProfile(trace_memory=True)
+        with self.assertRaises(KeyError):
+            with profile.stage("clean", rows_in=1):
+                raise KeyError("review_score")
+
+        self.assertEqual(profile["clean"]["calls"], 1)
+        self.assertFalse(tracemalloc.is_tracing())
+
+        profile.reset()
+        self.assertEqual(profile.to_dict(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
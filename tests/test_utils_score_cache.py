@@ -0,0 +1,133 @@
+"""
+Runs one shot tests and edge tests for the
+rotten_tomatoes.utils.score_cache.ScoreCache class
+
+test_utils_score_cache does not export any classes, exceptions, or functions
+"""
+
+
+import json
+import math
+import os
+import tempfile
+import unittest
+import pandas as pd
+
+from rotten_tomatoes.utils.score_cache import ScoreCache # pylint: disable=E0401
+from rotten_tomatoes.utils.data_cleaning import CriticsDataCleaner # pylint: disable=E0401
+
+
+class TestUtilsScoreCache(unittest.TestCase):
+    """ A class used to test the rotten_tomatoes.utils.score_cache module """
+
+    # One shot tests
+    def test_lookup(self):
+        """Test passes if lookup splits raw scores into cached hits and misses"""
+
+        cache = ScoreCache()
+        cache.update({"3/4": 75.0, "2/0": math.nan})
+
+        hits, misses = cache.lookup(["3/4", "B+", "2/0"])
+
+        self.assertEqual(hits["3/4"], 75.0)
+        self.assertTrue(math.isnan(hits["2/0"]))
+        self.assertEqual(misses, ["B+"])
+
+    def test_save_load(self):
+        """Test passes if a saved cache, including NaN scores, is reloaded from disk"""
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "score_cache.json")
+
+            cache = ScoreCache(path=path)
+            cache.update({"3/4": 75.0, "2/0": math.nan}, {"3/4": "fraction", "2/0": "dropped"})
+            cache.save()
+
+            reloaded = ScoreCache(path=path)
+
+            self.assertEqual(len(reloaded), 2)
+            hits, _ = reloaded.lookup(["3/4", "2/0"])
+            self.assertEqual(hits["3/4"], 75.0)
+            self.assertTrue(math.isnan(hits["2/0"]))
+            self.assertEqual(reloaded.paths(["3/4", "2/0", "B"]), ["fraction", "dropped", None])
+
+    def test_cleaner_uses_cache(self):
+        """Test passes if CriticsDataCleaner fills the cache with each distinct score
+        and reads cached scores back instead of reparsing them"""
+
+        cache = ScoreCache()
+        cleaner = CriticsDataCleaner(score_cache=cache)
+
+        cleaned = cleaner._clean_scores(pd.Series(["3/4", "B+", "3/4", "2/0"])) # pylint: disable=W0212
+
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(cleaned.tolist()[:3], [75.0, 88.0, 75.0])
+        self.assertTrue(math.isnan(cleaned.iloc[3]))
+
+        # A value cached under the cleaner's namespace is used as-is
+        cache.update({"3/4": 1.0}, namespace=cleaner.score_namespace)
+        cleaned = cleaner._clean_scores(pd.Series(["3/4"])) # pylint: disable=W0212
+        self.assertEqual(cleaned.tolist(), [1.0])
+
+    def test_namespaces(self):
+        """Test passes if scores are only returned from the namespace they were added
+        to, also once saved and reloaded, and saved entries without a namespace are
+        skipped"""
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "score_cache.json")
+            cache = ScoreCache(path=path)
+            cache.update({"35/4": 87.5}, {"35/4": "manual"}, namespace="old")
+            cache.update({"35/4": 80.0}, {"35/4": "manual"}, namespace="new")
+            cache.save()
+
+            reloaded = ScoreCache(path=path)
+            self.assertEqual(reloaded.lookup(["35/4"], "old")[0], {"35/4": 87.5})
+            self.assertEqual(reloaded.lookup(["35/4"], "new")[0], {"35/4": 80.0})
+            self.assertEqual(reloaded.lookup(["35/4"])[1], ["35/4"])
+
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"35/4": [87.5, "manual"]}, f)
+            self.assertEqual(len(ScoreCache(path=path)), 0)
+
+    # Edge tests
+    def test_changed_rules_edge(self):
+        """Test passes if a cleaner with changed corrections and version does not get
+        scores cached by the cleaner it replaces from the cache shared by default"""
+
+        class CorrectedCriticsDataCleaner(CriticsDataCleaner): # pylint: disable=R0903
+            """Critics cleaner reading 35/4 as 3.2/4."""
+            version = "2"
+            manual_corrections = dict(CriticsDataCleaner.manual_corrections, **{"35/4": 80.0})
+
+        scores = pd.Series(["35/4", "B"])
+        old = CriticsDataCleaner()._clean_scores(scores) # pylint: disable=W0212
+        new = CorrectedCriticsDataCleaner()._clean_scores(scores) # pylint: disable=W0212
+        fresh = CorrectedCriticsDataCleaner( # pylint: disable=W0212
+            score_cache=ScoreCache()
+        )._clean_scores(scores)
+
+        self.assertEqual(old.tolist(), [87.5, 85.0])
+        self.assertEqual(new.tolist(), [80.0, 85.0])
+        pd.testing.assert_series_equal(new, fresh)
+
+    def test_eviction(self):
+        """Test passes if the least recently used entry is evicted once max_size is reached"""
+
+        cache = ScoreCache(max_size=2)
+        cache.update({"A": 95.0, "B": 85.0})
+        cache.lookup(["A"])
+        cache.update({"C": 75.0})
+
+        self.assertEqual(len(cache), 2)
+        self.assertTrue("A" in cache)
+        self.assertFalse("B" in cache)
+
+    def test_invalid_max_size(self):
+        """Test passes if a non-positive max_size raises a ValueError"""
+
+        self.assertRaises(ValueError, ScoreCache, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
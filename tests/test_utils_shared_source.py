@@ -0,0 +1,104 @@
+"""
+Runs one shot tests and an edge test for rotten_tomatoes.utils.shared_source and
+DataCleaners sharing a source
+
+test_utils_shared_source does not export any classes, exceptions, or functions
+"""
+
+
+import os
+import tempfile
+import unittest
+import pandas as pd
+
+from rotten_tomatoes.utils.data_cleaning import ( # pylint: disable=E0401
+    BestPictureOscarsDataCleaner,
+    AnyWinOscarsDataCleaner
+)
+from rotten_tomatoes.utils.shared_source import SharedSources # pylint: disable=E0401
+
+
+OSCARS = pd.DataFrame({
+    'year_film': [1998, 1998, 1999, 1999, 2000],
+    'category': ["BEST PICTURE", "BEST PICTURE", "BEST PICTURE", "Best Actor", "ACTOR"],
+    'film': ["Movie A", "Movie B", "Movie C", "Movie C", "Movie D"],
+    'winner': [True, False, True, True, None],
+    'name': ["Producer", "Producer", "Producer", "Actor", "Actor"],
+})
+
+
+class TestUtilsSharedSource(unittest.TestCase):
+    """ A class used to test the rotten_tomatoes.utils.shared_source module """
+
+    def setUp(self):
+        """Write the raw test csv to a temporary directory."""
+        self.tmp_dir = tempfile.TemporaryDirectory() # pylint: disable=R1732
+        self.oscars_path = os.path.join(self.tmp_dir.name, "oscars.csv")
+        OSCARS.to_csv(self.oscars_path, index=False)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _cleaner(self, cls, shared_sources=None):
+        cleaner = cls(shared_sources=shared_sources)
+        cleaner.source_path = self.oscars_path
+        return cleaner
+
+    def _run(self, cls, shared_sources=None):
+        return self._cleaner(cls, shared_sources).run()
+
+    # One shot tests
+    def test_shared_matches_unshared(self):
+        """Test passes if both Oscars cleaners give the same output and count the
+        same rows read from one shared read as they do reading the file themselves"""
+
+        shared_sources = SharedSources()
+
+        for cls in [AnyWinOscarsDataCleaner, BestPictureOscarsDataCleaner]:
+            shared = self._cleaner(cls, shared_sources)
+            unshared = self._cleaner(cls)
+            pd.testing.assert_frame_equal(shared.run(), unshared.run())
+            self.assertEqual(shared.metrics.counts["rows_read"], OSCARS.shape[0])
+            self.assertEqual(
+                shared.metrics.counts["rows_read"], unshared.metrics.counts["rows_read"]
+            )
+
+        self.assertEqual(shared_sources.loads, 1)
+
+    def test_shared_frame_unchanged(self):
+        """Test passes if deriving an output leaves the shared frame untouched"""
+
+        shared_sources = SharedSources()
+        self._run(AnyWinOscarsDataCleaner, shared_sources)
+        shared = shared_sources.get(
+            next(iter(shared_sources._frames)), None # pylint: disable=W0212
+        )
+
+        self.assertEqual(list(shared.columns), ["year_film", "category", "film", "winner"])
+        self.assertEqual(str(shared["winner"].dtype), "boolean")
+        self.assertEqual(shared.shape[0], 4)
+
+    def test_clear(self):
+        """Test passes if a cleared registry loads the source again"""
+
+        shared_sources = SharedSources()
+        self._run(BestPictureOscarsDataCleaner, shared_sources)
+        shared_sources.clear()
+        self._run(BestPictureOscarsDataCleaner, shared_sources)
+
+        self.assertEqual(shared_sources.loads, 2)
+
+    # Edge test
+    def test_shared_chunked(self):
+        """Test passes if asking for shared sources in chunked mode raises a ValueError"""
+
+        self.assertRaises(
+            ValueError,
+            BestPictureOscarsDataCleaner,
+            chunksize=10,
+            shared_sources=SharedSources(),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
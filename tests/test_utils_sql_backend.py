@@ -0,0 +1,170 @@
+"""
+Runs one shot tests and edge tests for the classes imported from
+rotten_tomatoes.utils.sql_backend
+
+test_utils_sql_backend does not export any classes, exceptions, or functions
+"""
+
+
+import unittest
+import numpy as np
+import pandas as pd
+
+from rotten_tomatoes.utils.data_cleaning import ( # pylint: disable=E0401
+    AnyWinOscarsDataCleaner,
+    MergeExpansionException
+)
+from rotten_tomatoes.utils.metrics import CleaningMetrics # pylint: disable=E0401
+from rotten_tomatoes.utils.pipeline import ( # pylint: disable=E0401
+    merge_movie_titles,
+    aggregate_critics,
+    merge_oscars
+)
+from rotten_tomatoes.utils.sql_backend import SqlBackend # pylint: disable=E0401
+
+
+# Link m/d has no title, so pandas groups the merged reviews by link.
+CRITICS = pd.DataFrame({
+    'rotten_tomatoes_link': pd.Categorical(["m/b", "m/a", "m/d", "m/b", "m/a", "m/a"]),
+    'critic_name': pd.Categorical(["x", "y", "x", None, "x", "y"]),
+    'top_critic': pd.array([True, False, None, True, False, False], dtype="boolean"),
+    'review_type': pd.Categorical(["Fresh", "Rotten", "Fresh", "Fresh", "Fresh", "Rotten"]),
+    'review_score': [75.0, 40.0, 50.0, 90.0, 60.0, 40.0],
+})
+MOVIES = pd.DataFrame({
+    'rotten_tomatoes_link': pd.Categorical(["m/a", "m/b", "m/a", "m/c"]),
+    'movie_title': ["Movie A", "Movie B", "Movie A", None],
+})
+OSCARS = pd.DataFrame({
+    'year_film': pd.array([2001, 2000, 2000, 2001], dtype="int16"),
+    'category': pd.Categorical(["ACTOR", "BEST PICTURE", "BEST PICTURE", "ACTOR"]),
+    'film': ["Movie B", "Movie A", "Movie A", "Movie C"],
+    'winner': pd.array([True, False, False, True], dtype="boolean"),
+})
+
+
+class TestUtilsSqlBackend(unittest.TestCase):
+    """ A class used to test the rotten_tomatoes.utils.sql_backend module """
+
+    def setUp(self):
+        """Open a temporary database holding the test frames."""
+        self.backend = SqlBackend()
+        self.backend.write("critics", CRITICS)
+        self.backend.write("movies", MOVIES)
+        self.backend.write("oscars", OSCARS)
+
+    def tearDown(self):
+        self.backend.close()
+
+    # One shot tests
+    def test_merges(self):
+        """Test passes if the SQL merges give the same rows, order and dtypes as the
+        pandas merges, and count the same dropped rows"""
+
+        metrics = CleaningMetrics()
+        self.backend.merge_movie_titles("critics", "movies", "titled", metrics=metrics)
+        expected_metrics = CleaningMetrics()
+        titled = merge_movie_titles(CRITICS, MOVIES, metrics=expected_metrics)
+        pd.testing.assert_frame_equal(self.backend.read("titled"), titled)
+        self.assertEqual(metrics.counts, expected_metrics.counts)
+
+        self.backend.merge_oscars("oscars", "titled", "merged", metrics=metrics)
+        expected = merge_oscars(OSCARS, titled, metrics=expected_metrics)
+        pd.testing.assert_frame_equal(self.backend.read("merged"), expected)
+        self.assertEqual(metrics.counts, expected_metrics.counts)
+
+        keys = {"oscars_keys": ["year_film", "film"], "critics_keys": ["rotten_tomatoes_link"]}
+        self.backend.merge_oscars("oscars", "titled", "merged", metrics=metrics, **keys)
+        expected = merge_oscars(OSCARS, titled, metrics=expected_metrics, **keys)
+        pd.testing.assert_frame_equal(self.backend.read("merged"), expected)
+        self.assertEqual(metrics.counts, expected_metrics.counts)
+
+    def test_aggregations(self):
+        """Test passes if the SQL aggregations match aggregate_critics and the any win
+        counts"""
+
+        self.backend.merge_movie_titles("critics", "movies", "titled")
+        self.backend.aggregate_critics("titled", "aggregated")
+        pd.testing.assert_frame_equal(
+            self.backend.read("aggregated"),
+            aggregate_critics(merge_movie_titles(CRITICS, MOVIES))
+        )
+
+        self.backend.any_win("oscars", "any_win")
+        pd.testing.assert_frame_equal(
+            self.backend.read("any_win"),
+            AnyWinOscarsDataCleaner()._derive(OSCARS) # pylint: disable=W0212
+        )
+
+    def test_sink(self):
+        """Test passes if chunks written to a sink read back as one frame, with the
+        union of the chunks' categories, and can be read in chunks"""
+
+        second = CRITICS.iloc[3:].assign(
+            rotten_tomatoes_link=pd.Categorical(["m/e", "m/a", "m/a"])
+        )
+        sink = self.backend.sink("chunks")
+        sink.write(CRITICS.iloc[:3])
+        sink.write(second)
+        sink.close()
+
+        data = self.backend.read("chunks")
+        expected = pd.concat([CRITICS.iloc[:3], second], ignore_index=True)
+        expected["rotten_tomatoes_link"] = expected["rotten_tomatoes_link"].astype(
+            pd.CategoricalDtype(["m/a", "m/b", "m/d", "m/e"])
+        )
+        pd.testing.assert_frame_equal(data, expected)
+        self.assertEqual(sink.rows_written, 6)
+
+        chunks = list(self.backend.read("chunks", chunksize=4))
+        self.assertEqual([chunk.shape[0] for chunk in chunks], [4, 2])
+        self.assertEqual(chunks[1].index.tolist(), [4, 5])
+
+    # Edge tests
+    def test_aggregate_chunks_edge(self):
+        """Test passes if movies spanning several chunks aggregate exactly as pandas
+        does, where summing in another order would differ in the last bits"""
+
+        scores = np.round(np.random.default_rng(0).random(200) * 100, 1)
+        critics = pd.DataFrame({
+            'rotten_tomatoes_link': pd.Categorical(np.repeat(["m/a", "m/b"], 100)),
+            'critic_name': pd.Categorical(["x"] * 200),
+            'top_critic': pd.array([True, False] * 100, dtype="boolean"),
+            'review_type': pd.Categorical(["Fresh", "Rotten", "Rotten", "Fresh"] * 50),
+            'review_score': scores,
+        }).sample(frac=1, random_state=0)
+        titled = merge_movie_titles(critics, MOVIES)
+        self.backend.write("titled", titled)
+
+        self.backend.aggregate_critics("titled", "aggregated", chunksize=7)
+        pd.testing.assert_frame_equal(
+            self.backend.read("aggregated"), aggregate_critics(titled), check_exact=True
+        )
+
+    def test_merge_expansion_edge(self):
+        """Test passes if a link with two titles, or titles repeated on a "one" side,
+        raise a MergeExpansionException"""
+
+        self.backend.write("movies", pd.DataFrame({
+            'rotten_tomatoes_link': ["m/a", "m/a"],
+            'movie_title': ["Movie A", "Movie A (2000)"],
+        }))
+        self.assertRaises(
+            MergeExpansionException,
+            self.backend.merge_movie_titles, "critics", "movies", "titled"
+        )
+
+        self.backend.write("titles", pd.DataFrame({
+            'movie_title': ["Movie A", "Movie A"],
+            'review_score': [75.0, 85.0],
+        }))
+        with self.assertRaisesRegex(MergeExpansionException, "right data"):
+            self.backend.merge_oscars("oscars", "titles", "merged", validate="one_to_one")
+        self.assertRaises(
+            ValueError,
+            self.backend.merge_oscars, "oscars", "titles", "merged", validate="many"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
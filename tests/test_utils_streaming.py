@@ -0,0 +1,190 @@
+"""
+Runs one shot tests and edge tests for chunked DataCleaner runs and the
+sinks in rotten_tomatoes.utils.streaming
+
+test_utils_streaming does not export any classes, exceptions, or functions
+"""
+
+
+import os
+import tempfile
+import time
+import unittest
+import pandas as pd
+
+from rotten_tomatoes.utils.data_cleaning import ( # pylint: disable=E0401
+    CriticsDataCleaner,
+    BestPictureOscarsDataCleaner,
+    AnyWinOscarsDataCleaner,
+    ValidationException
+)
+from rotten_tomatoes.utils.streaming import ( # pylint: disable=E0401
+    CsvSink,
+    DataFrameSink,
+    prefetch
+)
+
+
+CRITICS = pd.DataFrame({
+    'rotten_tomatoes_link': ["m/a", "m/a", "m/b", "m/b", "m/c", "m/c", "m/d"],
+    'critic_name': ["w", "x", "y", "z", "w", "x", "y"],
+    'top_critic': [True, False, False, True, False, False, True],
+    'review_type': ["Fresh", "Rotten", "Fresh", "Fresh", "Rotten", "Fresh", "Fresh"],
+    'review_score': ["3/4", None, "B+", "2/0", "110", "7/10", "A"],
+    'review_content': ["long", "free", "text", "that", "is", "never", "used"],
+})
+
+OSCARS = pd.DataFrame({
+    'year_film': [1998, 1998, 1999, 1999, 1999, 2000],
+    'category': ["BEST PICTURE", "BEST PICTURE", "BEST PICTURE", "Best Actor",
+                 "BEST PICTURE", "BEST PICTURE"],
+    'film': ["Movie A", "Movie B", "Movie C", "Movie C", "Movie C", "Movie D"],
+    'winner': [True, False, True, True, True, True],
+})
+
+
+class TestUtilsStreaming(unittest.TestCase):
+    """ A class used to test chunked DataCleaner runs """
+
+    def setUp(self):
+        """Write the raw test csvs to a temporary directory."""
+        self.tmp_dir = tempfile.TemporaryDirectory() # pylint: disable=R1732
+        self.critics_path = os.path.join(self.tmp_dir.name, "critics.csv")
+        self.oscars_path = os.path.join(self.tmp_dir.name, "oscars.csv")
+        CRITICS.to_csv(self.critics_path, index=False)
+        OSCARS.to_csv(self.oscars_path, index=False)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    # One shot tests
+    def test_chunked_matches_full_critics(self):
+        """Test passes if a chunked run gives the same output as a full run"""
+
+        full_cleaner = CriticsDataCleaner()
+        full_cleaner.source_path = self.critics_path
+        chunked_cleaner = CriticsDataCleaner(chunksize=2)
+        chunked_cleaner.source_path = self.critics_path
+
+        pd.testing.assert_frame_equal(chunked_cleaner.run(), full_cleaner.run())
+
+    def test_chunked_matches_full_best_picture(self):
+        """Test passes if chunked best picture output, with a duplicate row split across
+        chunks, matches a full run"""
+
+        full_cleaner = BestPictureOscarsDataCleaner()
+        full_cleaner.source_path = self.oscars_path
+        chunked_cleaner = BestPictureOscarsDataCleaner(chunksize=3)
+        chunked_cleaner.source_path = self.oscars_path
+
+        pd.testing.assert_frame_equal(chunked_cleaner.run(), full_cleaner.run())
+
+    def test_csv_sink(self):
+        """Test passes if a chunked run written to a CsvSink holds every cleaned row"""
+
+        cleaner = CriticsDataCleaner(chunksize=3)
+        cleaner.source_path = self.critics_path
+        output_path = os.path.join(self.tmp_dir.name, "cleaned.csv")
+        sink = CsvSink(output_path)
+
+        self.assertIsNone(cleaner.run(sink=sink))
+
+        written = pd.read_csv(output_path)
+        self.assertEqual(sink.rows_written, 5)
+        self.assertEqual(written["review_score"].tolist(), [75.0, 88.0, 100.0, 70.0, 95.0])
+
+    def test_prefetched_matches_full_critics(self):
+        """Test passes if a chunked run reading chunks ahead gives the same output as a
+        full run"""
+
+        full_cleaner = CriticsDataCleaner()
+        full_cleaner.source_path = self.critics_path
+        prefetched_cleaner = CriticsDataCleaner(chunksize=2, prefetch_depth=2)
+        prefetched_cleaner.source_path = self.critics_path
+
+        pd.testing.assert_frame_equal(prefetched_cleaner.run(), full_cleaner.run())
+
+    def test_prefetch(self):
+        """Test passes if prefetched items arrive in order, and the producer stays at
+        most depth items ahead"""
+
+        produced = []
+
+        def items():
+            for i in range(5):
+                produced.append(i)
+                yield i
+
+        prefetched = prefetch(items(), depth=1)
+        self.assertEqual(next(prefetched), 0)
+        # Give the producer time to run ahead: one item queued, and one produced
+        # but blocked on the full queue.
+        deadline = time.monotonic() + 5
+        while len(produced) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)
+        self.assertEqual(len(produced), 3)
+        self.assertEqual(list(prefetched), [1, 2, 3, 4])
+
+    def test_dataframe_sink(self):
+        """Test passes if a DataFrameSink concatenates the written chunks"""
+
+        sink = DataFrameSink()
+        self.assertIsNone(sink.result())
+
+        sink.write(pd.DataFrame({'a': [1]}))
+        sink.write(pd.DataFrame({'a': [2]}, index=[1]))
+
+        self.assertEqual(sink.result()["a"].tolist(), [1, 2])
+
+    # Edge tests
+    def test_chunked_duplicate_winner_years(self):
+        """Test passes if two best picture winners for a year in different chunks raise
+        a ValidationException"""
+
+        oscars = OSCARS.copy()
+        oscars.loc[4, "film"] = "Movie E"
+        oscars.to_csv(self.oscars_path, index=False)
+
+        cleaner = BestPictureOscarsDataCleaner(chunksize=3)
+        cleaner.source_path = self.oscars_path
+
+        self.assertRaises(ValidationException, cleaner.run)
+
+    def test_prefetch_edge(self):
+        """Test passes if errors while producing reach the consumer, stopping early
+        stops the producer, and a depth below 1 raises a ValueError"""
+
+        def failing():
+            yield 1
+            raise OSError("Read failed!")
+
+        prefetched = prefetch(failing())
+        self.assertEqual(next(prefetched), 1)
+        self.assertRaises(OSError, next, prefetched)
+
+        produced = []
+
+        def endless():
+            while True:
+                produced.append(None)
+                yield len(produced)
+
+        prefetched = prefetch(endless(), depth=2)
+        self.assertEqual(next(prefetched), 1)
+        prefetched.close()
+        # One item consumed, two queued and one blocked when the producer stopped.
+        self.assertLessEqual(len(produced), 4)
+
+        self.assertRaises(ValueError, prefetch, [], depth=0)
+        self.assertRaises(ValueError, CriticsDataCleaner, prefetch_depth=2)
+
+    def test_unchunkable_cleaner(self):
+        """Test passes if a chunksize on a cleaner that cannot run in chunks raises a
+        ValueError"""
+
+        self.assertRaises(ValueError, AnyWinOscarsDataCleaner, chunksize=10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+"""
+Runs one shot tests and edge tests for the functions imported from
+rotten_tomatoes.utils.synthetic
+
+test_utils_synthetic does not export any classes, exceptions, or functions
+"""
+
+
+import tempfile
+import unittest
+import pandas as pd
+
+from rotten_tomatoes.utils.data_cleaning import ( # pylint: disable=E0401
+    CriticsDataCleaner,
+    MoviesDataCleaner,
+    BestPictureOscarsDataCleaner
+)
+from rotten_tomatoes.utils.pipeline import ( # pylint: disable=E0401
+    merge_movie_titles,
+    merge_oscars
+)
+from rotten_tomatoes.utils.score_cache import ScoreCache # pylint: disable=E0401
+from rotten_tomatoes.utils.synthetic import ( # pylint: disable=E0401
+    REAL_ROW_COUNTS,
+    generate_movies,
+    generate_oscars,
+    generate_critic_reviews,
+    write_synthetic_datasets
+)
+
+SCALE = 0.02
+
+
+class TestUtilsSynthetic(unittest.TestCase):
+    """ A class used to test the rotten_tomatoes.utils.synthetic module """
+
+    @classmethod
+    def setUpClass(cls):
+        """Write one set of synthetic raw files for every test."""
+        cls.tmp_dir = tempfile.TemporaryDirectory() # pylint: disable=R1732
+        cls.paths = write_synthetic_datasets(cls.tmp_dir.name, scale=SCALE, seed=7)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    # One shot tests
+    def test_row_counts(self):
+        """Test passes if each file has scale times the Kaggle rows, and the Kaggle
+        columns"""
+
+        critics = pd.read_csv(self.paths["critics"])
+        movies = pd.read_csv(self.paths["movies"])
+        oscars = pd.read_csv(self.paths["oscars"])
+
+        self.assertEqual(critics.shape[0], round(REAL_ROW_COUNTS["critics"] * SCALE))
+        self.assertEqual(movies.shape[0], round(REAL_ROW_COUNTS["movies"] * SCALE))
+        self.assertAlmostEqual(
+            oscars.shape[0] / (REAL_ROW_COUNTS["oscars"] * SCALE), 1, delta=0.05
+        )
+        self.assertTrue(movies["rotten_tomatoes_link"].is_unique)
+        self.assertTrue(critics["rotten_tomatoes_link"].isin(movies["rotten_tomatoes_link"]).all())
+        self.assertIn("review_content", critics.columns)
+        self.assertEqual(
+            list(oscars.columns),
+            ["year_film", "year_ceremony", "ceremony", "category", "name", "film", "winner"]
+        )
+
+    def test_deterministic(self):
+        """Test passes if the same seed gives the same rows, and another seed does
+        not"""
+
+        movies = generate_movies(SCALE, seed=7)
+        pd.testing.assert_frame_equal(movies, generate_movies(SCALE, seed=7))
+        pd.testing.assert_frame_equal(
+            generate_oscars(movies, SCALE, seed=7), generate_oscars(movies, SCALE, seed=7)
+        )
+        pd.testing.assert_frame_equal(
+            pd.concat(generate_critic_reviews(movies, SCALE, seed=7)),
+            pd.concat(generate_critic_reviews(movies, SCALE, seed=7))
+        )
+        self.assertFalse(movies.equals(generate_movies(SCALE, seed=8)))
+
+    def test_cleaners(self):
+        """Test passes if the cleaners run on the synthetic files, taking every score
+        cleaning path, and some Oscars films merge with reviews while others do not"""
+
+        critics_cleaner = CriticsDataCleaner(score_cache=ScoreCache())
+        movies_cleaner = MoviesDataCleaner()
+        best_picture_cleaner = BestPictureOscarsDataCleaner()
+        critics_cleaner.source_path = self.paths["critics"]
+        movies_cleaner.source_path = self.paths["movies"]
+        best_picture_cleaner.source_path = self.paths["oscars"]
+
+        critics = critics_cleaner.run()
+        movies = movies_cleaner.run()
+        best_picture = best_picture_cleaner.run()
+
+        counts = critics_cleaner.metrics.counts
+        for path in ["null", "numeric", "fraction", "letter", "manual", "capped", "dropped"]:
+            self.assertGreater(counts[f"score_{path}"], 0, path)
+        self.assertLess(movies.shape[0], movies_cleaner.metrics.counts["rows_read"])
+        self.assertEqual(best_picture["winner"].sum(), best_picture["year_film"].nunique())
+
+        merged = merge_oscars(best_picture, merge_movie_titles(critics, movies))
+        self.assertGreater(merged.shape[0], 0)
+        self.assertLess(
+            merged["movie_title"].nunique(), best_picture["film"].nunique()
+        )
+
+    # Edge tests
+    def test_scale_edge(self):
+        """Test passes if a tiny scale still gives rows, and a scale that is not
+        positive raises a ValueError"""
+
+        movies = generate_movies(1e-6)
+        self.assertEqual(movies.shape[0], 1)
+        self.assertGreater(generate_oscars(movies, 1e-6).shape[0], 0)
+        self.assertEqual(pd.concat(generate_critic_reviews(movies, 1e-6)).shape[0], 1)
+        self.assertRaises(ValueError, generate_movies, 0)
+        self.assertRaises(ValueError, write_synthetic_datasets, self.tmp_dir.name, -1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+Runs one shot tests and edge tests for the classes and functions imported from
+rotten_tomatoes.utils.title_matching
+
+test_utils_title_matching does not export any classes, exceptions, or functions
+"""
+
+
+import os
+import tempfile
+import unittest
+import pandas as pd
+
+from rotten_tomatoes.utils.title_matching import ( # pylint: disable=E0401
+    normalize_titles,
+    TitleMatcher
+)
+
+
+class TestUtilsTitleMatching(unittest.TestCase):
+    """ A class used to test the rotten_tomatoes.utils.title_matching module """
+
+    # One shot tests
+    def test_normalize_titles(self):
+        """Test passes if case, accents, punctuation and articles are folded"""
+
+        titles = pd.Series([
+            "The Artist", "Artist, The", "Amélie", "Romeo & Juliet",
+            "Birdman or (The Unexpected Virtue of Ignorance)", "A Beautiful  Mind"
+        ])
+
+        self.assertEqual(normalize_titles(titles).tolist(), [
+            "artist", "artist", "amelie", "romeo and juliet",
+            "birdman or the unexpected virtue of ignorance", "beautiful mind"
+        ])
+
+    def test_match(self):
+        """Test passes if titles match exactly, by normalized key, or fuzzily within
+        their block, keeping the index of the titles"""
+
+        matcher = TitleMatcher()
+        candidates = pd.Series(["Artist, The", "Amélie", "Shakespeare in Love", "Birdman"])
+
+        matched = matcher.match(
+            pd.Series(["Birdman", "The Artist", "Shakespear in Love", "Amelie"],
+                      index=[10, 11, 12, 13]),
+            candidates
+        )
+
+        self.assertEqual(matched.index.tolist(), [10, 11, 12, 13])
+        self.assertEqual(
+            matched.tolist(), ["Birdman", "Artist, The", "Shakespeare in Love", "Amélie"]
+        )
+        self.assertEqual(matcher.comparisons, 1)
+
+    def test_match_years(self):
+        """Test passes if fuzzy matches must be within year_tolerance years"""
+
+        matcher = TitleMatcher(year_tolerance=1)
+
+        matched = matcher.match(
+            pd.Series(["Shakespear in Love", "Shakespear in Love"]),
+            pd.Series(["Shakespeare in Love"]),
+            years=pd.Series([1998, 2005]),
+            candidate_years=pd.Series([1999]),
+        )
+
+        self.assertEqual(matched.iloc[0], "Shakespeare in Love")
+        self.assertTrue(pd.isna(matched.iloc[1]))
+
+    def test_cache(self):
+        """Test passes if fuzzy matches are reloaded from disk while the candidates
+        stay the same, and recomputed once they change"""
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "title_matches.json")
+            titles = pd.Series(["Shakespear in Love"])
+
+            TitleMatcher(cache_path=path).match(titles, pd.Series(["Shakespeare in Love"]))
+
+            matcher = TitleMatcher(cache_path=path)
+            matched = matcher.match(titles, pd.Series(["Shakespeare in Love"]))
+            self.assertEqual(matched.tolist(), ["Shakespeare in Love"])
+            self.assertEqual(matcher.comparisons, 0)
+
+            matched = matcher.match(titles, pd.Series(["Shakespeare in Love", "Titanic"]))
+            self.assertEqual(matched.tolist(), ["Shakespeare in Love"])
+            self.assertEqual(matcher.comparisons, 1)
+
+    # Edge tests
+    def test_no_match(self):
+        """Test passes if null titles, titles outside every block and titles below the
+        cutoff are not matched"""
+
+        matched = TitleMatcher().match(
+            pd.Series([None, "Titanic", "Shakespeare in Lust"]),
+            pd.Series(["Shakespeare in Love", None]),
+        )
+
+        self.assertTrue(matched.isna().all())
+
+
+if __name__ == "__main__":
+    unittest.main()
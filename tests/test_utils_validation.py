@@ -0,0 +1,107 @@
+"""
+Runs one shot tests and edge tests for the classes imported from
+rotten_tomatoes.utils.validation
+
+test_utils_validation does not export any classes, exceptions, or functions
+"""
+
+
+import unittest
+import pandas as pd
+
+from rotten_tomatoes.utils.validation import ( # pylint: disable=E0401
+    ColumnRule,
+    UniqueRule,
+    FrameValidator,
+    ValidationException
+)
+
+
+class TestUtilsValidation(unittest.TestCase):
+    """ A class used to test the rotten_tomatoes.utils.validation module """
+
+    # One shot tests
+    def test_column_rule(self):
+        """Test passes if valid float columns, including object columns holding only
+        floats, pass a float rule"""
+
+        rule = ColumnRule("score", dtype="float", nullable=False, min_value=0, max_value=100)
+
+        rule.check(pd.DataFrame({'score': [0.0, 55.5, 100.0]}))
+        rule.check(pd.DataFrame({'score': pd.Series([1.0, 2.0], dtype="object")}))
+
+        flag = True
+        self.assertTrue(flag)
+
+    def test_validate(self):
+        """Test passes if a frame meeting every rule validates"""
+
+        validator = FrameValidator(
+            ["year", "winner"],
+            [ColumnRule("winner", nullable=False)],
+            [UniqueRule(["year"], where="winner")]
+        )
+
+        validator.validate(pd.DataFrame({
+            'year': [2000, 2000, 2001],
+            'winner': [True, False, True],
+        }))
+
+        flag = True
+        self.assertTrue(flag)
+
+    def test_update(self):
+        """Test passes if chunks with keys unique across chunks validate"""
+
+        validator = FrameValidator(["year"], unique_rules=[UniqueRule(["year"])])
+
+        validator.update(pd.DataFrame({'year': [2000, 2001]}))
+        validator.update(pd.DataFrame({'year': [2002]}))
+
+        flag = True
+        self.assertTrue(flag)
+
+    # Edge tests
+    def test_column_rule_edge(self):
+        """Test passes if each frame breaking a rule raises a ValidationException"""
+
+        rule = ColumnRule("score", dtype="float", nullable=False, min_value=0, max_value=100)
+
+        dfs_to_test = [
+            {'other': [1.0]},
+            {'score': [1.0, None]},
+            {'score': [1, 2]},
+            {'score': ["A+", 100.0]},
+            {'score': [-1.0, 50.0]},
+            {'score': [50.0, 100.5]},
+        ]
+
+        for data in dfs_to_test:
+            self.assertRaises(ValidationException, rule.check, pd.DataFrame(data))
+
+    def test_unique_edge(self):
+        """Test passes if duplicate keys raise a ValidationException within a frame and
+        across chunks"""
+
+        validator = FrameValidator(
+            ["year"], unique_rules=[UniqueRule(["year"], where="winner", message="Dup!")]
+        )
+
+        self.assertRaises(
+            ValidationException,
+            validator.validate,
+            pd.DataFrame({'year': [2000, 2000], 'winner': [True, True]})
+        )
+
+        validator.update(pd.DataFrame({'year': [2000, 2000], 'winner': [True, False]}))
+        with self.assertRaisesRegex(ValidationException, "Dup!"):
+            validator.update(pd.DataFrame({'year': [2000], 'winner': [True]}))
+
+    def test_unsupported_dtype(self):
+        """Test passes if an unknown dtype rule raises a ValueError"""
+
+        self.assertRaises(ValueError, ColumnRule, "score", dtype="complex")
+
+
+if __name__ == "__main__":
+    unittest.main()